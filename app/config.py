@@ -10,8 +10,50 @@ class Settings:
     API_VERSION: str = "v1"
     
     # Database Settings
-    DB_DIR: str = os.path.join(os.getcwd(), "data")
+    DB_DIR: str = os.environ.get("MTV_DB_DIR", os.path.join(os.getcwd(), "data"))
     os.makedirs(DB_DIR, exist_ok=True)
+    DB_READER_POOL_SIZE: int = 4
+    DB_CACHE_SIZE_KB: int = 16384  # Page cache per connection
+    DB_MMAP_SIZE: int = 256 * 1024 * 1024
+    DB_STATEMENT_CACHE_SIZE: int = 256  # Prepared statements kept per connection
+    # Optional group commit: writes arriving within the window share one transaction.
+    # Off by default, every write would otherwise wait for the window first.
+    DB_GROUP_COMMIT: bool = os.environ.get("MTV_DB_GROUP_COMMIT", "0") == "1"
+    DB_GROUP_COMMIT_WINDOW_MS: float = float(os.environ.get("MTV_DB_GROUP_COMMIT_WINDOW_MS", "2"))
+    # zlib level for charts_storage.content, 0 stores the content uncompressed in the BLOB
+    CHART_COMPRESSION_LEVEL: int = int(os.environ.get("MTV_CHART_COMPRESSION_LEVEL", "6"))
+    # Pending patch saves of a chart that trigger folding them into a new base content
+    CHART_DELTA_COMPACT_THRESHOLD: int = int(os.environ.get("MTV_CHART_DELTA_COMPACT_THRESHOLD", "20"))
+
+    # Market Cache Settings
+    # Cached exchange markets older than this are still served, but trigger a background refresh
+    MARKETS_SOFT_TTL_HOURS: float = float(os.environ.get("MTV_MARKETS_SOFT_TTL_HOURS", "6"))
+    # Wait after a failed refresh before asking the exchange again
+    MARKETS_REFRESH_RETRY_SECONDS: float = float(os.environ.get("MTV_MARKETS_REFRESH_RETRY_SECONDS", "300"))
+
+    # Price Cache Settings
+    # Seconds a streamed or fetched price is served from memory before asking the exchange again
+    PRICE_CACHE_MAX_AGE_SECONDS: float = float(os.environ.get("MTV_PRICE_CACHE_MAX_AGE_SECONDS", "10"))
+    # Shared ticker polling for symbols without a live stream: fastest refresh interval,
+    # symbols per fetch_tickers call, and how long a polled symbol stays scheduled
+    TICKER_REFRESH_SECONDS: float = float(os.environ.get("MTV_TICKER_REFRESH_SECONDS", "5"))
+    TICKER_BATCH_SIZE: int = int(os.environ.get("MTV_TICKER_BATCH_SIZE", "100"))
+    TICKER_POLL_LEASE_SECONDS: float = float(os.environ.get("MTV_TICKER_POLL_LEASE_SECONDS", "60"))
+
+    # Market Data Source Settings
+    # "live" streams from ccxt.pro, "replay" serves recorded trades from REPLAY_DIR,
+    # "synthetic" generates random-walk trades at SYNTHETIC_TRADE_RATE per symbol
+    TRADE_SOURCE: str = os.environ.get("MTV_TRADE_SOURCE", "live")
+    REPLAY_DIR: str = os.environ.get("MTV_REPLAY_DIR", os.path.join(os.getcwd(), "data", "replay"))
+    REPLAY_SPEED: float = float(os.environ.get("MTV_REPLAY_SPEED", "1"))  # 0 = as fast as possible
+    REPLAY_LOOP: bool = os.environ.get("MTV_REPLAY_LOOP", "0") == "1"
+    SYNTHETIC_TRADE_RATE: float = float(os.environ.get("MTV_SYNTHETIC_TRADE_RATE", "10"))
+
+    # "live" queries ccxt REST APIs, "synthetic" serves generated candles
+    REST_SOURCE: str = os.environ.get("MTV_REST_SOURCE", "live")
+    SYNTHETIC_REST_LATENCY_MS: float = float(os.environ.get("MTV_SYNTHETIC_REST_LATENCY_MS", "50"))
+    SYNTHETIC_PAGE_LIMIT: int = int(os.environ.get("MTV_SYNTHETIC_PAGE_LIMIT", "1000"))
+    SYNTHETIC_STATS_PATH: str = os.environ.get("MTV_SYNTHETIC_STATS_PATH", "")
 
     @property
     def API_PREFIX(self) -> str:
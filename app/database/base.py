@@ -1,10 +1,94 @@
-from typing import List, Dict, Optional, Tuple
+import re
+from typing import Any, AsyncContextManager, AsyncIterator, FrozenSet, Iterator, List, Dict, Optional, Set, Tuple
+
+import orjson
+import aiosqlite
 
 from app.database.connection import DB
 
+class Record:
+    """
+    Lightweight row returned by SQLiteBase.find_iter(row_format="record").
+    
+    Subclasses declare one __slots__ entry per column, so a record costs
+    no per-instance dict. Fields are read as attributes (record.name).
+    """
+    __slots__ = ()
+    
+    def __init__(self, values: tuple):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+    
+    def __iter__(self) -> Iterator[Any]:
+        for name in self.__slots__:
+            yield getattr(self, name)
+    
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and tuple(self) == tuple(other)
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Record({fields})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
 class SQLiteBase:
+    # Query operators and their SQL. $in binds the whole list as one JSON
+    # parameter, so the statement text does not depend on the list length.
+    OPERATORS = {
+        "$eq": "{} = ?",
+        "$gt": "{} > ?",
+        "$gte": "{} >= ?",
+        "$lt": "{} < ?",
+        "$lte": "{} <= ?",
+        "$ne": "{} != ?",
+        "$in": "{} IN (SELECT value FROM json_each(?))",
+    }
+    
+    # $in values that survive the JSON round trip through json_each unchanged
+    JSON_SCALARS = (str, int, float)
+    
+    # Compiled SQL text shared by all tables, keyed on the query shape
+    # (table, field names, operators, projection, sort), never on values
+    statement_cache: Dict[tuple, str] = {}
+    statement_cache_enabled: bool = True
+    STATEMENT_CACHE_SIZE = 1024
+    
+    # Record subclasses for find_iter, keyed on the result column names
+    record_types: Dict[Tuple[str, ...], type] = {}
+    
+    # $group accumulators and their SQL aggregate functions
+    ACCUMULATORS = {
+        "$sum": "SUM",
+        "$avg": "AVG",
+        "$min": "MIN",
+        "$max": "MAX",
+    }
+    
+    # Field names accepted by aggregate; "_id.name" addresses a grouped key
+    IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+    
     def __init__(self, table_name: str):
         self.table_name = table_name
+        self._unique_keys: Optional[Set[FrozenSet[str]]] = None
+        self._required_columns: Optional[Set[str]] = None
+        self._columns: Optional[List[str]] = None
+    
+    def transaction(self) -> AsyncContextManager[aiosqlite.Connection]:
+        """
+        Group calls on any SQLiteBase into one transaction and one commit.
+        
+        Usage:
+            async with self.sqlite_base.transaction():
+                await self.sqlite_base.delete_many(...)
+                await self.sqlite_base.insert_one(...)
+        
+        Returns:
+            Async context manager yielding the writer connection
+        """
+        return DB.transaction()
     
     async def insert_one(self, document: Dict) -> Optional[int]:
         """
@@ -17,32 +101,96 @@ class SQLiteBase:
             The document ID if successful, None otherwise
         """
         try:
-            db = await DB.get_db()
+            query, values = self._build_insert_query(document)
             
-            # Get column names and values
-            columns = list(document.keys())
-            values = list(document.values())
+            _, lastrowid = await DB.execute_write(query, values)
+            return lastrowid
+        except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
+            print(f"Error inserting document: {e}")
+            return None
+    
+    async def upsert_one(
+        self,
+        document: Dict,
+        conflict_fields: List[str],
+        update_fields: Optional[List[str]] = None,
+        requires: Optional[Tuple[str, Dict]] = None
+    ) -> bool:
+        """
+        Insert a document, or update the existing row on a unique key conflict.
+        Runs as a single INSERT ... ON CONFLICT statement.
+        
+        Args:
+            document: Document to insert
+            conflict_fields: Columns of the unique index that detects the conflict
+            update_fields: Columns to overwrite on conflict, defaults to all other
+                columns of the document. An empty list leaves the existing row untouched.
+            requires: (table, query) that must match a row for the document to be
+                written, e.g. the parent row of a foreign key
             
-            # Build the SQL query
-            placeholders = ", ".join(["?"] * len(columns))
+        Returns:
+            True if a row was inserted or updated, False otherwise
+        """
+        try:
+            columns = list(document.keys())
+            params = list(document.values())
             column_str = ", ".join(columns)
+            placeholders = ", ".join(["?"] * len(columns))
+            
+            if update_fields is None:
+                update_fields = [key for key in document if key not in conflict_fields]
+            
+            conditions = []
+            if not update_fields:
+                # Check the unique key up front, a DO NOTHING conflict would
+                # still use up an AUTOINCREMENT id
+                where_clause, where_params = self._build_where_clause(
+                    {field: document[field] for field in conflict_fields}
+                )
+                conditions.append(f"NOT EXISTS (SELECT 1 FROM {self.table_name} WHERE {where_clause})")
+                params.extend(where_params)
             
-            query = f"INSERT INTO {self.table_name} ({column_str}) VALUES ({placeholders})"
+            if requires:
+                required_table, required_query = requires
+                where_clause, where_params = self._build_where_clause(required_query)
+                conditions.append(f"EXISTS (SELECT 1 FROM {required_table} WHERE {where_clause})")
+                params.extend(where_params)
             
-            async with db.cursor() as cursor:
-                await cursor.execute(query, values)
-                await db.commit()
-                return cursor.lastrowid
+            if conditions:
+                query = (
+                    f"INSERT INTO {self.table_name} ({column_str}) "
+                    f"SELECT {placeholders} WHERE {' AND '.join(conditions)}"
+                )
+            else:
+                query = f"INSERT INTO {self.table_name} ({column_str}) VALUES ({placeholders})"
+            
+            conflict_str = ", ".join(conflict_fields)
+            if update_fields:
+                set_str = ", ".join(f"{key} = excluded.{key}" for key in update_fields)
+                query += f" ON CONFLICT ({conflict_str}) DO UPDATE SET {set_str}"
+            else:
+                query += f" ON CONFLICT ({conflict_str}) DO NOTHING"
+            
+            changed_count, _ = await DB.execute_write(query, params)
+            return changed_count > 0
         except Exception as e:
-            print(f"Error inserting document: {e}")
-            return None
-        
-    async def insert_many(self, documents: List[Dict]) -> bool:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
+            print(f"Error upserting document: {e}")
+            return False
+    
+    async def insert_many(self, documents: List[Dict], ignore_conflicts: bool = False) -> bool:
         """
-        Insert multiple documents into the database.
+        Insert multiple documents into the database with one executemany.
         
         Args:
-            documents: List of documents to insert
+            documents: List of documents to insert, all with the keys of the first
+            ignore_conflicts: Skip documents violating a unique constraint
+                              (INSERT OR IGNORE) instead of failing
             
         Returns:
             True if successful, False otherwise
@@ -51,8 +199,6 @@ class SQLiteBase:
             if not documents:
                 return False
                 
-            db = await DB.get_db()
-            
             # Get column names from the first document
             columns = list(documents[0].keys())
             
@@ -60,7 +206,8 @@ class SQLiteBase:
             placeholders = ", ".join(["?"] * len(columns))
             column_str = ", ".join(columns)
             
-            query = f"INSERT INTO {self.table_name} ({column_str}) VALUES ({placeholders})"
+            verb = "INSERT OR IGNORE" if ignore_conflicts else "INSERT"
+            query = f"{verb} INTO {self.table_name} ({column_str}) VALUES ({placeholders})"
             
             # Prepare values for each document
             values_list = []
@@ -70,11 +217,12 @@ class SQLiteBase:
                     values.append(document.get(column))
                 values_list.append(values)
             
-            async with db.cursor() as cursor:
-                await cursor.executemany(query, values_list)
-                await db.commit()
-                return True
+            await DB.execute_write(query, values_list, many=True)
+            return True
         except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
             print(f"Error inserting documents: {e}")
             return False
     
@@ -92,28 +240,20 @@ class SQLiteBase:
             Matching document or None
         """
         try:
-            db = await DB.get_db()
-            
-            # Build SQL WHERE clause and parameters
-            where_clause, params = self._build_where_clause(query)
-            
-            # Build projection
-            select_clause = self._build_select_clause(projection)
-            
-            # Build final query
-            sql_query = f"SELECT {select_clause} FROM {self.table_name}"
-            if where_clause:
-                sql_query += f" WHERE {where_clause}"
-            sql_query += " LIMIT 1"
+            sql_query, params = self._compile_select(query, projection, limit=1)
             
-            async with db.execute(sql_query, params) as cursor:
-                row = await cursor.fetchone()
-                
-                if not row:
-                    return None
+            async with DB.reader() as db:
+                async with db.execute(sql_query, params) as cursor:
+                    row = await cursor.fetchone()
                     
-                return dict(row)
+                    if not row:
+                        return None
+                        
+                    return dict(row)
         except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
             print(f"Error finding document: {e}")
             return None
     
@@ -137,32 +277,93 @@ class SQLiteBase:
             List of matching documents
         """
         try:
-            db = await DB.get_db()
+            sql_query, params = self._compile_select(query, projection, sort, limit)
             
-            # Build SQL WHERE clause and parameters
-            where_clause, params = self._build_where_clause(query)
-            
-            # Build projection
-            select_clause = self._build_select_clause(projection)
+            async with DB.reader() as db:
+                async with db.execute(sql_query, params) as cursor:
+                    rows = await cursor.fetchall()
+                    return [dict(row) for row in rows]
+        except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
+            print(f"Error finding documents: {e}")
+            return []
+    
+    async def find_iter(
+        self,
+        query: Dict = None,
+        projection: Dict = None,
+        sort: List[Tuple[str, int]] = None,
+        limit: int = None,
+        batch_size: int = 500,
+        row_format: str = "dict",
+    ) -> AsyncIterator[Any]:
+        """
+        Stream documents matching the query, fetching batch_size rows at a time.
+        
+        Usage:
+            async for chart in self.sqlite_base.find_iter(row_format="record"):
+                print(chart.name)
+        
+        The reader connection is held until the iteration finishes; wrap the
+        call in contextlib.aclosing() when breaking out of the loop early.
+        
+        Args:
+            query: Query to match
+            projection: Fields to include/exclude
+            sort: List of (field, direction) tuples to sort by
+            limit: Maximum number of documents to return
+            batch_size: Rows fetched from SQLite per round trip
+            row_format: "dict", "tuple" (in column order) or "record"
+                        (a Record with one slot per column)
             
-            # Build ORDER BY clause
-            order_clause = self._build_order_clause(sort)
+        Yields:
+            Matching documents in the requested format
             
-            # Build final query
-            sql_query = f"SELECT {select_clause} FROM {self.table_name}"
-            if where_clause:
-                sql_query += f" WHERE {where_clause}"
-            if order_clause:
-                sql_query += f" ORDER BY {order_clause}"
-            if limit is not None:
-                sql_query += f" LIMIT {limit}"
+        Raises:
+            Exception: A failure after the first batch is re-raised, so a
+                truncated scan cannot be mistaken for a complete one
+        """
+        if row_format not in ("dict", "tuple", "record"):
+            raise ValueError(f"Unsupported row format: {row_format}")
+        
+        yielded = False
+        try:
+            sql_query, params = self._compile_select(query, projection, sort, limit)
             
-            async with db.execute(sql_query, params) as cursor:
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
+            async with DB.reader() as db:
+                async with db.cursor() as cursor:
+                    if row_format != "dict":
+                        # Plain tuples skip building an aiosqlite.Row per row
+                        cursor.row_factory = None
+                    
+                    await cursor.execute(sql_query, params)
+                    
+                    record_type = None
+                    if row_format == "record":
+                        record_type = self._record_type(tuple(column[0] for column in cursor.description))
+                    
+                    while True:
+                        rows = await cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        
+                        yielded = True
+                        if row_format == "dict":
+                            for row in rows:
+                                yield dict(row)
+                        elif row_format == "tuple":
+                            for row in rows:
+                                yield row
+                        else:
+                            for row in rows:
+                                yield record_type(row)
         except Exception as e:
-            print(f"Error finding documents: {e}")
-            return []
+            if yielded or DB.in_transaction():
+                # A scan that stops halfway must not look like a complete one
+                raise
+            print(f"Error iterating documents: {e}")
     
     async def update_one(self, query: Dict, update: Dict, upsert: bool = False) -> bool:
         """
@@ -177,8 +378,6 @@ class SQLiteBase:
             True if a document was updated, False otherwise
         """
         try:
-            db = await DB.get_db()
-            
             # Handle $set operation
             if "$set" in update:
                 updates = update["$set"]
@@ -206,27 +405,15 @@ class SQLiteBase:
             if where_clause:
                 sql_query += f" WHERE {where_clause}"
             
-            async with db.cursor() as cursor:
-                await cursor.execute(sql_query, params)
-                updated_count = cursor.rowcount
-                await db.commit()
-                
-                if updated_count > 0:
-                    return True
-                
-                # Handle upsert
-                if upsert:
-                    # Create a new document by combining query and update
-                    if "$set" in update:
-                        new_doc = {**query, **update["$set"]}
-                    else:
-                        new_doc = {**query, **update}
-                        
-                    await self.insert_one(new_doc)
-                    return True
-                    
-                return False
+            if upsert:
+                return await self._update_or_insert(query, updates, sql_query, params) > 0
+            
+            updated_count, _ = await DB.execute_write(sql_query, params)
+            return updated_count > 0
         except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
             print(f"Error updating document: {e}")
             return False
     
@@ -243,8 +430,6 @@ class SQLiteBase:
             Number of documents updated
         """
         try:
-            db = await DB.get_db()
-            
             # Handle $set operation
             if "$set" in update:
                 updates = update["$set"]
@@ -272,26 +457,57 @@ class SQLiteBase:
             if where_clause:
                 sql_query += f" WHERE {where_clause}"
             
-            async with db.cursor() as cursor:
-                await cursor.execute(sql_query, params)
-                updated_count = cursor.rowcount
-                await db.commit()
-                
-                if updated_count == 0 and upsert:
-                    # Create a new document by combining query and update
-                    if "$set" in update:
-                        new_doc = {**query, **update["$set"]}
-                    else:
-                        new_doc = {**query, **update}
-                        
-                    await self.insert_one(new_doc)
-                    return 1
-                    
-                return updated_count
+            if upsert:
+                return await self._update_or_insert(query, updates, sql_query, params)
+            
+            updated_count, _ = await DB.execute_write(sql_query, params)
+            return updated_count
         except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
             print(f"Error updating documents: {e}")
             return 0
     
+    async def bulk_update(self, documents: List[Dict], key_fields: List[str]) -> int:
+        """
+        Update many rows, each with its own values, with one executemany.
+        
+        Args:
+            documents: Documents holding the key fields and the values to set,
+                       all with the keys of the first
+            key_fields: Fields matching each document to its row
+            
+        Returns:
+            Number of rows updated
+        """
+        try:
+            if not documents:
+                return 0
+            
+            key_fields = list(key_fields)
+            set_fields = [field for field in documents[0] if field not in key_fields]
+            if not set_fields:
+                return 0
+            
+            set_clause = ", ".join(f"{self._quote_identifier(field)} = ?" for field in set_fields)
+            where_clause = " AND ".join(f"{self._quote_identifier(field)} = ?" for field in key_fields)
+            query = f"UPDATE {self.table_name} SET {set_clause} WHERE {where_clause}"
+            
+            values_list = [
+                [document.get(field) for field in set_fields] + [document[field] for field in key_fields]
+                for document in documents
+            ]
+            
+            rowcount, _ = await DB.execute_write(query, values_list, many=True)
+            return rowcount
+        except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
+            print(f"Error bulk updating documents: {e}")
+            return 0
+    
     async def delete_one(self, query: Dict) -> bool:
         """
         Delete a single document matching the query.
@@ -303,33 +519,22 @@ class SQLiteBase:
             True if a document was deleted, False otherwise
         """
         try:
-            db = await DB.get_db()
-            
             where_clause, params = self._build_where_clause(query)
             
+            # Select and delete the row in one statement on the writer
             select_query = f"SELECT rowid FROM {self.table_name}"
             if where_clause:
                 select_query += f" WHERE {where_clause}"
             select_query += " LIMIT 1"
             
-            rowid = None
-            async with db.execute(select_query, params) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    rowid = row[0]
+            delete_query = f"DELETE FROM {self.table_name} WHERE rowid = ({select_query})"
             
-            if rowid is None:
-                return False
-                
-            delete_query = f"DELETE FROM {self.table_name} WHERE rowid = ?"
-            
-            async with db.cursor() as cursor:
-                await cursor.execute(delete_query, [rowid])
-                deleted_count = cursor.rowcount
-                await db.commit()
-                
-                return deleted_count > 0
+            deleted_count, _ = await DB.execute_write(delete_query, params)
+            return deleted_count > 0
         except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
             print(f"Error deleting document: {e}")
             return False
     
@@ -344,8 +549,6 @@ class SQLiteBase:
             Number of documents deleted
         """
         try:
-            db = await DB.get_db()
-            
             # Build WHERE clause and parameters
             where_clause, params = self._build_where_clause(query)
             
@@ -354,13 +557,12 @@ class SQLiteBase:
             if where_clause:
                 sql_query += f" WHERE {where_clause}"
             
-            async with db.cursor() as cursor:
-                await cursor.execute(sql_query, params)
-                deleted_count = cursor.rowcount
-                await db.commit()
-                
-                return deleted_count
+            deleted_count, _ = await DB.execute_write(sql_query, params)
+            return deleted_count
         except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
             print(f"Error deleting documents: {e}")
             return 0
     
@@ -375,32 +577,70 @@ class SQLiteBase:
             Number of matching documents
         """
         try:
-            db = await DB.get_db()
+            sql_query, params = self._compile_select(query, count=True)
+            
+            async with DB.reader() as db:
+                async with db.execute(sql_query, params) as cursor:
+                    row = await cursor.fetchone()
+                    
+                    if not row:
+                        return 0
+                        
+                    return row["count"]
+        except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
+            print(f"Error counting documents: {e}")
+            return 0
+    
+    async def count_by(self, field: str, query: Dict = None) -> Dict[Any, int]:
+        """
+        Count documents matching the query, grouped by a field.
+        
+        Args:
+            field: Field to group by
+            query: Query to match
             
+        Returns:
+            {field value: number of matching documents}
+        """
+        try:
             # Build WHERE clause and parameters
             where_clause, params = self._build_where_clause(query)
             
             # Build final query
-            sql_query = f"SELECT COUNT(*) as count FROM {self.table_name}"
+            sql_query = f"SELECT {field} AS value, COUNT(*) AS count FROM {self.table_name}"
             if where_clause:
                 sql_query += f" WHERE {where_clause}"
+            sql_query += f" GROUP BY {field}"
             
-            async with db.execute(sql_query, params) as cursor:
-                row = await cursor.fetchone()
-                
-                if not row:
-                    return 0
-                    
-                return row["count"]
+            async with DB.reader() as db:
+                async with db.execute(sql_query, params) as cursor:
+                    return {row["value"]: row["count"] for row in await cursor.fetchall()}
         except Exception as e:
-            print(f"Error counting documents: {e}")
-            return 0
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
+            print(f"Error counting documents by {field}: {e}")
+            return {}
     
     async def aggregate(self, pipeline: List[Dict]) -> List[Dict]:
         """
-        Perform an aggregation operation.
-        Note: SQLite doesn't support MongoDB-style aggregation pipelines.
-        This is a limited implementation that only supports basic operations.
+        Perform an aggregation operation as a single SQL statement.
+        
+        Supported stages:
+            $match: query, same operators as find_many
+            $project: {field: 1}, {field: 0} or {alias: "$field"}
+            $group: _id of "$field", None or {name: "$field"}, accumulators
+                    $sum ("$field" or a number), $avg, $min, $max, $count
+            $sort: {field: 1 | -1} or list of (field, direction) tuples
+            $skip, $limit: non-negative integers
+            $count: name of the output field
+        
+        Consecutive stages are merged into one SELECT when SQL allows it,
+        otherwise the earlier stages become a subquery. A dict _id from
+        $group is returned nested, like MongoDB.
         
         Args:
             pipeline: Aggregation pipeline
@@ -409,53 +649,490 @@ class SQLiteBase:
             Aggregation result
         """
         try:
-            # This is a very simplified implementation
-            # Only supports basic match and project stages
-            results = []
+            columns = await self._get_columns()
+            sql_query, params = self._compile_pipeline(pipeline, columns)
             
-            for stage in pipeline:
-                if "$match" in stage:
-                    # Transform match stage into a find operation
-                    results = await self.find_many(query=stage["$match"])
-                elif "$project" in stage:
-                    # Apply projection to results
-                    projection = stage["$project"]
-                    new_results = []
-                    
-                    for doc in results:
-                        projected_doc = {}
-                        
-                        # Determine if we're in include or exclude mode
-                        include_mode = True
-                        for key, value in projection.items():
-                            if key != "_id" and value != 0 and value != 1:
-                                continue
-                                
-                            if key != "_id":
-                                include_mode = value == 1
-                                break
-                                
-                        if include_mode:
-                            # Include mode: only include specified fields
-                            for key, value in projection.items():
-                                if value == 1 and key in doc:
-                                    projected_doc[key] = doc[key]
-                        else:
-                            # Exclude mode: include all fields except specified ones
-                            projected_doc = doc.copy()
-                            for key, value in projection.items():
-                                if value == 0 and key in projected_doc:
-                                    del projected_doc[key]
-                                    
-                        new_results.append(projected_doc)
-                        
-                    results = new_results
-                    
+            async with DB.reader() as db:
+                async with db.execute(sql_query, params) as cursor:
+                    rows = await cursor.fetchall()
+            
+            results = []
+            for row in rows:
+                doc = {}
+                for key in row.keys():
+                    if key.startswith("_id."):
+                        doc.setdefault("_id", {})[key[4:]] = row[key]
+                    else:
+                        doc[key] = row[key]
+                results.append(doc)
+                
             return results
         except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
             print(f"Error aggregating documents: {e}")
             return []
     
+    async def search(
+        self,
+        text: str,
+        fts_table: str,
+        projection: Dict = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict]:
+        """
+        Full-text search through an FTS5 table indexing this table by id,
+        best matches (bm25) first.
+        
+        Every word of the text must match the start of a word in the indexed
+        columns, e.g. "btc us" finds "BINANCE:BTC/USDT".
+        
+        Args:
+            text: Search text
+            fts_table: FTS5 table with this table's id as rowid
+            projection: Fields to include
+            limit: Maximum number of documents to return
+            offset: Number of matches to skip
+            
+        Returns:
+            List of matching documents
+        """
+        try:
+            match = self._match_expression(text)
+            if not match:
+                return []
+            
+            fts_table = self._quote_identifier(fts_table)
+            select_clause = self._build_select_clause(projection)
+            if select_clause == "*":
+                # Leave out the rank columns of the joined subquery
+                select_clause = f"{self.table_name}.*"
+            sql_query = (
+                f"SELECT {select_clause} FROM {self.table_name} "
+                f"JOIN (SELECT rowid AS fts_rowid, rank AS fts_rank FROM {fts_table} WHERE {fts_table} MATCH ?) "
+                f"ON id = fts_rowid ORDER BY fts_rank, id LIMIT ? OFFSET ?"
+            )
+            
+            async with DB.reader() as db:
+                async with db.execute(sql_query, [match, limit, offset]) as cursor:
+                    rows = await cursor.fetchall()
+                    return [dict(row) for row in rows]
+        except Exception as e:
+            if DB.in_transaction():
+                # Let DB.transaction() roll back the whole block
+                raise
+            print(f"Error searching documents: {e}")
+            return []
+    
+    async def _update_or_insert(self, query: Dict, updates: Dict, update_query: str, update_params: List) -> int:
+        """
+        Apply an update, inserting the combined document if nothing matched.
+        Uses a native upsert when the query is an equality match on a unique
+        key and the combined document fills every NOT NULL column, otherwise
+        runs the update and insert in one transaction.
+        
+        Args:
+            query: Query to match
+            updates: Column values to set
+            update_query: UPDATE statement built from query and updates
+            update_params: Parameters of the UPDATE statement
+            
+        Returns:
+            Number of rows updated or inserted
+        """
+        new_doc = {**(query or {}), **updates}
+        
+        is_equality = bool(query) and not any(isinstance(value, dict) for value in query.values())
+        if (
+            is_equality
+            and frozenset(query) in await self._get_unique_keys()
+            and self._required_columns <= set(new_doc)
+        ):
+            insert_query, insert_params = self._build_insert_query(new_doc)
+            set_str = ", ".join(f"{key} = excluded.{key}" for key in updates)
+            insert_query += f" ON CONFLICT ({', '.join(query)}) DO UPDATE SET {set_str}"
+            changed_count, _ = await DB.execute_write(insert_query, insert_params)
+            return changed_count
+        
+        async with DB.transaction():
+            updated_count, _ = await DB.execute_write(update_query, update_params)
+            if updated_count > 0:
+                return updated_count
+            
+            insert_query, insert_params = self._build_insert_query(new_doc)
+            await DB.execute_write(insert_query, insert_params)
+            return 1
+    
+    async def _get_unique_keys(self) -> Set[FrozenSet[str]]:
+        """
+        Get the column sets of the table's unique indexes and primary key.
+        Also loads the NOT NULL columns without a default into
+        self._required_columns. Cached after the first call.
+        
+        Returns:
+            Set of column name sets
+        """
+        if self._unique_keys is None:
+            unique_keys = set()
+            
+            async with DB.reader() as db:
+                async with db.execute(f"PRAGMA index_list({self.table_name})") as cursor:
+                    indexes = [row["name"] for row in await cursor.fetchall() if row["unique"]]
+                
+                for index_name in indexes:
+                    async with db.execute(f"PRAGMA index_info({index_name})") as cursor:
+                        unique_keys.add(frozenset(row["name"] for row in await cursor.fetchall()))
+                
+                async with db.execute(f"PRAGMA table_info({self.table_name})") as cursor:
+                    columns = await cursor.fetchall()
+            
+            primary_key = [row["name"] for row in columns if row["pk"]]
+            if primary_key:
+                unique_keys.add(frozenset(primary_key))
+            
+            self._required_columns = {
+                row["name"] for row in columns
+                if row["notnull"] and row["dflt_value"] is None and not row["pk"]
+            }
+            self._unique_keys = unique_keys
+        
+        return self._unique_keys
+    
+    async def _get_columns(self) -> List[str]:
+        """
+        Get the table's column names in declaration order. Cached after the first call.
+        
+        Returns:
+            List of column names
+        """
+        if self._columns is None:
+            async with DB.reader() as db:
+                async with db.execute(f"PRAGMA table_info({self.table_name})") as cursor:
+                    self._columns = [row["name"] for row in await cursor.fetchall()]
+        
+        return self._columns
+    
+    def _compile_pipeline(self, pipeline: List[Dict], columns: List[str]) -> Tuple[str, List]:
+        """
+        Compile an aggregation pipeline into one SELECT statement.
+        
+        Args:
+            pipeline: Aggregation pipeline
+            columns: Column names of the table
+            
+        Returns:
+            (sql_query, parameters)
+            
+        Raises:
+            ValueError: If a stage or field name is not supported
+        """
+        layer = self._new_layer(self.table_name)
+        
+        for depth, stage in enumerate(pipeline):
+            if not isinstance(stage, dict) or len(stage) != 1:
+                raise ValueError(f"Pipeline stage must have exactly one operator: {stage}")
+            
+            (operator, spec), = stage.items()
+            
+            if operator == "$match":
+                # WHERE runs before SELECT, so it cannot see aliases or groups
+                if layer["select"] or layer["limit"] is not None or layer["offset"] is not None:
+                    layer = self._wrap_layer(layer, depth)
+                
+                where_shape, where_params = self._query_shape(
+                    {self._quote_identifier(field): value for field, value in spec.items()}
+                )
+                if where_shape:
+                    layer["where"].append(self._compile_where(where_shape))
+                    layer["where_params"].extend(where_params)
+                    
+            elif operator == "$project":
+                if layer["select"]:
+                    layer = self._wrap_layer(layer, depth)
+                
+                included = []
+                excluded = set()
+                for key, value in spec.items():
+                    if isinstance(value, str) and value.startswith("$"):
+                        included.append((key, value[1:]))
+                    elif value is True or value == 1:
+                        included.append((key, key))
+                    elif value is False or value == 0:
+                        excluded.add(key)
+                    else:
+                        raise ValueError(f"Unsupported $project value for {key}: {value}")
+                
+                if included and excluded - {"_id"}:
+                    raise ValueError("$project cannot mix inclusion and exclusion")
+                
+                if not included:
+                    included = [
+                        (column, column) for column in columns
+                        if column not in excluded and column.split(".")[0] not in excluded
+                    ]
+                
+                layer["select"] = ", ".join(
+                    self._quote_identifier(source) if alias == source
+                    else f"{self._quote_identifier(source)} AS {self._quote_identifier(alias)}"
+                    for alias, source in included
+                )
+                columns = [alias for alias, _ in included]
+                
+            elif operator == "$group":
+                if (
+                    layer["select"] or layer["order"]
+                    or layer["limit"] is not None or layer["offset"] is not None
+                ):
+                    layer = self._wrap_layer(layer, depth)
+                
+                select = []
+                group_by = []
+                group_id = spec.get("_id")
+                
+                if group_id is None:
+                    select.append('NULL AS "_id"')
+                elif isinstance(group_id, dict):
+                    for name, ref in group_id.items():
+                        field = self._field_reference(ref)
+                        select.append(f"{field} AS {self._quote_identifier('_id.' + name)}")
+                        group_by.append(field)
+                else:
+                    field = self._field_reference(group_id)
+                    select.append(f'{field} AS "_id"')
+                    group_by.append(field)
+                
+                columns = [
+                    "_id." + name for name in group_id
+                ] if isinstance(group_id, dict) else ["_id"]
+                
+                for name, accumulator in spec.items():
+                    if name == "_id":
+                        continue
+                    if not isinstance(accumulator, dict) or len(accumulator) != 1:
+                        raise ValueError(f"Invalid accumulator for {name}: {accumulator}")
+                    
+                    (op, argument), = accumulator.items()
+                    if op == "$count" or (op == "$sum" and argument == 1 and argument is not True):
+                        expression = "COUNT(*)"
+                    elif op == "$sum" and isinstance(argument, (int, float)) and not isinstance(argument, bool):
+                        expression = f"SUM({argument!r})"
+                    elif op in self.ACCUMULATORS:
+                        expression = f"{self.ACCUMULATORS[op]}({self._field_reference(argument)})"
+                    else:
+                        raise ValueError(f"Unsupported accumulator: {op}")
+                    
+                    select.append(f"{expression} AS {self._quote_identifier(name)}")
+                    columns.append(name)
+                
+                layer["select"] = ", ".join(select)
+                layer["group"] = group_by
+                
+            elif operator == "$sort":
+                # Sorting after LIMIT/OFFSET must not change which rows were kept
+                if layer["limit"] is not None or layer["offset"] is not None:
+                    layer = self._wrap_layer(layer, depth)
+                
+                sort = spec.items() if isinstance(spec, dict) else spec
+                layer["order"] = ", ".join(
+                    f"{self._quote_identifier(field)} {'ASC' if direction > 0 else 'DESC'}"
+                    for field, direction in sort
+                )
+                
+            elif operator == "$skip":
+                if isinstance(spec, bool) or not isinstance(spec, int) or spec < 0:
+                    raise ValueError(f"$skip must be a non-negative integer: {spec}")
+                if layer["limit"] is not None:
+                    layer = self._wrap_layer(layer, depth)
+                
+                layer["offset"] = (layer["offset"] or 0) + spec
+                
+            elif operator == "$limit":
+                if isinstance(spec, bool) or not isinstance(spec, int) or spec < 0:
+                    raise ValueError(f"$limit must be a non-negative integer: {spec}")
+                
+                layer["limit"] = spec if layer["limit"] is None else min(layer["limit"], spec)
+                
+            elif operator == "$count":
+                if (
+                    layer["select"] or layer["limit"] is not None or layer["offset"] is not None
+                ):
+                    layer = self._wrap_layer(layer, depth)
+                
+                layer["select"] = f"COUNT(*) AS {self._quote_identifier(spec)}"
+                layer["order"] = None
+                columns = [spec]
+                
+            else:
+                raise ValueError(f"Unsupported pipeline stage: {operator}")
+        
+        return self._render_layer(layer)
+    
+    def _new_layer(self, source: str, source_params: List = None) -> Dict:
+        return {
+            "source": source,
+            "source_params": source_params or [],
+            "select": None,
+            "where": [],
+            "where_params": [],
+            "group": None,
+            "order": None,
+            "limit": None,
+            "offset": None,
+        }
+    
+    def _wrap_layer(self, layer: Dict, depth: int) -> Dict:
+        sql_query, params = self._render_layer(layer)
+        return self._new_layer(f"({sql_query}) AS stage_{depth}", params)
+    
+    def _render_layer(self, layer: Dict) -> Tuple[str, List]:
+        """
+        Render one pipeline layer as a SELECT statement.
+        
+        Args:
+            layer: Layer built by _compile_pipeline
+            
+        Returns:
+            (sql_query, parameters)
+        """
+        sql_query = f"SELECT {layer['select'] or '*'} FROM {layer['source']}"
+        params = list(layer["source_params"])
+        
+        if layer["where"]:
+            sql_query += " WHERE " + " AND ".join(layer["where"])
+            params.extend(layer["where_params"])
+        if layer["group"]:
+            sql_query += " GROUP BY " + ", ".join(layer["group"])
+        if layer["order"]:
+            sql_query += f" ORDER BY {layer['order']}"
+        if layer["limit"] is not None or layer["offset"] is not None:
+            sql_query += " LIMIT ?"
+            params.append(layer["limit"] if layer["limit"] is not None else -1)
+            if layer["offset"]:
+                sql_query += " OFFSET ?"
+                params.append(layer["offset"])
+        
+        return sql_query, params
+    
+    def _match_expression(self, text: str) -> str:
+        """
+        Turn free text into an FTS5 query of quoted prefix terms, so user input
+        can't use (or break on) the FTS5 query syntax.
+        
+        Args:
+            text: Search text
+            
+        Returns:
+            FTS5 MATCH expression, empty if the text has no words
+        """
+        return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text or ""))
+    
+    def _quote_identifier(self, name: str) -> str:
+        if not isinstance(name, str) or not self.IDENTIFIER.match(name):
+            raise ValueError(f"Invalid field name: {name}")
+        return f'"{name}"'
+    
+    def _field_reference(self, reference: str) -> str:
+        if not isinstance(reference, str) or not reference.startswith("$"):
+            raise ValueError(f"Expected a field reference like '$field': {reference}")
+        return self._quote_identifier(reference[1:])
+    
+    def _record_type(self, columns: Tuple[str, ...]) -> type:
+        """
+        Get the Record subclass with one slot per column, cached by column names.
+        
+        Args:
+            columns: Column names of the result set
+            
+        Returns:
+            Record subclass
+            
+        Raises:
+            ValueError: If a column name shadows a Record attribute (e.g. to_dict)
+        """
+        record_type = self.record_types.get(columns)
+        if record_type is None:
+            for column in columns:
+                if hasattr(Record, column):
+                    raise ValueError(
+                        f"Column '{column}' clashes with a Record attribute, "
+                        "use row_format='dict' or 'tuple'"
+                    )
+            record_type = type("Record", (Record,), {"__slots__": columns})
+            self.record_types[columns] = record_type
+        return record_type
+    
+    def _build_insert_query(self, document: Dict) -> Tuple[str, List]:
+        """
+        Build a SQL INSERT statement from a document.
+        
+        Args:
+            document: Document to insert
+            
+        Returns:
+            (insert_query, parameters)
+        """
+        columns = list(document.keys())
+        placeholders = ", ".join(["?"] * len(columns))
+        column_str = ", ".join(columns)
+        
+        query = f"INSERT INTO {self.table_name} ({column_str}) VALUES ({placeholders})"
+        return query, list(document.values())
+    
+    def _compile_select(
+        self,
+        query: Dict = None,
+        projection: Dict = None,
+        sort: List[Tuple[str, int]] = None,
+        limit: int = None,
+        count: bool = False
+    ) -> Tuple[str, List]:
+        """
+        Build a SELECT statement, reusing the SQL text of an earlier query
+        with the same shape. Only the parameters are rebuilt per call.
+        
+        Args:
+            query: Query to match
+            projection: Fields to include/exclude
+            sort: List of (field, direction) tuples to sort by
+            limit: Maximum number of documents to return, bound as a parameter
+            count: Whether to select COUNT(*) instead of documents
+            
+        Returns:
+            (sql_query, parameters)
+        """
+        where_shape, params = self._query_shape(query)
+        key = (
+            "count" if count else "select",
+            self.table_name,
+            where_shape,
+            tuple(projection.items()) if projection else None,
+            tuple((field, direction > 0) for field, direction in sort) if sort else None,
+            limit is not None,
+        )
+        
+        sql_query = self.statement_cache.get(key) if self.statement_cache_enabled else None
+        if sql_query is None:
+            where_clause = self._compile_where(where_shape)
+            select_clause = "COUNT(*) as count" if count else self._build_select_clause(projection)
+            order_clause = self._build_order_clause(sort)
+            
+            sql_query = f"SELECT {select_clause} FROM {self.table_name}"
+            if where_clause:
+                sql_query += f" WHERE {where_clause}"
+            if order_clause:
+                sql_query += f" ORDER BY {order_clause}"
+            if limit is not None:
+                sql_query += " LIMIT ?"
+            
+            self._cache_statement(key, sql_query)
+        
+        if limit is not None:
+            params.append(limit)
+        
+        return sql_query, params
+    
     def _build_where_clause(self, query_dict: Dict = None) -> Tuple[str, List]:
         """
         Build a SQL WHERE clause from a dictionary.
@@ -466,47 +1143,87 @@ class SQLiteBase:
         Returns:
             (where_clause, parameters)
         """
-        if not query_dict:
-            return "", []
+        where_shape, params = self._query_shape(query_dict)
+        return self._compile_where(where_shape), params
+    
+    def _query_shape(self, query_dict: Dict = None) -> Tuple[tuple, List]:
+        """
+        Split a query into its shape and its parameter values.
+        
+        Args:
+            query_dict: Dictionary representing the query
             
-        conditions = []
+        Returns:
+            (((field, operator), ...), parameters)
+        """
+        if not query_dict:
+            return (), []
+        
+        shape = []
         params = []
         
         for key, value in query_dict.items():
             if isinstance(value, dict):
                 # Handle operators like $gt, $lt, etc.
                 for op, op_value in value.items():
-                    if op == "$gt":
-                        conditions.append(f"{key} > ?")
-                        params.append(op_value)
-                    elif op == "$gte":
-                        conditions.append(f"{key} >= ?")
-                        params.append(op_value)
-                    elif op == "$lt":
-                        conditions.append(f"{key} < ?")
-                        params.append(op_value)
-                    elif op == "$lte":
-                        conditions.append(f"{key} <= ?")
-                        params.append(op_value)
-                    elif op == "$ne":
-                        conditions.append(f"{key} != ?")
+                    if op not in self.OPERATORS:
+                        continue
+                    if op == "$in":
+                        op_value = list(op_value)
+                        if all(value is None or isinstance(value, self.JSON_SCALARS) for value in op_value):
+                            shape.append((key, op))
+                            params.append(orjson.dumps(op_value).decode("utf-8"))
+                        else:
+                            # bytes, datetimes etc. keep sqlite3's own adapters
+                            shape.append((key, f"$in:{len(op_value)}"))
+                            params.extend(op_value)
+                    else:
+                        shape.append((key, op))
                         params.append(op_value)
-                    elif op == "$in":
-                        placeholders = ", ".join(["?"] * len(op_value))
-                        conditions.append(f"{key} IN ({placeholders})")
-                        params.extend(op_value)
             else:
                 # Simple equality check
-                conditions.append(f"{key} = ?")
+                shape.append((key, "$eq"))
                 params.append(value)
-                
-        if not conditions:
-            return "", []
-            
-        # Combine all conditions with AND
-        where_clause = " AND ".join(conditions)
+        
+        return tuple(shape), params
+    
+    def _compile_where(self, where_shape: tuple) -> str:
+        """
+        Build the WHERE clause text for a query shape, cached.
+        
+        Args:
+            where_shape: ((field, operator), ...) from _query_shape
             
-        return where_clause, params
+        Returns:
+            WHERE clause without the WHERE keyword
+        """
+        if not where_shape:
+            return ""
+        
+        key = ("where", where_shape)
+        where_clause = self.statement_cache.get(key) if self.statement_cache_enabled else None
+        if where_clause is None:
+            # Combine all conditions with AND
+            where_clause = " AND ".join(
+                self._compile_condition(field, op) for field, op in where_shape
+            )
+            self._cache_statement(key, where_clause)
+        
+        return where_clause
+    
+    def _compile_condition(self, field: str, op: str) -> str:
+        if op.startswith("$in:"):
+            # $in with values that cannot go through json_each, one placeholder each
+            placeholders = ", ".join(["?"] * int(op[4:]))
+            return f"{field} IN ({placeholders})"
+        return self.OPERATORS[op].format(field)
+    
+    def _cache_statement(self, key: tuple, sql: str):
+        if not self.statement_cache_enabled:
+            return
+        if len(self.statement_cache) >= self.STATEMENT_CACHE_SIZE:
+            self.statement_cache.clear()
+        self.statement_cache[key] = sql
     
     def _build_select_clause(self, projection: Dict = None) -> str:
         """
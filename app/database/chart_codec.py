@@ -0,0 +1,106 @@
+import zlib
+from typing import Any, Union
+
+import orjson
+
+# Compressed chart contents are stored as a BLOB starting with this marker,
+# followed by a zlib stream. Rows saved before compression hold plain TEXT.
+CONTENT_MARKER = b"MTVZ1"
+
+# TradingView nests the chart layout as a JSON string under this key of the
+# saved content. Patches address it as parsed JSON so they can reach inside it.
+LAYOUT_KEY = "content"
+
+def encode_content(content: str, level: int = 6) -> bytes:
+    """
+    Compress chart content for storage.
+
+    Args:
+        content: Serialized TradingView chart
+        level: zlib compression level (0-9)
+
+    Returns:
+        Marker followed by the zlib stream
+    """
+    return CONTENT_MARKER + zlib.compress(content.encode("utf-8"), level)
+
+def is_encoded(value: Union[str, bytes, None]) -> bool:
+    """
+    Check whether a stored content value was written by encode_content.
+
+    Args:
+        value: Value of the content column
+
+    Returns:
+        True if the value is compressed
+    """
+    return isinstance(value, bytes) and value.startswith(CONTENT_MARKER)
+
+def decode_content(value: Union[str, bytes, None]) -> Union[str, None]:
+    """
+    Restore chart content from its stored form, compressed or not.
+
+    Args:
+        value: Value of the content column
+
+    Returns:
+        Serialized TradingView chart
+    """
+    if is_encoded(value):
+        return zlib.decompress(value[len(CONTENT_MARKER):]).decode("utf-8")
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+def deflate_content(value: Union[str, bytes], level: int = 6) -> bytes:
+    """
+    Get chart content as an HTTP 'deflate' body (a zlib stream). Compressed
+    values are returned without decompressing them.
+
+    Args:
+        value: Value of the content column
+        level: zlib compression level for values stored uncompressed
+
+    Returns:
+        zlib stream of the serialized chart
+    """
+    if is_encoded(value):
+        return value[len(CONTENT_MARKER):]
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return zlib.compress(value, level)
+
+def load_chart_document(content: str) -> Any:
+    """
+    Parse chart content into the document JSON patches are applied to, with
+    the nested layout string parsed as well.
+
+    Args:
+        content: Serialized TradingView chart
+
+    Returns:
+        Parsed chart document
+    """
+    document = orjson.loads(content)
+    if isinstance(document, dict) and isinstance(document.get(LAYOUT_KEY), str):
+        try:
+            document[LAYOUT_KEY] = orjson.loads(document[LAYOUT_KEY])
+        except orjson.JSONDecodeError:
+            pass
+    return document
+
+def dump_chart_document(document: Any) -> str:
+    """
+    Serialize a chart document back to the content TradingView saved,
+    re-nesting the layout as a JSON string.
+
+    Args:
+        document: Document returned by load_chart_document
+
+    Returns:
+        Serialized TradingView chart
+    """
+    if isinstance(document, dict) and isinstance(document.get(LAYOUT_KEY), (dict, list)):
+        document = dict(document)
+        document[LAYOUT_KEY] = orjson.dumps(document[LAYOUT_KEY]).decode("utf-8")
+    return orjson.dumps(document).decode("utf-8")
\ No newline at end of file
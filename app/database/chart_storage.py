@@ -1,18 +1,53 @@
+import asyncio
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple, Union
 
+import orjson
+
+from app.config import settings
 from app.database.base import SQLiteBase
+from app.database.chart_codec import (
+    decode_content, deflate_content, dump_chart_document, encode_content, load_chart_document
+)
+from app.database.json_patch import JsonPatchError, apply_patch
+from app.database.read_cache import ReadCache, invalidates_cache
+
+class ChartRevisionConflict(Exception):
+    """Raised when a patch is based on a revision that is no longer the chart's current one."""
+
+    def __init__(self, revision: int):
+        super().__init__(f"Chart is at revision {revision}")
+        self.revision = revision
 
 class ChartStorageDB:
     """
     Chart storage database class for managing chart data.
+
+    A chart is stored as a base content plus the patches saved on top of it
+    (chart_deltas rows with revision > base_revision). Reads rebuild the current
+    content, and once enough patches pile up a background compaction folds them
+    into a new base.
     """
+    # Fields returned by list_charts, everything except the chart content
+    LIST_PROJECTION = {"id": 1, "name": 1, "symbol": 1, "resolution": 1, "timestamp": 1}
+    # Fields needed to rebuild the current content of a chart
+    CONTENT_PROJECTION = {"id": 1, "content": 1, "revision": 1, "base_revision": 1}
+    # Rebuilt documents kept in memory, so consecutive patches skip the rebuild
+    DOCUMENT_CACHE_SIZE = 8
+    # Rebuilds retried when a compaction moves the base underneath a read
+    REBUILD_ATTEMPTS = 3
+    
     def __init__(self):
         """
         Initialize the chart storage database.
         """
         self.sqlite_base = SQLiteBase("charts_storage")
+        self.deltas_db = SQLiteBase("chart_deltas")
+        self.documents: Dict[int, Tuple[int, Any]] = {}  # chart id -> (revision, document)
+        self.compactions: Dict[int, asyncio.Task] = {}
+        self.cache = ReadCache()
     
+    @invalidates_cache
     async def save_chart(
         self,
         name: str,
@@ -20,9 +55,9 @@ class ChartStorageDB:
         symbol: str,
         resolution: str,
         timestamp: Optional[int] = None
-    ) -> bool:
+    ) -> Optional[Dict]:
         """
-        Save a chart to the database.
+        Save the full content of a chart, replacing its base and any pending patches.
         
         Args:
             name: Chart name
@@ -32,68 +67,146 @@ class ChartStorageDB:
             timestamp: Chart timestamp (milliseconds since epoch)
             
         Returns:
-            True if successful, False otherwise
+            {"id", "revision"} of the saved chart, None on error
         """
         try:
             if timestamp is None:
                 timestamp = int(datetime.now().timestamp() * 1000)
 
-            # Check if chart with the same name exists
-            existing = await self.sqlite_base.find_one({"name": name})
+            document = {
+                "name": name,
+                "content": encode_content(content, settings.CHART_COMPRESSION_LEVEL),
+                "symbol": symbol,
+                "resolution": resolution,
+                "timestamp": timestamp,
+                "update_time": datetime.now().isoformat()
+            }
+
+            async with self.sqlite_base.transaction():
+                existing = await self.sqlite_base.find_one({"name": name}, projection={"id": 1, "revision": 1})
+
+                if existing:
+                    # Overwrite the chart with the same name, its patches are superseded
+                    chart_id = existing["id"]
+                    revision = existing["revision"] + 1
+                    await self.sqlite_base.update_one(
+                        {"id": chart_id},
+                        {"$set": {**document, "revision": revision, "base_revision": revision}}
+                    )
+                    await self.deltas_db.delete_many({"chart_id": chart_id})
+                else:
+                    revision = 0
+                    chart_id = await self.sqlite_base.insert_one(
+                        {**document, "revision": revision, "base_revision": revision}
+                    )
+
+            self.documents.pop(chart_id, None)
+            return {"id": chart_id, "revision": revision}
+                
+        except Exception as e:
+            print(f"Error saving chart: {e}")
+            return None
+
+    @invalidates_cache
+    async def save_chart_patch(
+        self,
+        name: str,
+        patch: List[Dict],
+        base_revision: int,
+        symbol: str,
+        resolution: str,
+        timestamp: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        Save a chart as a JSON patch (RFC 6902) against a known revision. Only
+        the patch is written, as one chart_deltas row.
+        
+        Args:
+            name: Chart name
+            patch: JSON patch against the chart document (see load_chart_document)
+            base_revision: Revision the patch was computed against
+            symbol: Chart symbol
+            resolution: Chart resolution
+            timestamp: Chart timestamp (milliseconds since epoch)
             
-            if existing:
-                # Update existing chart
-                success = await self.sqlite_base.update_one(
-                    {"name": name},
+        Returns:
+            {"id", "revision"} of the saved chart, None if the chart does not exist or on error
+            
+        Raises:
+            ChartRevisionConflict: If the chart is no longer at base_revision
+            JsonPatchError: If the patch does not apply to the chart
+        """
+        try:
+            if timestamp is None:
+                timestamp = int(datetime.now().timestamp() * 1000)
+
+            async with self.sqlite_base.transaction():
+                chart = await self.sqlite_base.find_one(
+                    {"name": name}, projection={"id": 1, "revision": 1, "base_revision": 1}
+                )
+                if not chart:
+                    return None
+                if chart["revision"] != base_revision:
+                    raise ChartRevisionConflict(chart["revision"])
+
+                # Taken out of the cache: a patch failing halfway leaves it modified
+                cached = self.documents.pop(chart["id"], None)
+                if cached and cached[0] == chart["revision"]:
+                    document = cached[1]
+                else:
+                    chart = await self.sqlite_base.find_one({"id": chart["id"]}, projection=self.CONTENT_PROJECTION)
+                    document = await self._load_document(chart, remember=False)
+                    if document is None:
+                        raise RuntimeError(f"Patches of chart {chart['id']} are missing")
+
+                document = apply_patch(document, patch)
+
+                revision = base_revision + 1
+                await self.deltas_db.insert_one({
+                    "chart_id": chart["id"],
+                    "revision": revision,
+                    "patch": orjson.dumps(patch).decode("utf-8"),
+                    "create_time": datetime.now().isoformat()
+                })
+                await self.sqlite_base.update_one(
+                    {"id": chart["id"]},
                     {"$set": {
-                        "content": content,
+                        "revision": revision,
                         "symbol": symbol,
                         "resolution": resolution,
                         "timestamp": timestamp,
                         "update_time": datetime.now().isoformat()
                     }}
                 )
-                return success
-            else:
-                # Insert new chart
-                doc_id = await self.sqlite_base.insert_one({
-                    "name": name,
-                    "content": content,
-                    "symbol": symbol,
-                    "resolution": resolution,
-                    "timestamp": timestamp,
-                    "update_time": datetime.now().isoformat()
-                })
-                return doc_id is not None
-                
+
+            self._remember(chart["id"], revision, document)
+
+            if revision - chart["base_revision"] >= settings.CHART_DELTA_COMPACT_THRESHOLD:
+                self._schedule_compaction(chart["id"])
+
+            return {"id": chart["id"], "revision": revision}
+
+        except (ChartRevisionConflict, JsonPatchError):
+            # Nothing was written, the transaction was rolled back
+            raise
         except Exception as e:
-            print(f"Error saving chart: {e}")
-            return False
+            print(f"Error saving chart patch: {e}")
+            return None
         
     async def get_latest_chart(self) -> Dict:
         """
-        Get the latest chart by timestamp.
+        Get the latest chart by timestamp, cached until the next chart write.
         
         Returns:
             Latest chart or None if no charts exist
         """
         try:
-            # Use sort to get the chart with the highest timestamp
-            charts = await self.sqlite_base.find_many(
-                query={},
-                sort=[("timestamp", -1)],
-                limit=1
-            )
-            
-            if not charts:
-                return None
-                
-            return charts[0]
+            return await self.cache.get("latest", self._load_latest_chart)
                 
         except Exception as e:
             print(f"Error getting latest chart: {e}")
             return {}
-        
+
     async def get_chart(self, id: int) -> Optional[Dict]:
         """
         Get a chart by ID.
@@ -105,12 +218,42 @@ class ChartStorageDB:
             Chart or None if not found
         """
         try:
-            return await self.sqlite_base.find_one({"id": id})
+            chart = await self.sqlite_base.find_one({"id": id})
+            return await self._decode_chart(chart) if chart else None
                 
         except Exception as e:
             print(f"Error getting chart: {e}")
             return None
 
+    async def get_chart_content(self, id: int, deflate: bool = False) -> Optional[Union[str, bytes]]:
+        """
+        Get only the content of a chart.
+        
+        Args:
+            id: Chart ID
+            deflate: Return the content as a zlib stream for a
+                     'Content-Encoding: deflate' response instead of text
+            
+        Returns:
+            Chart content or None if not found
+        """
+        try:
+            chart = await self.sqlite_base.find_one({"id": id}, projection=self.CONTENT_PROJECTION)
+            if not chart:
+                return None
+            
+            content = await self._current_content(chart)
+            if content is None:
+                return None
+            
+            if deflate:
+                return deflate_content(content, settings.CHART_COMPRESSION_LEVEL)
+            return decode_content(content)
+                
+        except Exception as e:
+            print(f"Error getting chart content: {e}")
+            return None
+
     async def get_all_charts(self) -> List[Dict]:
         """
         Get all charts, sorted by timestamp in descending order.
@@ -120,15 +263,52 @@ class ChartStorageDB:
         """
         try:
             # Use find_many with sort to get all charts sorted by timestamp
-            return await self.sqlite_base.find_many(
+            charts = await self.sqlite_base.find_many(
                 query={},
                 sort=[("timestamp", -1)]
             )
+            return [await self._decode_chart(chart) for chart in charts]
                 
         except Exception as e:
             print(f"Error getting all charts: {e}")
             return []
 
+    async def list_charts(self) -> List[Dict]:
+        """
+        Get the metadata of all charts, newest first, without their content.
+        Served entirely from the idx_chart_timestamp covering index.
+        
+        Returns:
+            List of {id, name, symbol, resolution, timestamp}
+        """
+        try:
+            return await self.sqlite_base.find_many(
+                query={},
+                projection=self.LIST_PROJECTION,
+                sort=[("timestamp", -1)]
+            )
+                
+        except Exception as e:
+            print(f"Error listing charts: {e}")
+            return []
+
+    async def search_charts(self, text: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        Search charts by name and symbol, best matches first, without their content.
+        
+        Args:
+            text: Search text
+            limit: Maximum number of charts to return
+            offset: Number of matches to skip
+            
+        Returns:
+            List of {id, name, symbol, resolution, timestamp}
+        """
+        return await self.sqlite_base.search(
+            text, "charts_fts", projection=self.LIST_PROJECTION, limit=limit, offset=offset
+        )
+
+    @invalidates_cache
     async def delete_chart(self, id: int) -> bool:
         """
         Delete a chart by ID.
@@ -140,8 +320,178 @@ class ChartStorageDB:
             True if successful, False otherwise
         """
         try:
+            # Patches go with the chart (ON DELETE CASCADE)
+            self.documents.pop(id, None)
             return await self.sqlite_base.delete_one({"id": id})
                 
         except Exception as e:
             print(f"Error deleting chart: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    async def compact_chart(self, id: int) -> bool:
+        """
+        Fold the pending patches of a chart into a new base content and drop them.
+        
+        Args:
+            id: Chart ID
+            
+        Returns:
+            True if patches were folded, False if there was nothing to do or on error
+        """
+        try:
+            chart = await self.sqlite_base.find_one({"id": id}, projection=self.CONTENT_PROJECTION)
+            if not chart or chart["revision"] == chart["base_revision"]:
+                return False
+
+            # Rebuilt outside the transaction, the write lock is only held for the swap
+            document = await self._load_document(chart)
+            if document is None:
+                return False
+            content = encode_content(dump_chart_document(document), settings.CHART_COMPRESSION_LEVEL)
+
+            async with self.sqlite_base.transaction():
+                current = await self.sqlite_base.find_one({"id": id}, projection={"base_revision": 1})
+                if not current or current["base_revision"] != chart["base_revision"]:
+                    # A full save or another compaction replaced the base meanwhile
+                    return False
+
+                await self.sqlite_base.update_one(
+                    {"id": id},
+                    {"$set": {"content": content, "base_revision": chart["revision"]}}
+                )
+                await self.deltas_db.delete_many({"chart_id": id, "revision": {"$lte": chart["revision"]}})
+
+            return True
+
+        except Exception as e:
+            print(f"Error compacting chart: {e}")
+            return False
+
+    async def close(self):
+        """
+        Wait for running compactions to finish.
+        """
+        if self.compactions:
+            await asyncio.gather(*self.compactions.values(), return_exceptions=True)
+
+    async def _load_latest_chart(self) -> Optional[Dict]:
+        """
+        Read the latest chart from the database, see get_latest_chart.
+        """
+        # Use sort to get the chart with the highest timestamp
+        charts = await self.sqlite_base.find_many(
+            query={},
+            sort=[("timestamp", -1)],
+            limit=1
+        )
+        
+        if not charts:
+            return None
+            
+        return await self._decode_chart(charts[0])
+        
+    async def _decode_chart(self, chart: Dict) -> Dict:
+        """
+        Replace the stored (possibly compressed) content of a chart row with its
+        current text, pending patches applied.
+        
+        Args:
+            chart: Chart row
+            
+        Returns:
+            The same chart with decoded content
+        """
+        chart["content"] = decode_content(await self._current_content(chart))
+        return chart
+
+    async def _current_content(self, chart: Dict) -> Optional[Union[str, bytes]]:
+        """
+        Get the current content of a chart row: the stored value when it has
+        no pending patches, the rebuilt text otherwise.
+        
+        Args:
+            chart: Chart row with the CONTENT_PROJECTION fields
+            
+        Returns:
+            Content as accepted by decode_content/deflate_content, None if the chart was deleted
+        """
+        for _ in range(self.REBUILD_ATTEMPTS):
+            if chart["revision"] == chart["base_revision"]:
+                return chart["content"]
+
+            document = await self._load_document(chart)
+            if document is not None:
+                return dump_chart_document(document)
+
+            # Compacted between reading the chart and its patches, read it again
+            chart = await self.sqlite_base.find_one({"id": chart["id"]}, projection=self.CONTENT_PROJECTION)
+            if not chart:
+                return None
+
+        raise RuntimeError(f"Chart {chart['id']} kept changing while it was rebuilt")
+
+    async def _load_document(self, chart: Dict, remember: bool = True) -> Optional[Any]:
+        """
+        Rebuild the document of a chart row from its base content and patches.
+        The returned document may be shared with the cache and must not be modified.
+        
+        Args:
+            chart: Chart row with the CONTENT_PROJECTION fields
+            remember: Keep the rebuilt document in the cache
+            
+        Returns:
+            Chart document, None if its patches were compacted after the row was read
+        """
+        cached = self.documents.get(chart["id"])
+        if cached and cached[0] == chart["revision"]:
+            return cached[1]
+
+        document = load_chart_document(decode_content(chart["content"]))
+        if chart["revision"] == chart["base_revision"]:
+            return document
+
+        deltas = await self.deltas_db.find_many(
+            query={"chart_id": chart["id"], "revision": {"$gt": chart["base_revision"], "$lte": chart["revision"]}},
+            projection={"patch": 1},
+            sort=[("revision", 1)]
+        )
+        if len(deltas) != chart["revision"] - chart["base_revision"]:
+            return None
+
+        for delta in deltas:
+            document = apply_patch(document, orjson.loads(delta["patch"]))
+
+        if remember:
+            self._remember(chart["id"], chart["revision"], document)
+        return document
+
+    def _remember(self, id: int, revision: int, document: Any):
+        """
+        Cache the document of a chart at a revision, unless a newer one is cached.
+        
+        Args:
+            id: Chart ID
+            revision: Revision of the document
+            document: Chart document
+        """
+        cached = self.documents.pop(id, None)
+        if cached and cached[0] > revision:
+            document, revision = cached[1], cached[0]
+        self.documents[id] = (revision, document)
+
+        while len(self.documents) > self.DOCUMENT_CACHE_SIZE:
+            self.documents.pop(next(iter(self.documents)))
+
+    def _schedule_compaction(self, id: int):
+        """
+        Start a background compaction of a chart, unless one is already running.
+        
+        Args:
+            id: Chart ID
+        """
+        if id in self.compactions:
+            return
+
+        task = asyncio.create_task(self.compact_chart(id))
+        self.compactions[id] = task
+        task.add_done_callback(lambda _: self.compactions.pop(id, None))
\ No newline at end of file
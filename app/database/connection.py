@@ -1,13 +1,40 @@
 import os
-from typing import Optional
+import asyncio
+import pathlib
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 
 import aiosqlite
 
 from app.config import settings
+from app.database.migrations import migrate
+
+# Writer connection of the transaction the current task is running in
+_transaction_conn: ContextVar[Optional[aiosqlite.Connection]] = ContextVar("transaction_conn", default=None)
 
 class DB:
-    db_conn = None
+    """
+    SQLite connections shared by the application.
+
+    All writes go through a single writer connection, serialized by a lock.
+    Reads are served by a small pool of read-only connections, which WAL mode
+    lets run concurrently with the writer.
+
+    With group commit enabled, writes arriving within a short window are
+    executed in one transaction and every caller resumes after the shared commit.
+
+    Inside `DB.transaction()` reads and writes of the current task run on the
+    writer connection and are committed together when the block exits.
+    """
+    db_conn = None  # Writer connection
     db_path: Optional[str]= None
+    reader_conns: List[aiosqlite.Connection] = []
+    readers: Optional[asyncio.Queue] = None
+    write_lock: Optional[asyncio.Lock] = None
+    pending_writes: List[Tuple[str, Sequence, bool, asyncio.Future]] = []
+    flush_task: Optional[asyncio.Task] = None
+    connect_lock: Optional[asyncio.Lock] = None
 
     @classmethod
     async def get_db(cls):
@@ -17,92 +44,234 @@ class DB:
 
     @classmethod
     async def connect(cls):
-        if cls.db_conn is None:
+        if cls.connect_lock is None:
+            cls.connect_lock = asyncio.Lock()
+
+        async with cls.connect_lock:
+            if cls.db_conn is not None:
+                return
+
             cls.db_path = os.path.join(settings.DB_DIR, "app_data.db")
 
-            cls.db_conn = await aiosqlite.connect(cls.db_path)
+            db_conn = await aiosqlite.connect(
+                cls.db_path, cached_statements=settings.DB_STATEMENT_CACHE_SIZE
+            )
 
-            await cls.db_conn.execute("PRAGMA foreign_keys = ON")
+            # WAL is persistent in the database file, readers inherit it
+            await db_conn.execute("PRAGMA journal_mode = WAL")
+            await cls.apply_pragmas(db_conn)
 
-            cls.db_conn.row_factory = aiosqlite.Row
+            db_conn.row_factory = aiosqlite.Row
+            cls.write_lock = asyncio.Lock()
 
             print(f"Connected to SQLite at {cls.db_path}")
 
-            await cls.init_schema()
+            await migrate(db_conn)
+
+            # Open readers after the schema exists
+            readers = asyncio.Queue()
+            reader_conns = []
+            for _ in range(max(1, settings.DB_READER_POOL_SIZE)):
+                reader = await aiosqlite.connect(
+                    pathlib.Path(cls.db_path).as_uri() + "?mode=ro",
+                    uri=True,
+                    cached_statements=settings.DB_STATEMENT_CACHE_SIZE
+                )
+                await cls.apply_pragmas(reader)
+                await reader.execute("PRAGMA query_only = ON")
+                reader.row_factory = aiosqlite.Row
+                reader_conns.append(reader)
+                readers.put_nowait(reader)
+
+            cls.reader_conns = reader_conns
+            cls.readers = readers
+
+            # Published last: callers treat a set db_conn as "ready to use"
+            cls.db_conn = db_conn
 
     @classmethod
-    async def init_schema(cls):
-        async with cls.db_conn.cursor() as cursor:
-            # Create charts_storage table
-            await cursor.execute("""
-            CREATE TABLE IF NOT EXISTS charts_storage (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                content TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                resolution TEXT NOT NULL,
-                timestamp INTEGER NOT NULL,
-                update_time TEXT NOT NULL
-            )
-            """)
-            
-            # Create a unique index on the name column for charts_storage
-            await cursor.execute("""
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_chart_name ON charts_storage (name)
-            """)
-            
-            # Create watch_lists table to store list metadata
-            await cursor.execute("""
-            CREATE TABLE IF NOT EXISTS watch_lists (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                description TEXT,
-                create_time TEXT NOT NULL,
-                update_time TEXT NOT NULL
-            )
-            """)
-            
-            # Create watch_list_items table to store symbols in each list
-            await cursor.execute("""
-            CREATE TABLE IF NOT EXISTS watch_list_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                list_id INTEGER NOT NULL,
-                symbol TEXT NOT NULL,
-                full_name TEXT NOT NULL,
-                description TEXT,
-                exchange TEXT NOT NULL,
-                create_time TEXT NOT NULL,
-                update_time TEXT NOT NULL,
-                FOREIGN KEY (list_id) REFERENCES watch_lists (id) ON DELETE CASCADE,
-                UNIQUE (list_id, symbol, exchange)
-            )
-            """)
-            
-            # Create an index on list_id for faster queries
-            await cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_watch_list_items_list_id 
-            ON watch_list_items (list_id)
-            """)
-
-            await cursor.execute("""
-            CREATE TABLE IF NOT EXISTS markets_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                exchange TEXT NOT NULL,
-                symbols TEXT NOT NULL,
-                last_updated INTEGER NOT NULL,
-                UNIQUE(exchange)
-            )
-            """)
+    async def apply_pragmas(cls, conn: aiosqlite.Connection):
+        await conn.execute("PRAGMA foreign_keys = ON")
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        await conn.execute("PRAGMA busy_timeout = 5000")
+        await conn.execute("PRAGMA temp_store = MEMORY")
+        await conn.execute(f"PRAGMA cache_size = -{int(settings.DB_CACHE_SIZE_KB)}")
+        await conn.execute(f"PRAGMA mmap_size = {int(settings.DB_MMAP_SIZE)}")
+
+    @classmethod
+    @asynccontextmanager
+    async def reader(cls) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Borrow a read-only connection from the pool.
+
+        Yields:
+            Read-only connection, returned to the pool on exit
+        """
+        # Reads inside a transaction must see its uncommitted writes
+        tx_conn = _transaction_conn.get()
+        if tx_conn is not None:
+            yield tx_conn
+            return
+
+        if cls.db_conn is None:
+            await cls.connect()
+
+        conn = await cls.readers.get()
+        try:
+            yield conn
+        finally:
+            cls.readers.put_nowait(conn)
+
+    @classmethod
+    @asynccontextmanager
+    async def transaction(cls) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Run a block of reads and writes as one transaction on the writer.
+        Nested blocks join the outer transaction.
+
+        Yields:
+            Writer connection, committed on exit or rolled back on error
+        """
+        tx_conn = _transaction_conn.get()
+        if tx_conn is not None:
+            yield tx_conn
+            return
+
+        db = await cls.get_db()
+
+        async with cls.write_lock:
+            token = _transaction_conn.set(db)
+            try:
+                await db.execute("BEGIN IMMEDIATE")
+                yield db
+                await db.commit()
+            except BaseException:
+                if db.in_transaction:
+                    await db.rollback()
+                raise
+            finally:
+                _transaction_conn.reset(token)
+
+    @classmethod
+    def in_transaction(cls) -> bool:
+        """Whether the current task is running inside DB.transaction()"""
+        return _transaction_conn.get() is not None
+
+    @classmethod
+    async def execute_write(
+        cls, query: str, params: Sequence = (), many: bool = False
+    ) -> Tuple[int, Optional[int]]:
+        """
+        Execute a write statement on the writer connection and commit it.
+
+        Args:
+            query: SQL statement
+            params: Statement parameters, or a list of parameter sets when many is True
+            many: Whether to use executemany
+
+        Returns:
+            (rowcount, lastrowid)
+        """
+        tx_conn = _transaction_conn.get()
+        if tx_conn is not None:
+            # Committed by the enclosing transaction
+            if many:
+                cursor = await tx_conn.executemany(query, params)
+            else:
+                cursor = await tx_conn.execute(query, params)
+            return cursor.rowcount, cursor.lastrowid
+
+        db = await cls.get_db()
+
+        if settings.DB_GROUP_COMMIT:
+            future = asyncio.get_running_loop().create_future()
+            cls.pending_writes.append((query, params, many, future))
+            if cls.flush_task is None:
+                cls.flush_task = asyncio.create_task(cls._flush_writes())
+            return await future
 
-            await cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_market_exchange ON markets_cache (exchange)
-            """)
-            
-            await cls.db_conn.commit()
+        async with cls.write_lock:
+            try:
+                if many:
+                    cursor = await db.executemany(query, params)
+                else:
+                    cursor = await db.execute(query, params)
+                result = (cursor.rowcount, cursor.lastrowid)
+                await db.commit()
+                return result
+            except Exception:
+                await db.rollback()
+                raise
+
+    @classmethod
+    async def _flush_writes(cls):
+        """Execute the pending writes in one transaction and resolve their futures"""
+        try:
+            await asyncio.sleep(settings.DB_GROUP_COMMIT_WINDOW_MS / 1000)
+        except asyncio.CancelledError:
+            # Nothing was executed yet, fail the waiting writers instead of leaving them hanging
+            batch, cls.pending_writes = cls.pending_writes, []
+            cls.flush_task = None
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Write cancelled before it was committed"))
+            raise
+
+        async with cls.write_lock:
+            # Writes arriving from here on start the next batch
+            batch, cls.pending_writes = cls.pending_writes, []
+            cls.flush_task = None
+
+            db = cls.db_conn
+            done = []
+
+            try:
+                await db.execute("BEGIN")
+
+                for query, params, many, future in batch:
+                    try:
+                        if many:
+                            cursor = await db.executemany(query, params)
+                        else:
+                            cursor = await db.execute(query, params)
+                        done.append((future, (cursor.rowcount, cursor.lastrowid)))
+                    except Exception as e:
+                        # A failed statement only undoes itself, unless sqlite
+                        # had to abandon the whole transaction
+                        if not future.done():
+                            future.set_exception(e)
+                        if not db.in_transaction:
+                            for other, _ in done:
+                                if not other.done():
+                                    other.set_exception(e)
+                            done = []
+                            await db.execute("BEGIN")
+
+                await db.commit()
+
+                for future, result in done:
+                    if not future.done():
+                        future.set_result(result)
+
+            except Exception as e:
+                if db.in_transaction:
+                    await db.rollback()
+                for _, _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
 
     @classmethod
     async def close(cls):
+        if cls.flush_task is not None:
+            await cls.flush_task
+
+        for reader in cls.reader_conns:
+            await reader.close()
+        cls.reader_conns = []
+        cls.readers = None
+
         if cls.db_conn:
             await cls.db_conn.close()
             cls.db_conn = None
+            cls.connect_lock = None
             print("Database connection closed")
\ No newline at end of file
@@ -0,0 +1,153 @@
+from typing import Any, List, Tuple
+
+class JsonPatchError(ValueError):
+    """Raised when a JSON patch is malformed or does not apply to the document."""
+
+def parse_pointer(pointer: str) -> List[str]:
+    """
+    Split a JSON pointer (RFC 6901) into its unescaped reference tokens.
+
+    Args:
+        pointer: JSON pointer, e.g. '/charts/0/panes'
+
+    Returns:
+        List of reference tokens, empty for the whole document
+    """
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+def _array_index(array: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(array)
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+
+    index = int(token)
+    if index > len(array) or (index == len(array) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+def _resolve_parent(document: Any, tokens: List[str]) -> Tuple[Any, str]:
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, dict):
+            if token not in target:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_array_index(target, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return target, tokens[-1]
+
+def _get(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        return document
+
+    parent, token = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent[token]
+    if isinstance(parent, list):
+        return parent[_array_index(parent, token, allow_end=False)]
+    raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+
+    parent, token = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to /{'/'.join(tokens)}")
+    return document
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+
+    parent, token = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_array_index(parent, token, allow_end=False))
+    raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_value(item) for item in value]
+    return value
+
+def apply_patch(document: Any, patch: List[dict]) -> Any:
+    """
+    Apply a JSON patch (RFC 6902) to a parsed JSON document.
+
+    The document is modified in place; a patch that fails halfway leaves it
+    partially applied, so callers must not keep a document that raised.
+
+    Args:
+        document: Parsed JSON document
+        patch: List of operations (add, remove, replace, move, copy, test)
+
+    Returns:
+        The patched document (a new object only when the root is replaced)
+
+    Raises:
+        JsonPatchError: If the patch is malformed or does not apply
+    """
+    if not isinstance(patch, list):
+        raise JsonPatchError("A JSON patch must be a list of operations")
+
+    for operation in patch:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JsonPatchError(f"Invalid patch operation: {operation!r}")
+
+        op = operation["op"]
+        tokens = parse_pointer(operation["path"])
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"'{op}' requires a value")
+
+        if op == "add":
+            document = _add(document, tokens, _copy_value(operation["value"]))
+        elif op == "remove":
+            _remove(document, tokens)
+        elif op == "replace":
+            if not tokens:
+                document = _copy_value(operation["value"])
+            else:
+                _get(document, tokens)
+                parent, token = _resolve_parent(document, tokens)
+                if isinstance(parent, list):
+                    parent[_array_index(parent, token, allow_end=False)] = _copy_value(operation["value"])
+                else:
+                    parent[token] = _copy_value(operation["value"])
+        elif op in ("move", "copy"):
+            if "from" not in operation:
+                raise JsonPatchError(f"'{op}' requires from")
+            source = parse_pointer(operation["from"])
+            if op == "move":
+                if tokens[:len(source)] == source and tokens != source:
+                    raise JsonPatchError("Cannot move a value into one of its children")
+                value = _remove(document, source)
+            else:
+                value = _copy_value(_get(document, source))
+            document = _add(document, tokens, value)
+        elif op == "test":
+            if _get(document, tokens) != operation["value"]:
+                raise JsonPatchError(f"Test failed at {operation['path']}")
+        else:
+            raise JsonPatchError(f"Unsupported patch operation: {op!r}")
+
+    return document
\ No newline at end of file
@@ -1,239 +1,431 @@
-import json
+import asyncio
 from datetime import datetime
 from typing import Dict, Optional, Any, List, Callable
 
+from app.config import settings
 from app.database.base import SQLiteBase
+from app.database.symbol_index import SymbolIndex, VenueIndex, normalize_symbol
+
+# Columns of a markets row besides the exchange
+MARKET_FIELDS = ("symbol", "market_id", "base", "quote", "type", "price_precision", "amount_precision", "active")
+
+class ExchangeMarkets:
+    """
+    In-memory mirror of the markets of one exchange, loaded once per refresh.
+    A refresh builds a new mirror instead of changing this one.
+    """
+    def __init__(self, markets: List[Dict], last_updated: int, source: str):
+        """
+        Build the mirror.
+
+        Args:
+            markets: Rows of the markets table for the exchange
+            last_updated: Timestamp of the refresh the rows come from
+            source: "cache" if read from the database, "exchange" if just fetched
+        """
+        self.markets: Dict[str, Dict] = {
+            market["symbol"]: {field: market.get(field) for field in MARKET_FIELDS}
+            for market in markets
+        }
+        for market in self.markets.values():
+            market["active"] = market["active"] is None or bool(market["active"])
+        self.last_updated = last_updated
+        self.source = source
+        self.symbols = [symbol for symbol, market in self.markets.items() if market["active"]]
+
+        # Normalized key -> symbol, so 'BTCUSDT' finds 'BTC/USDT' and kraken's
+        # 'XBTUSDT' finds it too. Unified symbols go after the native ids, and
+        # spot pairs last, so they win over derivatives with the same key.
+        self.keys: Dict[str, str] = {}
+        for symbol, market in self.markets.items():
+            if market["market_id"]:
+                self.keys[normalize_symbol(market["market_id"])] = symbol
+        for symbol in sorted(self.markets, key=lambda symbol: ":" not in symbol):
+            self.keys[normalize_symbol(symbol)] = symbol
+
+        self._index: Optional[SymbolIndex] = None
+
+    @property
+    def index(self) -> SymbolIndex:
+        """Search index over the active symbols, built on first use"""
+        if self._index is None:
+            self._index = SymbolIndex(self.symbols, self.source)
+        return self._index
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """
+        Get the metadata of a market.
+
+        Args:
+            symbol: Unified symbol (e.g. 'BTC/USDT'), one without separators ('BTCUSDT')
+                    or the exchange's market id
+
+        Returns:
+            Market dict or None if the exchange has no such market
+        """
+        market = self.markets.get(symbol)
+        if market is None and normalize_symbol(symbol) in self.keys:
+            market = self.markets[self.keys[normalize_symbol(symbol)]]
+        return market
 
 class MarketCache:
     """
     Cache for trading pairs from different exchanges.
-    Data is stored in SQLite with a 30-day expiration period.
+    Markets are stored one row each in SQLite and mirrored in memory per
+    exchange (see ExchangeMarkets).
+
+    Cached markets are served stale-while-revalidate: past the soft TTL
+    (settings.MARKETS_SOFT_TTL_HOURS) a read still gets them at once and
+    starts one background refresh. Only an exchange with nothing cached
+    makes the caller wait for the exchange API.
     """
     def __init__(self):
         """Initialize the market cache with SQLiteBase."""
         self.sqlite_base = SQLiteBase("markets_cache")
-        
-    async def init_schema(self, db):
-        """
-        Initialize the schema for the markets_cache table.
-        This should be called during application startup.
-        """
-        async with db.cursor() as cursor:
-            # Create markets_cache table (simplified to store only symbols)
-            await cursor.execute("""
-            CREATE TABLE IF NOT EXISTS markets_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                exchange TEXT NOT NULL,
-                symbols TEXT NOT NULL,
-                last_updated INTEGER NOT NULL,
-                UNIQUE(exchange)
-            )
-            """)
-            
-            # Create index on exchange for faster lookups
-            await cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_market_exchange ON markets_cache (exchange)
-            """)
-            
-            await db.commit()
-    
-    async def get_symbols(self, exchange_name: str, fetch_symbols_func: Callable, max_age_days: int = 30) -> Dict[str, Any]:
-        """
-        Get trading symbols for a specific exchange, either from cache or from the exchange API.
-        
+        self.markets_db = SQLiteBase("markets")
+        self.mirrors: Dict[str, ExchangeMarkets] = {}
+        # Running refresh per exchange, shared by every caller waiting for it
+        self.refreshes: Dict[str, asyncio.Task] = {}
+        # Time of the last failed refresh per exchange, retried after MARKETS_REFRESH_RETRY_SECONDS
+        self.failures: Dict[str, float] = {}
+        # Exchanges listing each currency and pair, over all mirrors
+        self.venues = VenueIndex()
+        self.venues_loaded = False
+
+    async def get_markets(self, exchange_name: str, fetch_markets_func: Callable) -> Optional[ExchangeMarkets]:
+        """
+        Get the markets of an exchange from the in-memory mirror or the database,
+        refreshing them in the background when stale. Waits for the exchange API
+        only when nothing is cached.
+
         Args:
             exchange_name: Name of the exchange
-            fetch_symbols_func: Function to fetch symbols if cache is invalid (async function that returns list of symbols)
-            max_age_days: Maximum age of cached data in days
-            
+            fetch_markets_func: Async function returning a list of market dicts with
+                                the MARKET_FIELDS keys
+
         Returns:
-            Dict containing list of symbols
+            ExchangeMarkets or None if no markets are available
         """
         try:
-            # Check if we have valid cached data
-            cached_symbols = await self._get_from_cache(exchange_name, max_age_days)
-            if cached_symbols:
-                return {"symbols": cached_symbols, "source": "cache"}
-            
-            # If no valid cache, fetch using the provided function
-            symbols = await fetch_symbols_func(exchange_name)
-            if symbols:
-                # Save to cache
-                await self._save_to_cache(exchange_name, symbols)
-                return {"symbols": symbols, "source": "exchange"}
-            
-            return {}
+            mirror = self.mirrors.get(exchange_name)
+            if mirror is None:
+                mirror = await self._get_from_cache(exchange_name)
+                if mirror is not None:
+                    # A refresh may have finished while reading
+                    mirror = self.mirrors.get(exchange_name) or self._set_mirror(exchange_name, mirror)
+
+            if mirror is None:
+                # Shielded: a cancelled request must not cancel the refresh others wait for
+                return await asyncio.shield(self._start_refresh(exchange_name, fetch_markets_func))
+
+            age = datetime.now().timestamp() - mirror.last_updated
+            if age > settings.MARKETS_SOFT_TTL_HOURS * 60 * 60:
+                self._start_refresh(exchange_name, fetch_markets_func)
+
+            return mirror
         except Exception as e:
-            print(f"Error getting symbols for {exchange_name}: {e}")
+            print(f"Error getting markets for {exchange_name}: {e}")
+            return None
+
+    async def get_symbols(self, exchange_name: str, fetch_markets_func: Callable) -> Dict[str, Any]:
+        """
+        Get the active trading symbols for a specific exchange, either from cache or from the exchange API.
+
+        Args:
+            exchange_name: Name of the exchange
+            fetch_markets_func: Function to fetch markets if none are cached
+
+        Returns:
+            Dict containing list of symbols
+        """
+        mirror = await self.get_markets(exchange_name, fetch_markets_func)
+        if mirror is None:
             return {}
-    
-    async def get_usdt_pairs(self, exchange_name: str, fetch_symbols_func: Callable, max_age_days: int = 30) -> Dict:
+
+        return {"symbols": mirror.symbols, "source": mirror.source}
+
+    async def get_usdt_pairs(self, exchange_name: str, fetch_markets_func: Callable) -> Dict:
         """
         Get all USDT trading pairs for a specific exchange.
-        
+
         Args:
             exchange_name: Name of the exchange
-            fetch_symbols_func: Function to fetch symbols if cache is invalid
-            max_age_days: Maximum age of cached data in days
-            
+            fetch_markets_func: Function to fetch markets if none are cached
+
         Returns:
             Dict containing USDT trading pairs
         """
         try:
             # Get all symbols (either from cache or fresh)
-            symbols_data = await self.get_symbols(exchange_name, fetch_symbols_func, max_age_days)
-            
-            if "error" in symbols_data:
-                return symbols_data
-            
+            symbols_data = await self.get_symbols(exchange_name, fetch_markets_func)
+
+            if "symbols" not in symbols_data:
+                return {"error": f"No markets found for {exchange_name}"}
+
             all_symbols = symbols_data["symbols"]
-            
+
             # Filter out USDT pairs
             usdt_pairs = [symbol for symbol in all_symbols if symbol.endswith('/USDT')]
-            
+
             return {"pairs": usdt_pairs, "source": symbols_data["source"]}
         except Exception as e:
             return {"error": str(e)}
-    
-    async def check_pair_exists(self, exchange_name: str, symbol: str, fetch_symbols_func: Callable, max_age_days: int = 30) -> bool:
+
+    async def check_pair_exists(self, exchange_name: str, symbol: str, fetch_markets_func: Callable) -> bool:
         """
         Check if a specific trading pair exists on an exchange.
-        
+
         Args:
             exchange_name: Name of the exchange
             symbol: Trading pair symbol (e.g. 'BTC/USDT')
-            fetch_symbols_func: Function to fetch symbols if cache is invalid
-            max_age_days: Maximum age of cached data in days
-            
+            fetch_markets_func: Function to fetch markets if none are cached
+
         Returns:
             True if the pair exists, False otherwise
         """
-        try:
-            # Get all symbols (either from cache or fresh)
-            symbols_data = await self.get_symbols(exchange_name, fetch_symbols_func, max_age_days)
-            
-            if "error" in symbols_data:
-                return False
-            
-            all_symbols = symbols_data["symbols"]
-            
-            # Check if the symbol exists
-            return symbol in all_symbols
-        except Exception as e:
-            print(f"Error checking if pair exists: {e}")
-            return False
-    
-    async def search_pairs(self, exchange_name: str, search_text: str, fetch_symbols_func: Callable, max_age_days: int = 30) -> Dict:
+        mirror = await self.get_markets(exchange_name, fetch_markets_func)
+        return mirror is not None and symbol in mirror.markets
+
+    async def get_market(self, exchange_name: str, symbol: str, fetch_markets_func: Callable) -> Optional[Dict]:
         """
-        Search for trading pairs containing the search text.
-        
+        Get the metadata of one market: base, quote, type, precisions and active flag.
+
+        Args:
+            exchange_name: Name of the exchange
+            symbol: Trading pair symbol, with or without separators
+            fetch_markets_func: Function to fetch markets if none are cached
+
+        Returns:
+            Market dict or None if not found
+        """
+        mirror = await self.get_markets(exchange_name, fetch_markets_func)
+        if mirror is None:
+            return None
+
+        return mirror.get(symbol)
+
+    async def search_pairs(self, exchange_name: str, search_text: str, fetch_markets_func: Callable, limit: int = 50, offset: int = 0) -> Dict:
+        """
+        Search for trading pairs matching the search text, best matches first.
+
         Args:
             exchange_name: Name of the exchange
             search_text: Text to search for in symbol names
-            fetch_symbols_func: Function to fetch symbols if cache is invalid
-            max_age_days: Maximum age of cached data in days
-            
+            fetch_markets_func: Function to fetch markets if none are cached
+            limit: Maximum number of pairs to return
+            offset: Number of matching pairs to skip
+
         Returns:
-            Dict containing matching trading pairs
+            Dict containing a page of matching trading pairs and the total match count
         """
         try:
-            # Get all symbols (either from cache or fresh)
-            symbols_data = await self.get_symbols(exchange_name, fetch_symbols_func, max_age_days)
-            
-            if "error" in symbols_data:
-                return symbols_data
-            
-            all_symbols = symbols_data["symbols"]
-            
-            # Filter by search text
-            search_text = search_text.upper()
-            matching_pairs = [symbol for symbol in all_symbols if search_text in symbol.upper()]
-            
-            return {"pairs": matching_pairs, "source": symbols_data["source"]}
+            mirror = await self.get_markets(exchange_name, fetch_markets_func)
+            if mirror is None:
+                return {}
+
+            pairs, total = mirror.index.search(search_text, limit, offset)
+            return {"pairs": pairs, "total": total, "source": mirror.source}
         except Exception as e:
             return {"error": str(e)}
-    
+
+    async def find_venues(self, base: str, quote: Optional[str], fetch_markets_func: Callable) -> Dict[str, List[str]]:
+        """
+        Find the exchanges listing a currency or a pair, over every exchange with cached markets.
+
+        Args:
+            base: Base currency, or a whole pair ('BTC/USDT', 'BTCUSDT') when quote is None
+            quote: Quote currency, None to match the base alone or a whole pair
+            fetch_markets_func: Function to refresh stale markets in the background
+
+        Returns:
+            Dict of exchange -> native symbols
+        """
+        try:
+            if not self.venues_loaded:
+                # Index every cached exchange, not only the ones requested since startup
+                for entry in await self.sqlite_base.find_many(projection={"exchange": 1}):
+                    await self.get_markets(entry["exchange"], fetch_markets_func)
+                self.venues_loaded = True
+
+            # Keeps the index fresh: stale exchanges start their background refresh
+            for exchange_name in list(self.mirrors):
+                await self.get_markets(exchange_name, fetch_markets_func)
+
+            return self.venues.find(base, quote)
+        except Exception as e:
+            print(f"Error finding venues: {e}")
+            return {}
+
     async def clear_cache(self, exchange_name: Optional[str] = None) -> bool:
         """
         Clear the cache for a specific exchange or all exchanges.
-        
+
         Args:
             exchange_name: Name of the exchange to clear cache for, or None to clear all
-            
+
         Returns:
             True if successful, False otherwise
         """
         try:
+            query = {"exchange": exchange_name} if exchange_name else {}
             if exchange_name:
-                # Clear cache for specific exchange
-                return await self.sqlite_base.delete_many({"exchange": exchange_name}) > 0
+                self.mirrors.pop(exchange_name, None)
+                self.venues.remove(exchange_name)
             else:
-                # Clear all cache
-                return await self.sqlite_base.delete_many({}) > 0
+                self.mirrors.clear()
+                self.venues = VenueIndex()
+
+            async with self.sqlite_base.transaction():
+                await self.markets_db.delete_many(query)
+                return await self.sqlite_base.delete_many(query) > 0
         except Exception as e:
             print(f"Error clearing cache: {e}")
             return False
-    
-    async def _get_from_cache(self, exchange_name: str, max_age_days: int) -> Optional[List[str]]:
+
+    async def close(self):
+        """
+        Cancel running background refreshes.
         """
-        Get symbols from cache if it exists and is not expired.
-        
+        for task in self.refreshes.values():
+            task.cancel()
+        if self.refreshes:
+            await asyncio.gather(*self.refreshes.values(), return_exceptions=True)
+
+    def _start_refresh(self, exchange_name: str, fetch_markets_func: Callable) -> asyncio.Task:
+        """
+        Start refreshing the markets of an exchange, unless a refresh is already running.
+
+        Args:
+            exchange_name: Name of the exchange
+            fetch_markets_func: Function to fetch the markets
+
+        Returns:
+            The running refresh task, resolving to the new ExchangeMarkets or None
+        """
+        task = self.refreshes.get(exchange_name)
+        if task is not None:
+            return task
+
+        task = asyncio.create_task(self._refresh(exchange_name, fetch_markets_func))
+        self.refreshes[exchange_name] = task
+        task.add_done_callback(lambda _: self.refreshes.pop(exchange_name, None))
+        return task
+
+    async def _refresh(self, exchange_name: str, fetch_markets_func: Callable) -> Optional[ExchangeMarkets]:
+        """
+        Fetch the markets of an exchange, save them and replace the mirror.
+
         Args:
             exchange_name: Name of the exchange
-            max_age_days: Maximum age of cached data in days
-            
+            fetch_markets_func: Function to fetch the markets
+
         Returns:
-            List of symbols or None if not found or expired
+            The new ExchangeMarkets, or None if the fetch failed or is backing off
+        """
+        # Stale markets keep being served until the exchange answers again
+        failed_at = self.failures.get(exchange_name)
+        if failed_at and datetime.now().timestamp() - failed_at < settings.MARKETS_REFRESH_RETRY_SECONDS:
+            return None
+
+        try:
+            markets = await fetch_markets_func(exchange_name)
+        except Exception as e:
+            print(f"Error refreshing markets for {exchange_name}: {e}")
+            markets = None
+
+        if not markets:
+            self.failures[exchange_name] = datetime.now().timestamp()
+            return None
+        self.failures.pop(exchange_name, None)
+
+        now = int(datetime.now().timestamp())
+        await self._save_to_cache(exchange_name, markets, now)
+        return self._set_mirror(exchange_name, ExchangeMarkets(markets, now, "exchange"))
+
+    def _set_mirror(self, exchange_name: str, mirror: ExchangeMarkets) -> ExchangeMarkets:
+        """
+        Install the mirror of an exchange and re-index its venues.
+
+        Args:
+            exchange_name: Name of the exchange
+            mirror: Newly loaded or fetched markets
+
+        Returns:
+            The mirror
+        """
+        self.mirrors[exchange_name] = mirror
+        self.venues.update(exchange_name, mirror.markets.values())
+        return mirror
+
+    async def _get_from_cache(self, exchange_name: str) -> Optional[ExchangeMarkets]:
+        """
+        Load the markets of an exchange from the database, however old.
+
+        Args:
+            exchange_name: Name of the exchange
+
+        Returns:
+            ExchangeMarkets or None if not found
         """
         try:
-            # Calculate expiration timestamp
-            now = int(datetime.now().timestamp())
-            max_age_seconds = max_age_days * 24 * 60 * 60
-            min_timestamp = now - max_age_seconds
-            
             # Query cache
-            cache_entry = await self.sqlite_base.find_one({
-                "exchange": exchange_name,
-                "last_updated": {"$gte": min_timestamp}
-            })
-            
+            cache_entry = await self.sqlite_base.find_one({"exchange": exchange_name})
+
             if not cache_entry:
                 return None
-                
-            # Parse the cached symbols
-            return json.loads(cache_entry["symbols"])
+
+            markets = await self.markets_db.find_many(
+                {"exchange": exchange_name},
+                projection={field: 1 for field in MARKET_FIELDS}
+            )
+            if not markets:
+                return None
+
+            return ExchangeMarkets(markets, cache_entry["last_updated"], "cache")
         except Exception as e:
             print(f"Error getting from cache: {e}")
             return None
-    
-    async def _save_to_cache(self, exchange_name: str, symbols: List[str]) -> bool:
+
+    async def _save_to_cache(self, exchange_name: str, markets: List[Dict], last_updated: Optional[int] = None) -> bool:
         """
-        Save symbols to cache.
-        
+        Replace the cached markets of an exchange.
+
         Args:
             exchange_name: Name of the exchange
-            symbols: List of trading pair symbols to cache
-            
+            markets: Market dicts with the MARKET_FIELDS keys
+            last_updated: Refresh timestamp, defaults to now
+
         Returns:
             True if successful, False otherwise
         """
         try:
-            now = int(datetime.now().timestamp())
-            
-            # Convert symbols list to JSON string
-            symbols_json = json.dumps(symbols)
-            
-            # Insert or update cache entry
-            success = await self.sqlite_base.update_one(
-                {"exchange": exchange_name},
-                {"$set": {
-                    "symbols": symbols_json,
-                    "last_updated": now
-                }},
-                upsert=True
-            )
-            
-            return success
+            if last_updated is None:
+                last_updated = int(datetime.now().timestamp())
+
+            # The mirror is reloaded from the new rows on the next read
+            self.mirrors.pop(exchange_name, None)
+
+            rows = []
+            for market in markets:
+                row = {"exchange": exchange_name, **{field: market.get(field) for field in MARKET_FIELDS}}
+                # ccxt leaves active unset when the exchange does not report it
+                row["active"] = row["active"] is None or bool(row["active"])
+                rows.append(row)
+
+            async with self.sqlite_base.transaction():
+                await self.markets_db.delete_many({"exchange": exchange_name})
+                await self.markets_db.insert_many(rows, ignore_conflicts=True)
+
+                # Insert or update the refresh time
+                await self.sqlite_base.upsert_one(
+                    {
+                        "exchange": exchange_name,
+                        "last_updated": last_updated
+                    },
+                    conflict_fields=["exchange"]
+                )
+
+            return True
         except Exception as e:
             print(f"Error saving to cache: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,300 @@
+import json
+import re
+from typing import Awaitable, Callable, List
+
+import aiosqlite
+
+from app.config import settings
+from app.database.chart_codec import encode_content, is_encoded
+
+# Rows read and rewritten per batch by data migrations
+MIGRATION_BATCH_SIZE = 100
+
+async def create_baseline_schema(db: aiosqlite.Connection):
+    """Tables and indexes of databases created before migrations existed"""
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS charts_storage (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        content TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        resolution TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        update_time TEXT NOT NULL
+    )
+    """)
+
+    await db.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_chart_name ON charts_storage (name)
+    """)
+
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS watch_lists (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        description TEXT,
+        create_time TEXT NOT NULL,
+        update_time TEXT NOT NULL
+    )
+    """)
+
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS watch_list_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        list_id INTEGER NOT NULL,
+        symbol TEXT NOT NULL,
+        full_name TEXT NOT NULL,
+        description TEXT,
+        exchange TEXT NOT NULL,
+        create_time TEXT NOT NULL,
+        update_time TEXT NOT NULL,
+        FOREIGN KEY (list_id) REFERENCES watch_lists (id) ON DELETE CASCADE,
+        UNIQUE (list_id, symbol, exchange)
+    )
+    """)
+
+    await db.execute("""
+    CREATE INDEX IF NOT EXISTS idx_watch_list_items_list_id
+    ON watch_list_items (list_id)
+    """)
+
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS markets_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        exchange TEXT NOT NULL,
+        symbols TEXT NOT NULL,
+        last_updated INTEGER NOT NULL,
+        UNIQUE(exchange)
+    )
+    """)
+
+    await db.execute("""
+    CREATE INDEX IF NOT EXISTS idx_market_exchange ON markets_cache (exchange)
+    """)
+
+async def compress_chart_content(db: aiosqlite.Connection):
+    """Compress chart contents saved as plain text, walking the table by id in batches"""
+    last_id = 0
+
+    while True:
+        async with db.execute(
+            "SELECT id, content FROM charts_storage WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, MIGRATION_BATCH_SIZE)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        legacy = [
+            (encode_content(content, settings.CHART_COMPRESSION_LEVEL), chart_id)
+            for chart_id, content in rows
+            if not is_encoded(content)
+        ]
+        if legacy:
+            await db.executemany("UPDATE charts_storage SET content = ? WHERE id = ?", legacy)
+
+async def add_chart_timestamp_index(db: aiosqlite.Connection):
+    """Covering index for the chart list, newest first without reading content"""
+    await db.execute("""
+    CREATE INDEX IF NOT EXISTS idx_chart_timestamp ON charts_storage (timestamp, name, symbol, resolution)
+    """)
+
+async def add_chart_deltas(db: aiosqlite.Connection):
+    """Revision columns and the patches saved on top of a chart's base content"""
+    # Databases started by a development build may already have the columns
+    async with db.execute("PRAGMA table_info(charts_storage)") as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+    for column in ("revision", "base_revision"):
+        if column not in columns:
+            await db.execute(f"ALTER TABLE charts_storage ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS chart_deltas (
+        chart_id INTEGER NOT NULL,
+        revision INTEGER NOT NULL,
+        patch TEXT NOT NULL,
+        create_time TEXT NOT NULL,
+        PRIMARY KEY (chart_id, revision),
+        FOREIGN KEY (chart_id) REFERENCES charts_storage (id) ON DELETE CASCADE
+    )
+    """)
+
+async def add_watch_list_item_name_index(db: aiosqlite.Connection):
+    """Index for removing items by full name; it also serves list_id lookups"""
+    await db.execute("""
+    CREATE INDEX IF NOT EXISTS idx_watch_list_items_full_name
+    ON watch_list_items (list_id, full_name)
+    """)
+    await db.execute("DROP INDEX IF EXISTS idx_watch_list_items_list_id")
+
+async def add_search_index(db: aiosqlite.Connection):
+    """FTS5 indexes over chart and watch list item names, kept in sync by triggers"""
+    # External content tables: the text lives in the indexed tables only.
+    # The prefix indexes keep "btc*" style queries from scanning the vocabulary.
+    for fts_table, table, columns in (
+        ("charts_fts", "charts_storage", ("name", "symbol")),
+        ("watch_list_items_fts", "watch_list_items", ("symbol", "full_name", "description", "exchange")),
+    ):
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+
+        await db.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            {column_list}, content='{table}', content_rowid='id', prefix='2 3'
+        )
+        """)
+
+        await db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        """)
+
+        await db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+        """)
+
+        # Content-only updates (chart saves, compaction) leave the index alone
+        await db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {column_list} ON {table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        """)
+
+        # Index the rows saved before this step
+        await db.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+async def add_watch_list_item_position(db: aiosqlite.Connection):
+    """User-defined order of the items in a watch list"""
+    await db.execute("ALTER TABLE watch_list_items ADD COLUMN position INTEGER")
+
+    # Ids grow with every insert, so using the id keeps existing items in the
+    # order they were added and appends new ones after any reordered position
+    await db.execute("UPDATE watch_list_items SET position = id")
+    await db.execute("""
+    CREATE TRIGGER IF NOT EXISTS watch_list_items_position AFTER INSERT ON watch_list_items
+    WHEN new.position IS NULL BEGIN
+        UPDATE watch_list_items SET position = new.id WHERE id = new.id;
+    END
+    """)
+
+    await db.execute("""
+    CREATE INDEX IF NOT EXISTS idx_watch_list_items_position
+    ON watch_list_items (list_id, position)
+    """)
+
+async def add_markets_table(db: aiosqlite.Connection):
+    """One row per market with its metadata, replacing the JSON symbol list per exchange"""
+    # Precisions are tick sizes, NULL when the exchange reports significant digits
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS markets (
+        exchange TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        base TEXT,
+        quote TEXT,
+        type TEXT,
+        price_precision REAL,
+        amount_precision REAL,
+        active INTEGER NOT NULL DEFAULT 1,
+        PRIMARY KEY (exchange, symbol)
+    ) WITHOUT ROWID
+    """)
+
+    # Cached lists only have symbol names, the rest is filled in by the next refresh
+    async with db.execute("SELECT exchange, symbols FROM markets_cache") as cursor:
+        rows = await cursor.fetchall()
+    for exchange, symbols in rows:
+        markets = []
+        for symbol in json.loads(symbols):
+            parts = re.split(r"[/:]", symbol)
+            markets.append((exchange, symbol, parts[0], parts[1] if len(parts) > 1 else None))
+        await db.executemany(
+            "INSERT OR IGNORE INTO markets (exchange, symbol, base, quote) VALUES (?, ?, ?, ?)",
+            markets
+        )
+
+    # markets_cache keeps only the refresh time of each exchange
+    await db.execute("""
+    CREATE TABLE markets_cache_refreshes (
+        exchange TEXT PRIMARY KEY,
+        last_updated INTEGER NOT NULL
+    )
+    """)
+    await db.execute("""
+    INSERT INTO markets_cache_refreshes (exchange, last_updated)
+    SELECT exchange, last_updated FROM markets_cache
+    """)
+    await db.execute("DROP TABLE markets_cache")
+    await db.execute("ALTER TABLE markets_cache_refreshes RENAME TO markets_cache")
+
+async def add_market_ids(db: aiosqlite.Connection):
+    """Exchange-native market ids, e.g. 'XBTUSDT' for kraken's BTC/USDT"""
+    await db.execute("ALTER TABLE markets ADD COLUMN market_id TEXT")
+
+# Schema version N is reached by applying the first N steps. Append new steps,
+# never edit or reorder applied ones: deployed databases skip them.
+MIGRATIONS: List[Callable[[aiosqlite.Connection], Awaitable[None]]] = [
+    create_baseline_schema,
+    compress_chart_content,
+    add_chart_timestamp_index,
+    add_chart_deltas,
+    add_watch_list_item_name_index,
+    add_search_index,
+    add_watch_list_item_position,
+    add_markets_table,
+    add_market_ids,
+]
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    """
+    Get the schema version stored in the database header.
+
+    Args:
+        db: Database connection
+
+    Returns:
+        Number of migration steps applied (PRAGMA user_version)
+    """
+    async with db.execute("PRAGMA user_version") as cursor:
+        row = await cursor.fetchone()
+    return row[0]
+
+async def migrate(db: aiosqlite.Connection) -> int:
+    """
+    Apply the migration steps the database has not seen yet. Each step runs in
+    its own transaction together with the user_version bump, so an interrupted
+    startup resumes from the last completed step.
+
+    Args:
+        db: Writer connection, before anything else uses it
+
+    Returns:
+        Schema version after migrating
+    """
+    version = await get_schema_version(db)
+    if version >= len(MIGRATIONS):
+        return version
+
+    for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        # IMMEDIATE takes the write lock first, another process may have migrated meanwhile
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            if await get_schema_version(db) >= number:
+                await db.commit()
+                continue
+
+            await step(db)
+            await db.execute(f"PRAGMA user_version = {number}")
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        print(f"Applied migration {number}: {step.__name__}")
+
+    return len(MIGRATIONS)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import functools
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class ReadCache:
+    """
+    In-process read-through cache for query results of one DB class.
+
+    Every write method of the owner calls invalidate() (see @invalidates_cache),
+    which drops all entries and bumps the version. The version, prefixed with a
+    per-process token, doubles as the ETag of the cached responses.
+    """
+    def __init__(self):
+        self.entries: Dict[Hashable, Any] = {}
+        self.version = 0
+        # Versions restart on every launch, the token keeps old ETags from matching
+        self.token = uuid.uuid4().hex[:8]
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a cached result, loading and caching it on a miss. Results are shared
+        between callers and must not be modified.
+
+        Args:
+            key: Cache key
+            load: Coroutine function reading the result from the database
+
+        Returns:
+            Cached or loaded result
+        """
+        if key in self.entries:
+            return self.entries[key]
+
+        version = self.version
+        value = await load()
+
+        # A write committed while loading may not be in the result
+        if version == self.version:
+            self.entries[key] = value
+        return value
+
+    def invalidate(self):
+        """
+        Drop all cached results after a write.
+        """
+        self.entries.clear()
+        self.version += 1
+
+    @property
+    def etag(self) -> str:
+        """
+        ETag of the data currently in the database, changes with every write.
+        """
+        return f'"{self.token}-{self.version}"'
+
+def invalidates_cache(method: Callable) -> Callable:
+    """
+    Decorator for write methods of a class with a `cache` ReadCache attribute.
+    The cache is invalidated once the write has finished, committed or not.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            self.cache.invalidate()
+    return wrapper
\ No newline at end of file
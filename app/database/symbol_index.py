@@ -0,0 +1,235 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+NON_ALPHANUMERIC = re.compile(r"[^0-9A-Z]")
+
+# Match tiers, lower ranks first
+EXACT, BASE, PREFIX, TOKEN, TOKEN_PREFIX = range(5)
+# Sorts after every character of a normalized key, bounds prefix ranges
+KEY_END = "~"
+
+def normalize_symbol(text: str) -> str:
+    """
+    Upper-case a symbol or query and drop separators, so 'btc/usdt', 'BTC-USDT'
+    and 'BTCUSDT' all compare equal.
+    """
+    return NON_ALPHANUMERIC.sub("", text.upper())
+
+class SymbolIndex:
+    """
+    In-memory search index over the trading pairs of one exchange. The pairs
+    never change, a new symbol list gets a new index.
+
+    Symbols are kept as a sorted array of normalized keys for prefix lookups
+    by bisection, plus a sorted array of base/quote/settle tokens mapping to the
+    pairs that contain them. A query is answered from those two ranges only,
+    so its cost depends on the number of matches, not on the number of pairs.
+    """
+    # Ranked matches of recent queries, typing a symbol repeats its prefixes
+    QUERY_CACHE_SIZE = 256
+
+    def __init__(self, symbols: Iterable[str], source: str = "unknown"):
+        """
+        Build the index.
+
+        Args:
+            symbols: Trading pair symbols as returned by ccxt (e.g. 'BTC/USDT:USDT')
+            source: Where the symbols came from, reported with search results
+        """
+        self.symbols: List[str] = list(dict.fromkeys(symbols))
+        self.source = source
+
+        keys = [normalize_symbol(symbol) for symbol in self.symbols]
+        self.bases = [normalize_symbol(re.split(r"[/:]", symbol)[0]) for symbol in self.symbols]
+
+        # Spot pairs before derivatives, then shorter symbols, then alphabetical
+        self.ranked = sorted(
+            range(len(self.symbols)),
+            key=lambda i: (":" in self.symbols[i], len(keys[i]), keys[i])
+        )
+        self.ranks = [0] * len(self.symbols)
+        for rank, i in enumerate(self.ranked):
+            self.ranks[i] = rank
+
+        by_key = sorted(range(len(self.symbols)), key=lambda i: keys[i])
+        self.keys = [keys[i] for i in by_key]
+        self.key_ids = by_key
+
+        token_ids: Dict[str, List[int]] = {}
+        for i, symbol in enumerate(self.symbols):
+            for token in {normalize_symbol(part) for part in re.split(r"[/:]", symbol)}:
+                if token:
+                    token_ids.setdefault(token, []).append(i)
+        self.tokens = sorted(token_ids)
+        self.token_ids = [token_ids[token] for token in self.tokens]
+
+        self.matches: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        key = normalize_symbol(symbol)
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.symbols[self.key_ids[position]] == symbol:
+                return True
+            position += 1
+        return False
+
+    def search(self, text: str, limit: int = 50, offset: int = 0) -> Tuple[List[str], int]:
+        """
+        Find pairs matching a query, best matches first.
+
+        Pairs whose normalized symbol equals the query rank first, then pairs
+        with the query as base, pairs starting with the query, pairs with the
+        query as quote or settle currency, and pairs with a token starting with it.
+
+        Args:
+            text: Search text, separators and case are ignored
+            limit: Maximum number of pairs to return
+            offset: Number of matching pairs to skip
+
+        Returns:
+            Tuple of (page of matching symbols, total number of matches)
+        """
+        query = normalize_symbol(text)
+        if not query:
+            page = self.ranked[offset:offset + limit]
+            return [self.symbols[i] for i in page], len(self.symbols)
+
+        matches = self.matches.pop(query, None)
+        if matches is None:
+            matches = self._match(query)
+        self.matches[query] = matches
+
+        while len(self.matches) > self.QUERY_CACHE_SIZE:
+            self.matches.pop(next(iter(self.matches)))
+
+        page = matches[offset:offset + limit]
+        return [self.symbols[i] for i in page], len(matches)
+
+    def _match(self, query: str) -> List[int]:
+        """
+        Find all pairs matching a normalized query.
+
+        Args:
+            query: Normalized search text
+
+        Returns:
+            Indexes of the matching symbols, best matches first
+        """
+        size = len(self.symbols)
+        ranks = self.ranks
+        # Score = tier * size + rank, lower is better
+        scores: Dict[int, int] = {}
+
+        # Exact token last, it sorts first in the range and outranks the prefixes
+        start = bisect_left(self.tokens, query)
+        end = bisect_left(self.tokens, query + KEY_END, start)
+        for position in reversed(range(start, end)):
+            offset = (TOKEN if self.tokens[position] == query else TOKEN_PREFIX) * size
+            scores.update((i, offset + ranks[i]) for i in self.token_ids[position])
+
+        # Symbol prefixes outrank every token match
+        start = bisect_left(self.keys, query)
+        exact_end = bisect_right(self.keys, query, start)
+        end = bisect_left(self.keys, query + KEY_END, exact_end)
+        scores.update((i, EXACT * size + ranks[i]) for i in self.key_ids[start:exact_end])
+        scores.update(
+            (i, (BASE if self.bases[i] == query else PREFIX) * size + ranks[i])
+            for i in self.key_ids[exact_end:end]
+        )
+
+        return sorted(scores, key=scores.__getitem__)
+
+class VenueIndex:
+    """
+    Inverted index from currencies to the exchanges listing them, over the
+    markets of every exchange known to the market cache.
+
+    Pairs are keyed by normalized (base, quote), and by the pair written without
+    a separator ('BTCUSDT'), so finding the venues of a pair is a dict lookup.
+    Exchanges are re-indexed whenever their markets are refreshed.
+    """
+    def __init__(self):
+        # (base, quote) -> exchange -> native symbols
+        self.pairs: Dict[Tuple[str, str], Dict[str, List[str]]] = {}
+        # base -> exchange -> native symbols
+        self.bases: Dict[str, Dict[str, List[str]]] = {}
+        # 'BTCUSDT' -> pairs it can be split into
+        self.compact: Dict[str, Set[Tuple[str, str]]] = {}
+        # exchange -> (base, quote, symbol) entries it added
+        self.entries: Dict[str, List[Tuple[str, str, str]]] = {}
+
+    def update(self, exchange: str, markets: Iterable[Dict]):
+        """
+        Replace the entries of an exchange.
+
+        Args:
+            exchange: Exchange name
+            markets: Market dicts with symbol, base, quote and active keys
+        """
+        self.remove(exchange)
+
+        entries = []
+        for market in markets:
+            if not market.get("active", True) or not market.get("base") or not market.get("quote"):
+                continue
+            base, quote = normalize_symbol(market["base"]), normalize_symbol(market["quote"])
+            entries.append((base, quote, market["symbol"]))
+
+            self.pairs.setdefault((base, quote), {}).setdefault(exchange, []).append(market["symbol"])
+            self.bases.setdefault(base, {}).setdefault(exchange, []).append(market["symbol"])
+            self.compact.setdefault(base + quote, set()).add((base, quote))
+        self.entries[exchange] = entries
+
+    def remove(self, exchange: str):
+        """
+        Drop all entries of an exchange.
+
+        Args:
+            exchange: Exchange name
+        """
+        for base, quote, _ in self.entries.pop(exchange, []):
+            for table, key in ((self.pairs, (base, quote)), (self.bases, base)):
+                venues = table.get(key)
+                if venues is None:
+                    continue
+                venues.pop(exchange, None)
+                if not venues:
+                    del table[key]
+                    if table is self.pairs:
+                        self.compact[base + quote].discard(key)
+                        if not self.compact[base + quote]:
+                            del self.compact[base + quote]
+
+    def find(self, base: str, quote: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Find the exchanges listing a currency or a pair.
+
+        Args:
+            base: Base currency, or a whole pair ('BTC/USDT', 'BTCUSDT') when quote is None
+            quote: Quote currency, None to match the base alone or a whole pair
+
+        Returns:
+            Dict of exchange -> native symbols, sorted by exchange
+        """
+        if quote is not None:
+            venues = self.pairs.get((normalize_symbol(base), normalize_symbol(quote)), {})
+        elif re.search(r"[/:]", base):
+            parts = re.split(r"[/:]", base)
+            venues = self.pairs.get((normalize_symbol(parts[0]), normalize_symbol(parts[1])), {})
+        else:
+            key = normalize_symbol(base)
+            if key in self.bases:
+                venues = self.bases[key]
+            else:
+                # A pair written without a separator, e.g. 'BTCUSDT'
+                venues = {}
+                for pair in sorted(self.compact.get(key, ())):
+                    for exchange, symbols in self.pairs[pair].items():
+                        venues.setdefault(exchange, []).extend(symbols)
+
+        return {exchange: list(venues[exchange]) for exchange in sorted(venues)}
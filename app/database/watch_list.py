@@ -2,15 +2,24 @@ from typing import List, Dict, Optional
 from datetime import datetime
 
 from app.database.base import SQLiteBase   
+from app.database.read_cache import ReadCache, invalidates_cache
 
 class WatchListDB:
+    # Tag and version of the whole-watch-list export format
+    EXPORT_FORMAT = "mytradingview.watchlist"
+    EXPORT_VERSION = 1
+    # Item fields carried by bulk adds and exports
+    ITEM_FIELDS = ("symbol", "full_name", "description", "exchange")
+
     def __init__(self):
         """
         Initialize the watch list manager with SQLiteBase instances for both tables.
         """
         self.lists_db = SQLiteBase("watch_lists")
         self.items_db = SQLiteBase("watch_list_items")
+        self.cache = ReadCache()
 
+    @invalidates_cache
     async def create_watch_list(
         self,
         name: str,
@@ -27,21 +36,18 @@ class WatchListDB:
             True if successful, False otherwise
         """
         try:
-            # Check if watch list with the same name already exists
-            existing = await self.lists_db.find_one({"name": name})
-            if existing:
-                return False
-            
-            # Create new watch list
+            # Create new watch list, unless one with the same name exists
             now = datetime.now().isoformat()
-            doc_id = await self.lists_db.insert_one({
-                "name": name,
-                "description": description,
-                "create_time": now,
-                "update_time": now
-            })
-            
-            return doc_id is not None
+            return await self.lists_db.upsert_one(
+                {
+                    "name": name,
+                    "description": description,
+                    "create_time": now,
+                    "update_time": now
+                },
+                conflict_fields=["name"],
+                update_fields=[]
+            )
         except Exception as e:
             print(f"Error creating watch list: {e}")
             return False
@@ -59,11 +65,10 @@ class WatchListDB:
                 sort=[("name", 1)]  # Sort by name in ascending order
             )
             
-            # Enrich with item counts
+            # Enrich with item counts from one grouped count
+            counts = await self.items_db.count_by("list_id")
             for watch_list in watch_lists:
-                list_id = watch_list["id"]
-                count = await self.items_db.count_documents({"list_id": list_id})
-                watch_list["item_count"] = count
+                watch_list["item_count"] = counts.get(watch_list["id"], 0)
                 
             return watch_lists
         except Exception as e:
@@ -72,29 +77,20 @@ class WatchListDB:
         
     async def get_all_watch_lists_with_items(self) -> List[Dict]:
         """
-        Get all watch lists with their items.
+        Get all watch lists with their items, cached until the next watch list write.
         
         Returns:
             List of watch lists with items property containing all items in each list
         """
         try:
-            # Get all watch lists
-            watch_lists = await self.get_all_watch_lists()
-            
-            # For each watch list, fetch and add its items
-            for watch_list in watch_lists:
-                list_id = watch_list["id"]
-                items = await self.get_watch_list_items(list_id)
-                watch_list["items"] = items
-                
-            return watch_lists
+            return await self.cache.get("lists_with_items", self._load_watch_lists_with_items)
         except Exception as e:
             print(f"Error getting watch lists with items: {e}")
             return []
         
     async def get_watch_list_items_by_id(self, list_id: int) -> Optional[List]:
         """
-        Get a watch list all items by ID.
+        Get a watch list all items by ID, cached until the next watch list write.
         
         Args:
             list_id: Watch list ID
@@ -103,7 +99,10 @@ class WatchListDB:
             Watch list items if found, None otherwise
         """
         try:
-            return await self.items_db.find_many({"list_id": list_id})
+            return await self.cache.get(
+                ("items", str(list_id)),
+                lambda: self.items_db.find_many({"list_id": list_id}, sort=[("position", 1)])
+            )
         except Exception as e:
             print(f"Error getting watch list by ID: {e}")
             return None
@@ -140,6 +139,7 @@ class WatchListDB:
             print(f"Error getting watch list by name: {e}")
             return None
         
+    @invalidates_cache
     async def update_watch_list(
         self,
         list_id: int,
@@ -158,11 +158,6 @@ class WatchListDB:
             True if successful, False otherwise
         """
         try:
-            # Check if the watch list exists
-            existing = await self.lists_db.find_one({"id": list_id})
-            if not existing:
-                return False
-            
             # Build update document
             updates = {}
             if name:
@@ -172,11 +167,12 @@ class WatchListDB:
                 updates["description"] = description
                 
             if not updates:
-                return True  # Nothing to update
+                # Nothing to update
+                return await self.lists_db.count_documents({"id": list_id}) > 0
                 
             updates["update_time"] = datetime.now().isoformat()
             
-            # Perform update
+            # Perform update, matches nothing if the watch list does not exist
             return await self.lists_db.update_one(
                 {"id": list_id},
                 {"$set": updates}
@@ -185,6 +181,7 @@ class WatchListDB:
             print(f"Error updating watch list: {e}")
             return False
         
+    @invalidates_cache
     async def delete_watch_list(self, list_id: int) -> bool:
         """
         Delete a watch list and all its items.
@@ -196,15 +193,17 @@ class WatchListDB:
             True if successful, False otherwise
         """
         try:
-            # Delete all items in the watch list
-            await self.items_db.delete_many({"list_id": list_id})
-            
-            # Delete the watch list
-            return await self.lists_db.delete_one({"id": list_id})
+            async with self.lists_db.transaction():
+                # Delete all items in the watch list
+                await self.items_db.delete_many({"list_id": list_id})
+                
+                # Delete the watch list
+                return await self.lists_db.delete_one({"id": list_id})
         except Exception as e:
             print(f"Error deleting watch list: {e}")
             return False
 
+    @invalidates_cache
     async def add_item_to_watch_list(
         self,
         list_id: int,
@@ -227,38 +226,29 @@ class WatchListDB:
             True if successful, False otherwise
         """
         try:
-            # Check if the watch list exists
-            watch_list = await self.lists_db.find_one({"id": list_id})
-            if not watch_list:
-                return False
-            
-            # Check if the item already exists
-            existing = await self.items_db.find_one({
-                "list_id": list_id,
-                "symbol": symbol,
-                "exchange": exchange
-            })
-            
-            if existing:
-                return False
-            
             now = datetime.now().isoformat()
             
-            doc_id = await self.items_db.insert_one({
-                "list_id": list_id,
-                "symbol": symbol,
-                "full_name": full_name,
-                "description": description,
-                "exchange": exchange,
-                "create_time": now,
-                "update_time": now
-            })
-            
-            return doc_id is not None
+            # Nothing is written when the watch list does not exist, an
+            # existing item is left untouched
+            return await self.items_db.upsert_one(
+                {
+                    "list_id": list_id,
+                    "symbol": symbol,
+                    "full_name": full_name,
+                    "description": description,
+                    "exchange": exchange,
+                    "create_time": now,
+                    "update_time": now
+                },
+                conflict_fields=["list_id", "symbol", "exchange"],
+                update_fields=[],
+                requires=("watch_lists", {"id": list_id})
+            )
         except Exception as e:
             print(f"Error adding item to watch list: {e}")
             return False
         
+    @invalidates_cache
     async def remove_item_from_watch_list(
         self,
         list_id: int,
@@ -286,6 +276,177 @@ class WatchListDB:
             print(f"Error removing item from watch list: {e}")
             return False
         
+    @invalidates_cache
+    async def add_items_to_watch_list(self, list_id: int, items: List[Dict]) -> Optional[int]:
+        """
+        Add many items to a watch list in one transaction. Items already in the
+        list are skipped, new ones are appended in the given order.
+        
+        Args:
+            list_id: Watch list ID
+            items: Items with symbol, full_name, exchange and optional description
+            
+        Returns:
+            Number of items added, None if the watch list does not exist or on error
+            
+        Raises:
+            ValueError: If an item lacks symbol, full_name or exchange
+        """
+        self._validate_items(items)
+
+        try:
+            async with self.lists_db.transaction():
+                if not await self.lists_db.find_one({"id": list_id}, projection={"id": 1}):
+                    return None
+                return await self._insert_items(list_id, items)
+        except Exception as e:
+            print(f"Error adding items to watch list: {e}")
+            return None
+
+    @invalidates_cache
+    async def remove_items_from_watch_list(self, list_id: int, full_names: List[str]) -> int:
+        """
+        Remove many items from a watch list with one statement.
+        
+        Args:
+            list_id: Watch list ID
+            full_names: Full names of the items to remove
+            
+        Returns:
+            Number of items removed
+        """
+        try:
+            if not full_names:
+                return 0
+            return await self.items_db.delete_many({"list_id": list_id, "full_name": {"$in": full_names}})
+        except Exception as e:
+            print(f"Error removing items from watch list: {e}")
+            return 0
+
+    @invalidates_cache
+    async def reorder_watch_list_items(self, list_id: int, full_names: List[str]) -> bool:
+        """
+        Reorder the items of a watch list in one transaction. The named items
+        come first in the given order, the others follow in their current order.
+        
+        Args:
+            list_id: Watch list ID
+            full_names: Full names of the items in their new order
+            
+        Returns:
+            True if successful, False if the watch list does not exist or on error
+        """
+        try:
+            async with self.lists_db.transaction():
+                if not await self.lists_db.find_one({"id": list_id}, projection={"id": 1}):
+                    return False
+
+                items = await self.items_db.find_many(
+                    {"list_id": list_id},
+                    projection={"id": 1, "full_name": 1},
+                    sort=[("position", 1)]
+                )
+                rank = {full_name: index for index, full_name in enumerate(dict.fromkeys(full_names))}
+                # sorted() is stable: unnamed items keep their relative order
+                items.sort(key=lambda item: rank.get(item["full_name"], len(rank)))
+
+                await self.items_db.bulk_update(
+                    [{"id": item["id"], "position": position} for position, item in enumerate(items, start=1)],
+                    key_fields=["id"]
+                )
+                return True
+        except Exception as e:
+            print(f"Error reordering watch list items: {e}")
+            return False
+
+    async def export_watch_list(self, list_id: int) -> Optional[Dict]:
+        """
+        Export a watch list with its items in the import format.
+        
+        Args:
+            list_id: Watch list ID
+            
+        Returns:
+            {"format", "version", "name", "description", "items"}, None if not found
+        """
+        try:
+            watch_list = await self.lists_db.find_one({"id": list_id})
+            if not watch_list:
+                return None
+
+            items = await self.items_db.find_many(
+                {"list_id": list_id},
+                projection={field: 1 for field in self.ITEM_FIELDS},
+                sort=[("position", 1)]
+            )
+            return {
+                "format": self.EXPORT_FORMAT,
+                "version": self.EXPORT_VERSION,
+                "name": watch_list["name"],
+                "description": watch_list["description"] or "",
+                "items": items
+            }
+        except Exception as e:
+            print(f"Error exporting watch list: {e}")
+            return None
+
+    @invalidates_cache
+    async def import_watch_list(self, data: Dict) -> Optional[Dict]:
+        """
+        Import an exported watch list in one transaction. A list with the same
+        name is merged into, keeping its items and adding the missing ones.
+        
+        Args:
+            data: Watch list in the export_watch_list format
+            
+        Returns:
+            {"id", "added"}, None on error
+            
+        Raises:
+            ValueError: If the data is not a valid watch list export
+        """
+        if data.get("format") != self.EXPORT_FORMAT or data.get("version") != self.EXPORT_VERSION:
+            raise ValueError(f"Expected format '{self.EXPORT_FORMAT}' version {self.EXPORT_VERSION}")
+        if not data.get("name") or not isinstance(data.get("items", []), list):
+            raise ValueError("A watch list needs a 'name' and a list of 'items'")
+        self._validate_items(data.get("items", []))
+
+        try:
+            now = datetime.now().isoformat()
+            async with self.lists_db.transaction():
+                await self.lists_db.upsert_one(
+                    {
+                        "name": data["name"],
+                        "description": data.get("description", ""),
+                        "create_time": now,
+                        "update_time": now
+                    },
+                    conflict_fields=["name"],
+                    update_fields=[]
+                )
+                watch_list = await self.lists_db.find_one({"name": data["name"]}, projection={"id": 1})
+                added = await self._insert_items(watch_list["id"], data.get("items", []))
+
+            return {"id": watch_list["id"], "added": added}
+        except Exception as e:
+            print(f"Error importing watch list: {e}")
+            return None
+
+    async def search_watch_list_items(self, text: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        Search the items of all watch lists by symbol, full name, description
+        and exchange, best matches first.
+        
+        Args:
+            text: Search text
+            limit: Maximum number of items to return
+            offset: Number of matches to skip
+            
+        Returns:
+            List of items, each with its list_id
+        """
+        return await self.items_db.search(text, "watch_list_items_fts", limit=limit, offset=offset)
+        
     async def get_watch_list_items(
         self,
         list_id: int,
@@ -305,7 +466,7 @@ class WatchListDB:
         """
         try:
             # Validate sort field
-            allowed_sort_fields = ["symbol", "full_name", "exchange", "create_time", "update_time"]
+            allowed_sort_fields = ["symbol", "full_name", "exchange", "position", "create_time", "update_time"]
             if sort_field not in allowed_sort_fields:
                 sort_field = "symbol"
                 
@@ -319,4 +480,76 @@ class WatchListDB:
             )
         except Exception as e:
             print(f"Error getting watch list items: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    async def _load_watch_lists_with_items(self) -> List[Dict]:
+        """
+        Read all watch lists with their items from the database, see get_all_watch_lists_with_items.
+        """
+        # Get all watch lists and all items, two queries in total
+        watch_lists = await self.lists_db.find_many(
+            sort=[("name", 1)]  # Sort by name in ascending order
+        )
+        all_items = await self.items_db.find_many(
+            sort=[("list_id", 1), ("position", 1)]
+        )
+        
+        # Group items by list in one pass
+        items_by_list: Dict[int, List[Dict]] = {}
+        for item in all_items:
+            items_by_list.setdefault(item["list_id"], []).append(item)
+        
+        for watch_list in watch_lists:
+            items = items_by_list.get(watch_list["id"], [])
+            watch_list["item_count"] = len(items)
+            watch_list["items"] = items
+            
+        return watch_lists
+
+    async def _insert_items(self, list_id: int, items: List[Dict]) -> int:
+        """
+        Insert items into an existing watch list with INSERT OR IGNORE, inside
+        the caller's transaction.
+        
+        Args:
+            list_id: Watch list ID
+            items: Items with symbol, full_name, exchange and optional description
+            
+        Returns:
+            Number of items added
+        """
+        if not items:
+            return 0
+
+        now = datetime.now().isoformat()
+        before = await self.items_db.count_documents({"list_id": list_id})
+        await self.items_db.insert_many(
+            [
+                {
+                    "list_id": list_id,
+                    "symbol": item["symbol"],
+                    "full_name": item["full_name"],
+                    "description": item.get("description") or "",
+                    "exchange": item["exchange"],
+                    "create_time": now,
+                    "update_time": now
+                }
+                for item in items
+            ],
+            ignore_conflicts=True
+        )
+        return await self.items_db.count_documents({"list_id": list_id}) - before
+
+    def _validate_items(self, items: List[Dict]):
+        """
+        Check that items carry the fields a watch list item requires.
+        
+        Args:
+            items: Items to add
+            
+        Raises:
+            ValueError: If an item lacks symbol, full_name or exchange
+        """
+        for item in items:
+            if not isinstance(item, dict) or not all(item.get(field) for field in ("symbol", "full_name", "exchange")):
+                raise ValueError(f"Invalid watch list item: {item!r}")
\ No newline at end of file
@@ -1,5 +1,85 @@
 import { API_BASE_URL } from '../config.js'
 
+// TradingView nests the layout as a JSON string under this key of the saved
+// content. It is parsed so patches can reach inside it (see chart_codec.py).
+const LAYOUT_KEY = 'content'
+
+// Last saved { revision, document } per chart name, the base of the next patch
+const savedCharts = new Map()
+
+function loadChartDocument(content) {
+    const document = JSON.parse(content)
+    if (isObject(document) && typeof document[LAYOUT_KEY] === 'string') {
+        try {
+            document[LAYOUT_KEY] = JSON.parse(document[LAYOUT_KEY])
+        } catch (error) {
+            // Not JSON, patched as a plain string
+        }
+    }
+    return document
+}
+
+function isObject(value) {
+    return value !== null && typeof value === 'object' && !Array.isArray(value)
+}
+
+function escapePointer(token) {
+    return String(token).replace(/~/g, '~0').replace(/\//g, '~1')
+}
+
+// JSON patch (RFC 6902) turning `before` into `after`
+function diffJson(before, after, path = '', patch = []) {
+    if (before === after) {
+        return patch
+    }
+
+    if (isObject(before) && isObject(after)) {
+        for (const key of Object.keys(before)) {
+            if (!Object.prototype.hasOwnProperty.call(after, key)) {
+                patch.push({ op: 'remove', path: `${path}/${escapePointer(key)}` })
+            }
+        }
+        for (const key of Object.keys(after)) {
+            const keyPath = `${path}/${escapePointer(key)}`
+            if (Object.prototype.hasOwnProperty.call(before, key)) {
+                diffJson(before[key], after[key], keyPath, patch)
+            } else {
+                patch.push({ op: 'add', path: keyPath, value: after[key] })
+            }
+        }
+    } else if (Array.isArray(before) && Array.isArray(after)) {
+        const common = Math.min(before.length, after.length)
+        for (let i = 0; i < common; i++) {
+            diffJson(before[i], after[i], `${path}/${i}`, patch)
+        }
+        for (let i = common; i < after.length; i++) {
+            patch.push({ op: 'add', path: `${path}/-`, value: after[i] })
+        }
+        for (let i = before.length - 1; i >= common; i--) {
+            patch.push({ op: 'remove', path: `${path}/${i}` })
+        }
+    } else {
+        patch.push({ op: 'replace', path, value: after })
+    }
+    return patch
+}
+
+async function postChart(body) {
+    const response = await fetch(`${API_BASE_URL}/charts/save`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body
+    })
+
+    if (!response.ok) {
+        // Errors come back as plain text
+        return { success: false, message: await response.text() }
+    }
+    return await response.json()
+}
+
 export const chartStorage = {
     getLastestChart: async () => {
         console.log('[getLastestChart]: Method call')
@@ -40,19 +120,46 @@ export const chartStorage = {
     saveChart: async (chartData) => {
         console.log('[saveChart]: Method call', chartData)
         try {
-            const response = await fetch(`${API_BASE_URL}/charts/save`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(chartData)
-            })
-            const data = await response.json()
-            return data.success ?
-                { status: 'ok' } :
-                { status: 'error', message: data.message }
+            const document = loadChartDocument(chartData.content)
+            const saved = savedCharts.get(chartData.name)
+
+            if (saved) {
+                const patch = diffJson(saved.document, document)
+                if (patch.length === 0) {
+                    return { status: 'ok' }
+                }
+
+                const body = JSON.stringify({
+                    name: chartData.name,
+                    symbol: chartData.symbol,
+                    resolution: chartData.resolution,
+                    base_revision: saved.revision,
+                    patch
+                })
+
+                // Only worth it while the patch is smaller than the chart
+                if (body.length < chartData.content.length) {
+                    const data = await postChart(body)
+                    if (data.success) {
+                        savedCharts.set(chartData.name, { revision: data.data.revision, document })
+                        return { status: 'ok' }
+                    }
+                    // Saved elsewhere meanwhile, deleted or rejected: save it in full
+                    console.warn('[saveChart]: Patch not saved', data.message)
+                }
+            }
+
+            const data = await postChart(JSON.stringify(chartData))
+            if (data.success) {
+                savedCharts.set(chartData.name, { revision: data.data.revision, document })
+                return { status: 'ok' }
+            }
+
+            savedCharts.delete(chartData.name)
+            return { status: 'error', message: data.message }
         } catch (error) {
             console.error('[saveChart]: Error', error)
+            savedCharts.delete(chartData.name)
             return { status: 'error', message: error.toString() }
         }
     },
@@ -60,13 +167,13 @@ export const chartStorage = {
     getChartContent: async (chartId) => {
         console.log('[getChartContent]: Method call', chartId)
         try {
+            // Content only, sent with Content-Encoding: deflate and inflated by the browser
             const response = await fetch(
-                `${API_BASE_URL}/charts/load/${chartId}`
+                `${API_BASE_URL}/charts/load/${chartId}/content`
             )
-            const data = await response.json()
 
-            if (data.success) {
-                return data.data?.content
+            if (response.ok) {
+                return await response.text()
             }
             return null
         } catch (error) {
@@ -16,6 +16,14 @@ function calculatePriceScale(price) {
     return 1000000000;
 }
 
+// 由最小跳動價位計算小數位數，例如 0.00025 -> 5
+function tickDecimals(tick) {
+    let decimals = 0;
+    const steps = () => tick * 10 ** decimals;
+    while (decimals < 12 && (Math.round(steps()) === 0 || Math.abs(steps() - Math.round(steps())) > 1e-6)) decimals++;
+    return decimals;
+}
+
 class BarBuilder {
     constructor(resolution) {
         this.resolution = resolution;
@@ -73,6 +81,18 @@ function mapRes(r) {
     return m[r] || '1m';
 }
 
+const getMarketInfo = async (ex, sym) => {
+    try {
+        const r = await fetch(`${API_BASE_URL}/markets/${ex}/info?symbol=${encodeURIComponent(sym)}`);
+        if (!r.ok) return null;
+        const j = await r.json();
+        return j.success ? j.data : null;
+    } catch (e) {
+        console.error('[getMarketInfo]', e);
+        return null;
+    }
+};
+
 const getLatestPrice = async (ex, sym) => {
     try {
         const r = await fetch(`${API_BASE_URL}/quotes/price?exchange=${ex}&symbol=${sym}`);
@@ -92,14 +112,23 @@ export default {
 
     resolveSymbol: async (symbolName, onResolved, onError) => {
         const { exchange, symbol } = parseSymbol(symbolName);
-        const latestPrice = await getLatestPrice(exchange, symbol);
+        // 優先使用快取的市場精度，只有交易所未提供時才查詢最新價格
+        const market = await getMarketInfo(exchange, symbol);
+        let pricescale, minmov = 1, volumePrecision = 8;
+        if (market?.price_precision) {
+            pricescale = 10 ** tickDecimals(market.price_precision);
+            minmov = Math.max(1, Math.round(market.price_precision * pricescale));
+        } else {
+            pricescale = calculatePriceScale(await getLatestPrice(exchange, symbol));
+        }
+        if (market?.amount_precision) volumePrecision = tickDecimals(market.amount_precision);
 
         onResolved({
             name: symbolName, description: symbol, type: 'crypto', session: '24x7', timezone: 'Etc/UTC',
-            exchange: exchange.toUpperCase(), minmov: 1, pricescale: calculatePriceScale(latestPrice), has_intraday: true,
+            exchange: exchange.toUpperCase(), minmov: minmov, pricescale: pricescale, has_intraday: true,
             has_seconds: true, has_ticks: true, has_daily: true, has_weekly_and_monthly: true,
             supported_resolutions: ['1S', '10S', '30S', '1', '5', '15', '30', '60', '240', '1D', '1W', '1M', 'ticker'],
-            volume_precision: 8, data_status: 'streaming', intraday_multipliers: ['1S', '10S', '30S', '1', '5', '15', '30', '60', '240']
+            volume_precision: volumePrecision, data_status: 'streaming', intraday_multipliers: ['1S', '10S', '30S', '1', '5', '15', '30', '60', '240']
         });
     },
 
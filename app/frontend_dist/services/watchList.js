@@ -120,5 +120,125 @@ export const watchList = {
             console.error('[removeItemFromWatchList]: Error', error)
             return { status: 'error', message: error.message }
         }
+    },
+
+    addItemsToWatchList: async (listId, items) => {
+        console.log('[addItemsToWatchList]: Method call', { listId, count: items.length })
+        try {
+            const response = await fetch(
+                `${API_BASE_URL}/charts/watchlists/${listId}/bulk_add`,
+                {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({ items })
+                }
+            )
+            const data = await response.json()
+            return data
+        } catch (error) {
+            console.error('[addItemsToWatchList]: Error', error)
+            return { status: 'error', message: error.message }
+        }
+    },
+
+    removeItemsFromWatchList: async (listId, fullNames) => {
+        console.log('[removeItemsFromWatchList]: Method call', { listId, fullNames })
+        try {
+            const response = await fetch(
+                `${API_BASE_URL}/charts/watchlists/${listId}/bulk_remove`,
+                {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({ full_names: fullNames })
+                }
+            )
+            const data = await response.json()
+            return data
+        } catch (error) {
+            console.error('[removeItemsFromWatchList]: Error', error)
+            return { status: 'error', message: error.message }
+        }
+    },
+
+    reorderWatchList: async (listId, fullNames) => {
+        console.log('[reorderWatchList]: Method call', { listId, fullNames })
+        try {
+            const response = await fetch(
+                `${API_BASE_URL}/charts/watchlists/${listId}/reorder`,
+                {
+                    method: 'PUT',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({ full_names: fullNames })
+                }
+            )
+            const data = await response.json()
+            return data
+        } catch (error) {
+            console.error('[reorderWatchList]: Error', error)
+            return { status: 'error', message: error.message }
+        }
+    },
+
+    exportWatchList: async (listId) => {
+        console.log('[exportWatchList]: Method call', { listId })
+        try {
+            const response = await fetch(
+                `${API_BASE_URL}/charts/watchlists/${listId}/export`
+            )
+            const data = await response.json()
+            return data
+        } catch (error) {
+            console.error('[exportWatchList]: Error', error)
+            return { status: 'error', message: error.message }
+        }
+    },
+
+    importWatchList: async (exported) => {
+        console.log('[importWatchList]: Method call', { name: exported.name })
+        try {
+            const response = await fetch(
+                `${API_BASE_URL}/charts/watchlists/import`,
+                {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(exported)
+                }
+            )
+            const data = await response.json()
+            return data
+        } catch (error) {
+            console.error('[importWatchList]: Error', error)
+            return { status: 'error', message: error.message }
+        }
+    },
+
+    // 批次取得多個商品的最新價格、24 小時漲跌與成交量
+    getPrices: async (fullNames) => {
+        console.log('[getPrices]: Method call', { count: fullNames.length })
+        try {
+            const response = await fetch(
+                `${API_BASE_URL}/quotes/prices`,
+                {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({ symbols: fullNames })
+                }
+            )
+            const data = await response.json()
+            return data
+        } catch (error) {
+            console.error('[getPrices]: Error', error)
+            return { status: 'error', message: error.message }
+        }
     }
 }
\ No newline at end of file
@@ -237,6 +237,35 @@ function createWatchlistModal() {
             margin-top: 3px;
         }
         
+        .symbol-quote {
+            display: flex;
+            flex-direction: column;
+            align-items: flex-end;
+            margin-left: auto;
+            margin-right: 16px;
+        }
+        
+        .symbol-price {
+            color: #e0e3eb;
+            font-size: 15px;
+            font-variant-numeric: tabular-nums;
+        }
+        
+        .symbol-change {
+            font-size: 13px;
+            color: #787b86;
+            margin-top: 3px;
+            font-variant-numeric: tabular-nums;
+        }
+        
+        .symbol-change.up {
+            color: #26a69a;
+        }
+        
+        .symbol-change.down {
+            color: #ef5350;
+        }
+        
         .symbol-remove {
             background: rgba(250, 250, 250, 0.05);
             border: none;
@@ -627,20 +656,27 @@ function backToWatchlists() {
     if (watchlistModal) watchlistModal.style.display = 'block';
 }
 
-// 加載交易所商品數據
-async function loadMarkets(exchange) {
+// 每次搜索返回的商品數量
+const MARKET_PAGE_SIZE = 50;
+
+// 在伺服器端搜索交易所商品，只返回一頁排序後的結果
+async function searchMarkets(exchange, searchText, offset = 0) {
     try {
-        const response = await fetch(`${API_BASE_URL}/markets/${exchange}`);
-        const data = await response.json();
+        const params = new URLSearchParams({ q: searchText, limit: MARKET_PAGE_SIZE, offset: offset });
+        const response = await fetch(`${API_BASE_URL}/markets/${exchange}/search?${params}`);
+        if (!response.ok) {
+            return null;
+        }
 
+        const data = await response.json();
         if (data.success && data.data) {
-            return data.data.markets;
+            return data.data;
         }
 
-        return [];
+        return null;
     } catch (error) {
-        console.error('[loadMarkets]: Error loading markets', error);
-        return [];
+        console.error('[searchMarkets]: Error searching markets', error);
+        return null;
     }
 }
 
@@ -700,6 +736,32 @@ async function initWatchlistModal(tvWidget) {
         });
     }
 
+    // 最近一次搜索的序號，用於丟棄過期的回應
+    let marketSearchSeq = 0;
+    let marketSearchTimer = null;
+
+    async function runMarketSearch(exchange, searchText) {
+        const seq = ++marketSearchSeq;
+        const result = await searchMarkets(exchange, searchText);
+
+        // 輸入已經改變，忽略舊的結果
+        if (seq !== marketSearchSeq) return;
+
+        const marketList = document.getElementById('marketList');
+        if (!marketList) return;
+
+        if (!result) {
+            marketList.innerHTML = `
+                <div class="empty-list">
+                    <p>無法獲取商品數據或交易所不存在</p>
+                </div>
+            `;
+            return;
+        }
+
+        displayMarkets(result.markets, result.total, exchange);
+    }
+
     if (searchMarketsBtn) {
         searchMarketsBtn.addEventListener('click', async () => {
             const exchange = exchangeInput.value.trim().toLowerCase();
@@ -716,26 +778,14 @@ async function initWatchlistModal(tvWidget) {
                     </div>
                 `;
 
-                const markets = await loadMarkets(exchange);
-
-                if (markets.length === 0) {
-                    marketList.innerHTML = `
-                        <div class="empty-list">
-                            <p>無法獲取商品數據或交易所不存在</p>
-                        </div>
-                    `;
-                    return;
-                }
-
-                const searchText = marketSearch.value.trim();
-                filterAndDisplayMarkets(markets, searchText, exchange);
+                await runMarketSearch(exchange, marketSearch.value.trim());
             }
         });
     }
 
-    // 搜索框輸入事件
+    // 搜索框輸入事件，停止輸入後才向伺服器搜索
     if (marketSearch) {
-        marketSearch.addEventListener('input', async () => {
+        marketSearch.addEventListener('input', () => {
             const exchange = exchangeInput.value.trim().toLowerCase();
             const searchText = marketSearch.value.trim();
 
@@ -743,35 +793,17 @@ async function initWatchlistModal(tvWidget) {
                 return;
             }
 
-            // 只有當已有市場數據時才過濾
-            const marketList = document.getElementById('marketList');
-            if (marketList.querySelector('.market-item')) {
-                const markets = await loadMarkets(exchange);
-                filterAndDisplayMarkets(markets, searchText, exchange);
-            }
+            clearTimeout(marketSearchTimer);
+            marketSearchTimer = setTimeout(() => runMarketSearch(exchange, searchText), 150);
         });
     }
 
-    // 過濾並顯示商品
-    function filterAndDisplayMarkets(markets, searchText, exchange) {
+    // 顯示搜索到的商品
+    function displayMarkets(markets, total, exchange) {
         const marketList = document.getElementById('marketList');
         if (!marketList) return;
 
-        const filteredMarkets = markets.filter(market => {
-            if (!searchText) return true;
-
-            const parts = market.split('/');
-            if (parts.length !== 2) return false;
-
-            const symbol = market.replace('/', '').toLowerCase();
-            const [baseCurrency, quoteCurrency] = parts;
-
-            return symbol.includes(searchText.toLowerCase()) ||
-                baseCurrency.includes(searchText.toLowerCase()) ||
-                quoteCurrency.includes(searchText.toLowerCase());
-        });
-
-        if (filteredMarkets.length === 0) {
+        if (markets.length === 0) {
             marketList.innerHTML = `
                 <div class="empty-list">
                     <p>沒有找到匹配的商品</p>
@@ -781,7 +813,7 @@ async function initWatchlistModal(tvWidget) {
         }
 
         let html = '';
-        filteredMarkets.forEach(market => {
+        markets.forEach(market => {
             const symbol = market.replace('/', '').toUpperCase();
             const fullName = exchange.toUpperCase() + ":" + symbol
 
@@ -801,6 +833,14 @@ async function initWatchlistModal(tvWidget) {
             `;
         });
 
+        if (total > markets.length) {
+            html += `
+                <div class="empty-list">
+                    <p>顯示 ${markets.length} / ${total} 個商品，請輸入更精確的關鍵字</p>
+                </div>
+            `;
+        }
+
         marketList.innerHTML = html;
 
         // 新增商品點擊事件
@@ -836,25 +876,6 @@ async function initWatchlistModal(tvWidget) {
         });
     }
 
-    // 搜索商品
-    if (marketSearch) {
-        marketSearch.addEventListener('input', async () => {
-            const exchange = exchangeInput.value;
-            const searchText = marketSearch.value.trim();
-
-            if (!exchange) {
-                return;
-            }
-
-            // 如果已有市場數據，直接過濾
-            const marketList = document.getElementById('marketList');
-            if (marketList.querySelector('.market-item')) {
-                const markets = await loadMarkets(exchange);
-                filterAndDisplayMarkets(markets, searchText, exchange);
-            }
-        });
-    }
-
     // 保存觀察清單
     if (saveWatchlistBtn) {
         saveWatchlistBtn.addEventListener('click', async () => {
@@ -1071,6 +1092,10 @@ async function openWatchlistItems(listId, tvWidget) {
                             <div class="symbol-name">${symbolDisplay}</div>
                             <div class="symbol-exchange">${item.exchange ? item.exchange.toUpperCase() : ''}</div>
                         </div>
+                        <div class="symbol-quote">
+                            <div class="symbol-price">—</div>
+                            <div class="symbol-change"></div>
+                        </div>
                         <button class="symbol-remove" data-symbol="${item.symbol}" data-exchange="${item.exchange}" title="從清單中移除">
                             <svg width="16" height="16" viewBox="0 0 24 24">
                                 <path fill="currentColor" d="M19 6.41L17.59 5 12 10.59 6.41 5 5 6.41 10.59 12 5 17.59 6.41 19 12 13.41 17.59 19 19 17.59 13.41 12 19 6.41z"/>
@@ -1082,6 +1107,17 @@ async function openWatchlistItems(listId, tvWidget) {
 
             watchlistContent.innerHTML = html;
 
+            // 一次請求取得整個清單的報價，不阻塞列表顯示；清單開啟期間定期更新
+            loadWatchlistPrices(watchlistContent);
+            clearInterval(watchlistPriceTimer);
+            watchlistPriceTimer = setInterval(() => {
+                if (modal.style.display === 'none' || !watchlistContent.querySelector('.symbol-quote')) {
+                    clearInterval(watchlistPriceTimer);
+                    return;
+                }
+                loadWatchlistPrices(watchlistContent);
+            }, WATCHLIST_PRICE_REFRESH_MS);
+
             // 新增項目點擊事件
             const items = watchlistContent.querySelectorAll('.symbol-item');
             items.forEach(item => {
@@ -1137,6 +1173,35 @@ async function openWatchlistItems(listId, tvWidget) {
     }
 }
 
+// 伺服器共用排程輪詢報價，各客戶端的定期請求只讀取記憶體快取
+const WATCHLIST_PRICE_REFRESH_MS = 5000;
+let watchlistPriceTimer = null;
+
+// 批次載入清單中商品的報價並填入列表
+async function loadWatchlistPrices(watchlistContent) {
+    const items = Array.from(watchlistContent.querySelectorAll('.symbol-item'));
+    const fullNames = [...new Set(items.map(item => item.getAttribute('data-symbol')))];
+    if (fullNames.length === 0) return;
+
+    const result = await watchList.getPrices(fullNames);
+    if (!result || !result.success) return;
+
+    items.forEach(item => {
+        const quote = result.data.prices[item.getAttribute('data-symbol')];
+        if (!quote || quote.price == null) return;
+
+        item.querySelector('.symbol-price').textContent = quote.price.toLocaleString(undefined, { maximumFractionDigits: 8 });
+
+        const change = item.querySelector('.symbol-change');
+        if (quote.change_percent != null) {
+            const percent = quote.change_percent;
+            change.textContent = `${percent > 0 ? '+' : ''}${percent.toFixed(2)}%`;
+            change.classList.toggle('up', percent > 0);
+            change.classList.toggle('down', percent < 0);
+        }
+    });
+}
+
 // 編輯觀察清單
 async function editWatchlist(listId, tvWidget) {
     if (!listId) return;
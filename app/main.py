@@ -2,6 +2,7 @@ import os
 import sys
 import orjson
 from typing import Optional, Any
+from urllib.parse import unquote_plus
 
 from robyn import Robyn, Request, Response, WebSocket, ALLOW_CORS, serve_html
 from robyn.argument_parser import Config
@@ -9,6 +10,8 @@ from robyn.types import JSONResponse, PathParams
 
 from app.config import settings
 from app.services.service_manager import ServiceManager
+from app.database.chart_storage import ChartRevisionConflict
+from app.database.json_patch import JsonPatchError
 
 class BaseResponse(JSONResponse):
     success: bool
@@ -68,6 +71,28 @@ async def shutdown():
 async def root():
     return serve_html(os.path.join(frontend_dir, "index.html"))
 
+@app.get(f"{settings.API_PREFIX}/markets/venues")
+async def get_market_venues(request: Request) -> BaseDataResponse | Response:
+    # Query values arrive still percent-encoded
+    symbol = unquote_plus(request.query_params.get("symbol", ""))
+    base = unquote_plus(request.query_params.get("base", ""))
+    quote = unquote_plus(request.query_params.get("quote", "")) or None
+
+    if not symbol and not base:
+        return Response(
+            status_code=400,
+            headers={},
+            description="Missing 'symbol' or 'base' query parameter."
+        )
+
+    quote_service = ServiceManager.get_quote_service()
+    venues = await quote_service.find_venues(symbol or base, None if symbol else quote)
+
+    return BaseDataResponse(
+        success=True,
+        data=venues
+    )
+
 @app.get(f"{settings.API_PREFIX}/markets/:exchange")
 async def get_markets(path_params: PathParams) -> BaseDataResponse | Response:
     exchange = path_params["exchange"].lower()
@@ -87,45 +112,211 @@ async def get_markets(path_params: PathParams) -> BaseDataResponse | Response:
         data=markets
     )
 
-@app.get(f"{settings.API_PREFIX}/charts/latest")
-async def get_latest_chart() -> BaseDataResponse | Response:
-    chart_storage_db = ServiceManager.get_chart_storage_db()
-    chart = await chart_storage_db.get_latest_chart()
-    
+@app.get(f"{settings.API_PREFIX}/markets/:exchange/search")
+async def search_markets(request: Request, path_params: PathParams) -> BaseDataResponse | Response:
+    exchange_name = path_params["exchange"].lower()
+    # Query values arrive still percent-encoded
+    text = unquote_plus(request.query_params.get("q", ""))
+
+    try:
+        limit = min(max(int(request.query_params.get("limit", "50")), 1), 200)
+        offset = max(int(request.query_params.get("offset", "0")), 0)
+    except ValueError:
+        return Response(
+            status_code=400,
+            headers={},
+            description="'limit' and 'offset' must be integers."
+        )
+
+    quote_service = ServiceManager.get_quote_service()
+    markets = await quote_service.search_exchange_markets(exchange_name, text, limit, offset)
+
+    if not markets:
+        return Response(
+            status_code=500,
+            headers={},
+            description=f"No markets found for exchange '{exchange_name}'"
+        )
+
     return BaseDataResponse(
         success=True,
-        data=chart
+        data=markets
     )
 
-@app.post(f"{settings.API_PREFIX}/charts/save")
-async def save_chart(request: Request) -> BaseResponse | Response:
-    body = request.json()
+@app.get(f"{settings.API_PREFIX}/markets/:exchange/info")
+async def get_market_info(request: Request, path_params: PathParams) -> BaseDataResponse | Response:
+    exchange_name = path_params["exchange"].lower()
+    symbol = unquote_plus(request.query_params.get("symbol", ""))
 
-    if not body or not all(key in body for key in ["name", "content", "symbol", "resolution"]):
+    if not symbol:
         return Response(
             status_code=400,
             headers={},
-            description="Invalid request body. 'name', 'content', 'symbol', and 'resolution' are required."
+            description="Missing 'symbol' query parameter."
         )
 
-    chart_storage_db = ServiceManager.get_chart_storage_db()
-    success = await chart_storage_db.save_chart(
-        name=body['name'],
-        content=body['content'],
-        symbol=body['symbol'],
-        resolution=body['resolution'],
+    quote_service = ServiceManager.get_quote_service()
+    market = await quote_service.get_market_info(exchange_name, symbol)
+
+    if not market:
+        return Response(
+            status_code=404,
+            headers={},
+            description=f"Market {symbol} on {exchange_name} not found."
+        )
+
+    return BaseDataResponse(
+        success=True,
+        data=market
     )
 
-    if not success:
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check whether the client already has the response with this ETag.
+    
+    Args:
+        request: Request with an optional If-None-Match header
+        etag: Current ETag of the resource
+        
+    Returns:
+        True if If-None-Match lists the ETag (or is '*')
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+def not_modified(etag: str) -> Response:
+    """
+    Build a 304 response for a client whose copy is current.
+    
+    Args:
+        etag: Current ETag of the resource
+        
+    Returns:
+        304 without a body
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"}, description="")
+
+def etag_data_response(etag: str, data: Any) -> Response:
+    """
+    Build a BaseDataResponse-shaped JSON response carrying an ETag.
+    
+    Args:
+        etag: ETag of the data, read before the data itself
+        data: Response data
+        
+    Returns:
+        200 with the data
+    """
+    # no-cache: browsers keep the response but revalidate it on every use
+    return Response(
+        status_code=200,
+        headers={"ETag": etag, "Cache-Control": "no-cache", "Content-Type": "application/json"},
+        description=orjson.dumps({"success": True, "data": data})
+    )
+
+@app.get(f"{settings.API_PREFIX}/charts/latest")
+async def get_latest_chart(request: Request) -> Response:
+    chart_storage_db = ServiceManager.get_chart_storage_db()
+    etag = chart_storage_db.cache.etag
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    chart = await chart_storage_db.get_latest_chart()
+    return etag_data_response(etag, chart)
+
+def json_body(request: Request) -> Optional[Any]:
+    """
+    Parse a JSON request body. request.json() turns nested values (lists,
+    objects) into strings, bodies carrying them are parsed here instead.
+    
+    Args:
+        request: Request with a JSON body
+        
+    Returns:
+        Parsed body, None if it is not valid JSON
+    """
+    try:
+        return orjson.loads(request.body)
+    except orjson.JSONDecodeError:
+        return None
+
+@app.post(f"{settings.API_PREFIX}/charts/save")
+async def save_chart(request: Request) -> BaseDataResponse | Response:
+    body = json_body(request)
+
+    if (
+        not isinstance(body, dict)
+        or not all(key in body for key in ["name", "symbol", "resolution"])
+        or ("content" not in body and "patch" not in body)
+    ):
         return Response(
-            status_code=500,
+            status_code=400,
             headers={},
-            description="Failed to save chart"
+            description="Invalid request body. 'name', 'symbol', 'resolution' and either 'content' "
+                        "or 'patch' with 'base_revision' are required."
         )
+
+    chart_storage_db = ServiceManager.get_chart_storage_db()
+
+    if "patch" in body:
+        # Delta save: a JSON patch against the revision the client last saved
+        base_revision = body.get("base_revision")
+        if not isinstance(base_revision, int) or not isinstance(body["patch"], list):
+            return Response(
+                status_code=400,
+                headers={},
+                description="'patch' must be a list of operations and 'base_revision' an integer."
+            )
+
+        try:
+            result = await chart_storage_db.save_chart_patch(
+                name=body['name'],
+                patch=body['patch'],
+                base_revision=base_revision,
+                symbol=body['symbol'],
+                resolution=body['resolution'],
+            )
+        except ChartRevisionConflict as e:
+            return Response(
+                status_code=409,
+                headers={},
+                description=f"Chart is at revision {e.revision}, not {base_revision}"
+            )
+        except JsonPatchError as e:
+            return Response(
+                status_code=400,
+                headers={},
+                description=f"Invalid patch: {e}"
+            )
+
+        if result is None:
+            return Response(
+                status_code=404,
+                headers={},
+                description="Chart not found"
+            )
+    else:
+        result = await chart_storage_db.save_chart(
+            name=body['name'],
+            content=body['content'],
+            symbol=body['symbol'],
+            resolution=body['resolution'],
+        )
+
+        if not result:
+            return Response(
+                status_code=500,
+                headers={},
+                description="Failed to save chart"
+            )
     
-    return BaseResponse(
+    return BaseDataResponse(
         success=True,
-        message="Chart saved successfully"
+        data=result
     )
 
 @app.get(f"{settings.API_PREFIX}/charts/load/:chart_id")
@@ -146,10 +337,67 @@ async def load_chart(path_params: PathParams) -> BaseDataResponse | Response:
         data=chart
     )
 
+def accepts_encoding(accept_encoding: Optional[str], coding: str) -> bool:
+    """
+    Check whether an Accept-Encoding header allows a content coding.
+    
+    Args:
+        accept_encoding: Accept-Encoding header value
+        coding: Content coding to check (e.g. 'deflate')
+        
+    Returns:
+        True if the coding is listed, or matched by '*', with a q-value above 0
+    """
+    qualities = {}
+    for item in (accept_encoding or "").lower().split(","):
+        name, _, params = item.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+    
+    quality = qualities.get(coding, qualities.get("*", 0.0))
+    return quality > 0
+
+@app.get(f"{settings.API_PREFIX}/charts/load/:chart_id/content")
+async def load_chart_content(request: Request, path_params: PathParams) -> Response:
+    chart_id = path_params["chart_id"]
+    deflate = accepts_encoding(request.headers.get("accept-encoding"), "deflate")
+
+    chart_storage_db = ServiceManager.get_chart_storage_db()
+    content = await chart_storage_db.get_chart_content(chart_id, deflate=deflate)
+
+    if content is None:
+        return Response(
+            status_code=404,
+            headers={},
+            description=f"Chart with ID '{chart_id}' not found."
+        )
+
+    headers = {"Content-Type": "text/plain; charset=utf-8", "Vary": "Accept-Encoding"}
+    if deflate:
+        # The stored zlib stream is sent as is, the browser inflates it
+        headers["Content-Encoding"] = "deflate"
+
+    return Response(
+        status_code=200,
+        headers=headers,
+        description=content
+    )
+
 @app.get(f"{settings.API_PREFIX}/charts/list")
 async def list_charts() -> BaseDataResponse:
     chart_storage_db = ServiceManager.get_chart_storage_db()
-    charts = await chart_storage_db.get_all_charts()
+    charts = await chart_storage_db.list_charts()
 
     return BaseDataResponse(
         success=True,
@@ -175,19 +423,23 @@ async def delete_chart(path_params: PathParams) -> BaseResponse | Response:
     )
 
 @app.get(f"{settings.API_PREFIX}/charts/watchlists")
-async def get_watchlists() -> BaseDataResponse | Response:
+async def get_watchlists(request: Request) -> Response:
     watch_list = ServiceManager.get_watch_list_db()
-    watchlists_with_items = await watch_list.get_all_watch_lists_with_items()
+    etag = watch_list.cache.etag
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    return BaseDataResponse(
-        success=True,
-        data=watchlists_with_items
-    )
+    watchlists_with_items = await watch_list.get_all_watch_lists_with_items()
+    return etag_data_response(etag, watchlists_with_items)
 
 @app.get(f"{settings.API_PREFIX}/charts/watchlists/:watchlist_id")
-async def get_watchlist(path_params: PathParams) -> BaseDataResponse | Response:
+async def get_watchlist(request: Request, path_params: PathParams) -> Response:
     watchlist_id = path_params["watchlist_id"]
     watch_list = ServiceManager.get_watch_list_db()
+    etag = watch_list.cache.etag
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     watchlist = await watch_list.get_watch_list_items_by_id(watchlist_id)
 
     if not watchlist:
@@ -197,10 +449,7 @@ async def get_watchlist(path_params: PathParams) -> BaseDataResponse | Response:
             description=f"Watchlist with ID '{watchlist_id}' not found."
         )
     
-    return BaseDataResponse(
-        success=True,
-        data=watchlist
-    )
+    return etag_data_response(etag, watchlist)
 
 @app.post(f"{settings.API_PREFIX}/charts/watchlists/create")
 async def create_watchlist(request: Request) -> BaseResponse | Response:
@@ -332,6 +581,174 @@ async def remove_from_watchlist(path_params: PathParams) -> BaseResponse | Respo
         message="Item removed from watchlist successfully"
     )
 
+@app.post(f"{settings.API_PREFIX}/charts/watchlists/:watchlist_id/bulk_add")
+async def bulk_add_to_watchlist(request: Request, path_params: PathParams) -> BaseDataResponse | Response:
+    watchlist_id = path_params["watchlist_id"]
+    body = json_body(request)
+
+    if not isinstance(body, dict) or not isinstance(body.get("items"), list):
+        return Response(
+            status_code=400,
+            headers={},
+            description="Invalid request body. 'items' must be a list of {symbol, full_name, exchange, description}."
+        )
+
+    watch_list = ServiceManager.get_watch_list_db()
+    try:
+        added = await watch_list.add_items_to_watch_list(watchlist_id, body["items"])
+    except ValueError as e:
+        return Response(
+            status_code=400,
+            headers={},
+            description=str(e)
+        )
+
+    if added is None:
+        return Response(
+            status_code=404,
+            headers={},
+            description=f"Watchlist with ID '{watchlist_id}' not found."
+        )
+
+    return BaseDataResponse(
+        success=True,
+        data={"added": added}
+    )
+
+@app.post(f"{settings.API_PREFIX}/charts/watchlists/:watchlist_id/bulk_remove")
+async def bulk_remove_from_watchlist(request: Request, path_params: PathParams) -> BaseDataResponse | Response:
+    watchlist_id = path_params["watchlist_id"]
+    body = json_body(request)
+
+    if not isinstance(body, dict) or not isinstance(body.get("full_names"), list):
+        return Response(
+            status_code=400,
+            headers={},
+            description="Invalid request body. 'full_names' must be a list."
+        )
+
+    watch_list = ServiceManager.get_watch_list_db()
+    removed = await watch_list.remove_items_from_watch_list(watchlist_id, body["full_names"])
+
+    return BaseDataResponse(
+        success=True,
+        data={"removed": removed}
+    )
+
+@app.put(f"{settings.API_PREFIX}/charts/watchlists/:watchlist_id/reorder")
+async def reorder_watchlist(request: Request, path_params: PathParams) -> BaseResponse | Response:
+    watchlist_id = path_params["watchlist_id"]
+    body = json_body(request)
+
+    if not isinstance(body, dict) or not isinstance(body.get("full_names"), list):
+        return Response(
+            status_code=400,
+            headers={},
+            description="Invalid request body. 'full_names' must be a list in the new order."
+        )
+
+    watch_list = ServiceManager.get_watch_list_db()
+    success = await watch_list.reorder_watch_list_items(watchlist_id, body["full_names"])
+
+    if not success:
+        return Response(
+            status_code=404,
+            headers={},
+            description=f"Watchlist with ID '{watchlist_id}' not found."
+        )
+
+    return BaseResponse(
+        success=True,
+        message="Watchlist reordered successfully"
+    )
+
+@app.get(f"{settings.API_PREFIX}/charts/watchlists/:watchlist_id/export")
+async def export_watchlist(path_params: PathParams) -> BaseDataResponse | Response:
+    watchlist_id = path_params["watchlist_id"]
+    watch_list = ServiceManager.get_watch_list_db()
+    exported = await watch_list.export_watch_list(watchlist_id)
+
+    if exported is None:
+        return Response(
+            status_code=404,
+            headers={},
+            description=f"Watchlist with ID '{watchlist_id}' not found."
+        )
+
+    return BaseDataResponse(
+        success=True,
+        data=exported
+    )
+
+@app.post(f"{settings.API_PREFIX}/charts/watchlists/import")
+async def import_watchlist(request: Request) -> BaseDataResponse | Response:
+    body = json_body(request)
+
+    if not isinstance(body, dict):
+        return Response(
+            status_code=400,
+            headers={},
+            description="Invalid request body. Expected an exported watchlist."
+        )
+
+    watch_list = ServiceManager.get_watch_list_db()
+    try:
+        result = await watch_list.import_watch_list(body)
+    except ValueError as e:
+        return Response(
+            status_code=400,
+            headers={},
+            description=str(e)
+        )
+
+    if result is None:
+        return Response(
+            status_code=500,
+            headers={},
+            description="Failed to import watchlist"
+        )
+
+    return BaseDataResponse(
+        success=True,
+        data=result
+    )
+
+@app.get(f"{settings.API_PREFIX}/search")
+async def search(request: Request) -> BaseDataResponse | Response:
+    # Query values arrive still percent-encoded
+    text = unquote_plus(request.query_params.get("q", ""))
+    search_type = request.query_params.get("type", "charts")
+
+    try:
+        limit = min(max(int(request.query_params.get("limit", "20")), 1), 100)
+        offset = max(int(request.query_params.get("offset", "0")), 0)
+    except ValueError:
+        return Response(
+            status_code=400,
+            headers={},
+            description="'limit' and 'offset' must be integers."
+        )
+
+    # One extra row tells whether there is a next page
+    if search_type == "charts":
+        results = await ServiceManager.get_chart_storage_db().search_charts(text, limit + 1, offset)
+    elif search_type == "watchlist_items":
+        results = await ServiceManager.get_watch_list_db().search_watch_list_items(text, limit + 1, offset)
+    else:
+        return Response(
+            status_code=400,
+            headers={},
+            description="'type' must be 'charts' or 'watchlist_items'."
+        )
+
+    return BaseDataResponse(
+        success=True,
+        data={
+            "results": results[:limit],
+            "next_offset": offset + limit if len(results) > limit else None
+        }
+    )
+
 @app.get(f"{settings.API_PREFIX}/quotes/price")
 async def get_current_price(request: Request) -> BaseDataResponse | Response:
     if all(key not in request.query_params for key in ["exchange", "symbol"]):
@@ -342,7 +759,7 @@ async def get_current_price(request: Request) -> BaseDataResponse | Response:
         )
     
     exchange_name = request.query_params.get("exchange", "binance")
-    symbol = request.query_params.get("symbol", "BTCUSDT")
+    symbol = unquote_plus(request.query_params.get("symbol", "BTCUSDT"))
 
     quote_service = ServiceManager.get_quote_service()
     price_data = await quote_service.get_current_price(exchange_name, symbol)
@@ -359,6 +776,31 @@ async def get_current_price(request: Request) -> BaseDataResponse | Response:
         data=price_data
     )
 
+@app.post(f"{settings.API_PREFIX}/quotes/prices")
+async def get_current_prices(request: Request) -> BaseDataResponse | Response:
+    body = json_body(request)
+    symbols = body.get("symbols") if isinstance(body, dict) else None
+
+    if (
+        not isinstance(symbols, list)
+        or not all(isinstance(symbol, str) for symbol in symbols)
+        or len(symbols) > 500
+    ):
+        return Response(
+            status_code=400,
+            headers={},
+            description="Invalid request body. 'symbols' must be a list of at most 500 'EXCHANGE:SYMBOL' strings."
+        )
+
+    # Served from the shared ticker polling, only symbols nobody polls yet go upstream
+    ticker_scheduler = ServiceManager.get_ticker_scheduler()
+    prices = await ticker_scheduler.get_prices(symbols)
+
+    return BaseDataResponse(
+        success=True,
+        data={"prices": prices}
+    )
+
 @app.get(f"{settings.API_PREFIX}/quotes/history")
 async def get_price_history(request: Request) -> BaseDataResponse | Response:
     if all(key not in request.query_params for key in ["exchange", "symbol", "timeframe", "since", "end"]):
@@ -377,6 +819,13 @@ async def get_price_history(request: Request) -> BaseDataResponse | Response:
     quote_service = ServiceManager.get_quote_service()
     history_data = await quote_service.get_price_history(exchange_name, symbol, timeframe, since, end)
 
+    if "error" in history_data:
+        return Response(
+            status_code=400,
+            headers={},
+            description=history_data["error"]
+        )
+
     if not history_data:
         return Response(
             status_code=500,
@@ -1,6 +1,6 @@
 import time
 import asyncio
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Optional
 
 import ccxt.async_support as ccxt
 
@@ -9,14 +9,16 @@ class ExchangePool:
     A connection pool for CCXT exchange instances.
     Reuses exchange connections to improve performance.
     """
-    def __init__(self, max_idle_time: int = 300):
+    def __init__(self, max_idle_time: int = 300, exchange_factory: Optional[Callable[[str], Any]] = None):
         """
         Initialize the exchange pool.
         
         Args:
             max_idle_time: Maximum idle time in seconds before an exchange connection is closed
+            exchange_factory: Creates exchanges by name instead of ccxt, e.g. a stand-in for benchmarks
         """
         self.exchanges: Dict[str, Dict[str, Any]] = {}
+        self.exchange_factory = exchange_factory
         self.max_idle_time = max_idle_time
         self.lock = asyncio.Lock()
         self.cleanup_task = None
@@ -43,8 +45,11 @@ class ExchangePool:
                 return exchange_data['instance']
                 
             try:
-                exchange_class = getattr(ccxt, exchange_name)
-                exchange = exchange_class()
+                if self.exchange_factory is not None:
+                    exchange = self.exchange_factory(exchange_name)
+                else:
+                    exchange_class = getattr(ccxt, exchange_name)
+                    exchange = exchange_class()
                 
                 self.exchanges[exchange_name] = {
                     'instance': exchange,
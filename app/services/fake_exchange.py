@@ -0,0 +1,142 @@
+import math
+import time
+import zlib
+import random
+import asyncio
+from typing import Dict, List, Optional
+
+import orjson
+
+class SyntheticTradeExchange:
+    """
+    A ccxt.pro stand-in that generates random-walk trades for any symbol.
+
+    Every watch_trades call waits one tick (1 / rate seconds) and returns a
+    single trade stamped with the current wall clock, so the timestamp seen by
+    a client measures the server's tick-to-client latency.
+    """
+    def __init__(self, exchange_id: str, rate: float = 10.0):
+        """
+        Initialize the synthetic exchange.
+
+        Args:
+            exchange_id: Exchange ID reported to callers
+            rate: Trades per second generated for each symbol
+        """
+        self.id = exchange_id.lower()
+        self.rate = rate
+        self.prices: Dict[str, float] = {}
+        self.randoms: Dict[str, random.Random] = {}
+        self.trade_ids: Dict[str, int] = {}
+
+    async def watch_trades(self, symbol: str, since: Optional[int] = None, limit: Optional[int] = None, params: Optional[dict] = None) -> list:
+        await asyncio.sleep(1 / self.rate if self.rate > 0 else 0)
+
+        # Seed per symbol so every run produces the same price path
+        rng = self.randoms.get(symbol)
+        if rng is None:
+            rng = self.randoms[symbol] = random.Random(zlib.crc32(symbol.encode()))
+            self.prices[symbol] = rng.uniform(1, 1000)
+
+        price = self.prices[symbol] * (1 + rng.gauss(0, 0.0005))
+        self.prices[symbol] = price
+        trade_id = self.trade_ids.get(symbol, 0) + 1
+        self.trade_ids[symbol] = trade_id
+
+        return [{
+            "id": str(trade_id),
+            "symbol": symbol,
+            "timestamp": int(time.time() * 1000),
+            "price": price,
+            "amount": round(rng.uniform(0.001, 2), 6),
+            "side": "buy" if rng.random() < 0.5 else "sell",
+        }]
+
+    async def close(self):
+        """Nothing to release, present for ccxt compatibility"""
+        return None
+
+class SyntheticOHLCVExchange:
+    """
+    A ccxt REST stand-in that serves deterministic fetch_ohlcv candles.
+
+    Each call waits `latency_ms` and returns at most `page_limit` candles, which
+    mimics exchanges that cap page sizes below what the caller asked for.
+    Call counters are written to `stats_path` (when set) so an out-of-process
+    benchmark can read the number of upstream requests.
+    """
+    TIMEFRAMES = {
+        "1m": 60000,
+        "5m": 300000,
+        "15m": 900000,
+        "30m": 1800000,
+        "1h": 3600000,
+        "4h": 14400000,
+        "1d": 86400000,
+        "1w": 604800000,
+        "1M": 2592000000,
+    }
+
+    def __init__(
+        self,
+        exchange_id: str,
+        latency_ms: float = 50,
+        page_limit: int = 1000,
+        stats_path: Optional[str] = None
+    ):
+        """
+        Initialize the synthetic exchange.
+
+        Args:
+            exchange_id: Exchange ID reported to callers
+            latency_ms: Simulated round trip per request in milliseconds
+            page_limit: Maximum candles returned per request
+            stats_path: File to write call counters to after every request
+        """
+        self.id = exchange_id.lower()
+        self.latency_ms = latency_ms
+        self.page_limit = page_limit
+        self.stats_path = stats_path
+        self.call_count = 0
+        self.candle_count = 0
+
+    async def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = "1m",
+        since: Optional[int] = None,
+        limit: Optional[int] = None,
+        params: Optional[dict] = None
+    ) -> List[list]:
+        await asyncio.sleep(self.latency_ms / 1000)
+
+        interval_ms = self.TIMEFRAMES.get(timeframe)
+        if interval_ms is None:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+        now = int(time.time() * 1000)
+        count = min(limit or self.page_limit, self.page_limit)
+        start = since if since is not None else now - count * interval_ms
+        start -= start % interval_ms
+        seed = zlib.crc32(symbol.encode()) % 1000 + 10
+
+        candles = []
+        for i in range(count):
+            timestamp = start + i * interval_ms
+            if timestamp > now:
+                break
+            wave = seed * (1 + 0.1 * math.sin(timestamp / 3.6e7))
+            candles.append([timestamp, wave, wave * 1.002, wave * 0.998, wave * 1.001, 1 + i % 17])
+
+        self.call_count += 1
+        self.candle_count += len(candles)
+
+        if self.stats_path:
+            with open(self.stats_path, "wb") as f:
+                f.write(orjson.dumps({"calls": self.call_count, "candles": self.candle_count}))
+
+        return candles
+
+    async def close(self):
+        """Nothing to release, present for ccxt compatibility"""
+        return None
\ No newline at end of file
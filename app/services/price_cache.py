@@ -0,0 +1,67 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.database.symbol_index import normalize_symbol
+
+class PriceCache:
+    """
+    Last known price of every symbol the server is watching, shared by the
+    streaming loops that write it and the REST price lookups that read it.
+
+    Entries are keyed by exchange and normalized symbol, so 'BTC/USDT' and
+    'BTCUSDT' share one entry. An entry older than max_age seconds is treated
+    as missing, callers then fall back to asking the exchange.
+    """
+    # Symbols kept, least recently written are dropped first
+    MAX_ENTRIES = 4096
+
+    def __init__(self, max_age: float = 10.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_age: Seconds a price is served after it was written
+        """
+        self.max_age = max_age
+        # (exchange, normalized symbol) -> (quote, monotonic time written)
+        self.entries: Dict[Tuple[str, str], Tuple[Dict[str, Any], float]] = {}
+
+    def _key(self, exchange_name: str, symbol: str) -> Tuple[str, str]:
+        return exchange_name.lower(), normalize_symbol(symbol)
+
+    def set(self, exchange_name: str, symbol: str, price: float, timestamp: Optional[int] = None, **fields: Any):
+        """
+        Store the latest price of a symbol. Fields of the previous entry that
+        are not given are kept, so a streamed price keeps the last ticker's 24h change.
+
+        Args:
+            exchange_name: Name of the exchange
+            symbol: Trading pair symbol, unified or as the client wrote it
+            price: Last traded price
+            timestamp: Exchange timestamp of the price in milliseconds
+            fields: Extra ticker fields kept with the price (e.g. change_percent)
+        """
+        key = self._key(exchange_name, symbol)
+        previous = self.entries.pop(key, None)
+        quote = {**previous[0]} if previous is not None else {}
+        quote.update(fields, price=price, timestamp=timestamp)
+        self.entries[key] = (quote, time.monotonic())
+
+        while len(self.entries) > self.MAX_ENTRIES:
+            self.entries.pop(next(iter(self.entries)))
+
+    def get(self, exchange_name: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest price of a symbol if it is fresh enough.
+
+        Args:
+            exchange_name: Name of the exchange
+            symbol: Trading pair symbol, unified or as the client wrote it
+
+        Returns:
+            Dict: Price and timestamp, None when unknown or stale
+        """
+        entry = self.entries.get(self._key(exchange_name, symbol))
+        if entry is None or time.monotonic() - entry[1] > self.max_age:
+            return None
+        return entry[0]
\ No newline at end of file
@@ -1,46 +1,66 @@
-from typing import Dict, Union, List
+import asyncio
+from typing import Any, Callable, Dict, Optional, Union, List
 
 import ccxt.async_support as ccxt
 
 from app.database.market_cache import MarketCache
 from app.services.exchange_pool import ExchangePool
+from app.services.price_cache import PriceCache
 
 class QuoteService:
-    def __init__(self):
+    def __init__(
+        self,
+        exchange_factory: Optional[Callable[[str], Any]] = None,
+        price_cache: Optional[PriceCache] = None
+    ):
         self.market_cache = MarketCache()
-        self.exchange_pool = ExchangePool()
+        self.exchange_pool = ExchangePool(exchange_factory=exchange_factory)
+        self.price_cache = price_cache if price_cache is not None else PriceCache()
 
-    def __process_symbol(self, symbol: str, exchange_name: str) -> str:
-        if exchange_name in ['okx', 'bitopro', 'coinbase']:
-            symbol = symbol.replace('USDT', '/USDT')
-            symbol = symbol.replace('USDC', '/USDC')
-            return symbol
-        return symbol
-    
     async def get_exchange_by_name(self, exchange_name: str) -> ccxt.Exchange:
         return await self.exchange_pool.get_exchange(exchange_name)
     
-    async def _fetch_symbols(self, exchange_name: str) -> List[str]:
+    def _tick_size(self, precision: Any, precision_mode: int) -> Optional[float]:
+        """
+        Convert a ccxt precision to a tick size, e.g. 2 decimal places -> 0.01.
+        Significant digits have no fixed tick size and give None.
+        """
+        if precision is None:
+            return None
+        if precision_mode == ccxt.TICK_SIZE:
+            return float(precision)
+        if precision_mode == ccxt.DECIMAL_PLACES:
+            return 10 ** -int(precision)
+        return None
+
+    async def _fetch_markets(self, exchange_name: str) -> List[Dict[str, Any]]:
         try:
             exchange = await self.get_exchange_by_name(exchange_name)
-            
-            try:
-                tickers = await exchange.fetch_tickers()
-                return list(tickers.keys())
-            except Exception as ticker_error:
-                print(f"fetch_tickers failed for {exchange_name}, falling back to load_markets: {ticker_error}")
-                
-                markets = await exchange.load_markets()
-                return list(markets.keys())
+            markets = await exchange.load_markets()
+            precision_mode = getattr(exchange, "precisionMode", ccxt.DECIMAL_PLACES)
+
+            return [
+                {
+                    "symbol": symbol,
+                    "market_id": market.get("id"),
+                    "base": market.get("base"),
+                    "quote": market.get("quote"),
+                    "type": market.get("type"),
+                    "price_precision": self._tick_size((market.get("precision") or {}).get("price"), precision_mode),
+                    "amount_precision": self._tick_size((market.get("precision") or {}).get("amount"), precision_mode),
+                    "active": market.get("active"),
+                }
+                for symbol, market in markets.items()
+            ]
         
         except Exception as e:
-            print(f"Error fetching symbols from {exchange_name}: {e}")
+            print(f"Error fetching markets from {exchange_name}: {e}")
             return []
     
     async def get_exchange_markets(self, exchange_name: str) -> dict:
         """
         Get the trading pairs for a specific exchange.
-        Uses cache when available and valid (less than 30 days old).
+        Uses the cached markets when available, refreshing stale ones in the background.
 
         Args:
             exchange_name: Name of the exchange (e.g., 'binance', 'kraken')
@@ -49,7 +69,7 @@ class QuoteService:
             Dict: Exchange trading pairs
         """
         try:
-            symbols_data = await self.market_cache.get_symbols(exchange_name, self._fetch_symbols)
+            symbols_data = await self.market_cache.get_symbols(exchange_name, self._fetch_markets)
             
             if "symbols" in symbols_data:
                 return {
@@ -62,6 +82,93 @@ class QuoteService:
             print(e)
             return {}
 
+    async def search_exchange_markets(self, exchange_name: str, text: str, limit: int = 50, offset: int = 0) -> dict:
+        """
+        Search the trading pairs of an exchange through its in-memory symbol index.
+
+        Args:
+            exchange_name: Name of the exchange (e.g., 'binance', 'kraken')
+            text: Search text, e.g. 'btc', 'btc/us' or 'usdt'
+            limit: Maximum number of pairs to return
+            offset: Number of matching pairs to skip
+
+        Returns:
+            Dict: A page of matching pairs, best matches first, and the total match count
+        """
+        try:
+            result = await self.market_cache.search_pairs(
+                exchange_name, text, self._fetch_markets, limit=limit, offset=offset
+            )
+
+            if "pairs" in result:
+                return {
+                    "markets": result["pairs"],
+                    "total": result["total"],
+                    "next_offset": offset + limit if offset + limit < result["total"] else None,
+                    "source": result["source"]
+                }
+            return {}
+
+        except Exception as e:
+            print(e)
+            return {}
+
+    async def find_venues(self, base: str, quote: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Find which exchanges list a currency or a pair, from the cached markets of all exchanges.
+
+        Args:
+            base: Base currency ('BTC') or a whole pair ('BTC/USDT', 'BTCUSDT') when quote is None
+            quote: Quote currency, optional
+
+        Returns:
+            Dict: Native symbols per exchange and the number of exchanges
+        """
+        try:
+            venues = await self.market_cache.find_venues(base, quote, self._fetch_markets)
+            return {"venues": venues, "exchanges": len(venues)}
+        except Exception as e:
+            print(e)
+            return {"venues": {}, "exchanges": 0}
+
+    async def resolve_symbol(self, exchange_name: str, symbol: str) -> Optional[str]:
+        """
+        Resolve a TradingView-style symbol ('BTCUSDT') to the ccxt unified symbol
+        ('BTC/USDT') through the cached markets of the exchange.
+
+        Args:
+            exchange_name: Name of the exchange (e.g., 'binance', 'kraken')
+            symbol: Symbol with or without separators, or the exchange's market id
+
+        Returns:
+            The unified symbol, None if the exchange does not list it, or the symbol
+            unchanged when the markets of the exchange are unavailable
+        """
+        mirror = await self.market_cache.get_markets(exchange_name, self._fetch_markets)
+        if mirror is None:
+            return symbol
+
+        market = mirror.get(symbol)
+        return market["symbol"] if market else None
+
+    async def get_market_info(self, exchange_name: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the metadata of one market from the market cache, without calling the exchange
+        while the cached markets are valid.
+
+        Args:
+            exchange_name: Name of the exchange (e.g., 'binance', 'kraken')
+            symbol: Trading pair, e.g. 'BTC/USDT' or 'BTCUSDT'
+
+        Returns:
+            Dict: Symbol, base, quote, type, price/amount tick sizes and active flag, or None
+        """
+        try:
+            return await self.market_cache.get_market(exchange_name, symbol, self._fetch_markets)
+        except Exception as e:
+            print(e)
+            return None
+
     def _align_timeframe_boundaries(self, timestamp: int, timeframe: str) -> int:
         timeframe_map = {
             "1m": 60000,
@@ -107,11 +214,16 @@ class QuoteService:
         }
 
         try:
-            exchange = await self.get_exchange_by_name(exchange_name)
-            symbol = self.__process_symbol(symbol, exchange.id)
-            
             if timeframe not in timeframe_map:
                 return {"error": f"Unsupported timeframe: {timeframe}"}
+
+            # Unknown symbols fail here instead of after a request to the exchange
+            resolved = await self.resolve_symbol(exchange_name, symbol)
+            if resolved is None:
+                return {"error": f"Unknown symbol {symbol} on {exchange_name}"}
+            symbol = resolved
+
+            exchange = await self.get_exchange_by_name(exchange_name)
             
             interval_ms = timeframe_map[timeframe]
             
@@ -185,28 +297,124 @@ class QuoteService:
 
     async def get_current_price(self, exchange_name: str, symbol: str) -> dict:
         """
-        Get the current price for a symbol from an exchange.
+        Get the current price for a symbol, from the price cache when the
+        symbol is being streamed, otherwise from the exchange.
 
         Args:
-            exchange: ccxt Exchange instance
+            exchange_name: Name of the exchange
             symbol: Trading pair symbol (e.g. 'BTC/USDT')
 
         Returns:
             Dict: Current price
         """
         try:
+            cached = self.price_cache.get(exchange_name, symbol)
+            if cached is not None:
+                return {"price": cached["price"]}
+
+            resolved = await self.resolve_symbol(exchange_name, symbol)
+            if resolved is None:
+                return {}
+
+            # A native id like 'XBTUSDT' is cached under its unified symbol
+            cached = self.price_cache.get(exchange_name, resolved)
+            if cached is not None:
+                return {"price": cached["price"]}
+
             exchange = await self.get_exchange_by_name(exchange_name)
-            symbol = self.__process_symbol(symbol, exchange.id)
-            ticker = await exchange.fetch_ticker(symbol)
+            ticker = await exchange.fetch_ticker(resolved)
             price = ticker.get("last", 0)
+            if price:
+                self.price_cache.set(exchange_name, resolved, price, ticker.get("timestamp"))
             return {"price": price}
         
         except Exception as e:
             print(e)
             return {}
         
+    async def get_prices(self, full_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get last price, 24h change and volume for many symbols, with one
+        fetch_tickers call per exchange instead of one fetch_ticker per symbol.
+
+        Args:
+            full_names: Symbols as 'EXCHANGE:SYMBOL', e.g. 'BINANCE:BTCUSDT'
+
+        Returns:
+            Dict: Snapshot per full name, None for unknown or unavailable symbols
+        """
+        prices: Dict[str, Optional[Dict[str, Any]]] = {full_name: None for full_name in full_names}
+
+        # exchange -> unified symbol -> full names asking for it
+        requested: Dict[str, Dict[str, List[str]]] = {}
+        for full_name in prices:
+            exchange_name, _, symbol = full_name.partition(":")
+            if not symbol:
+                continue
+            exchange_name = exchange_name.lower()
+            resolved = await self.resolve_symbol(exchange_name, symbol)
+            if resolved is not None:
+                requested.setdefault(exchange_name, {}).setdefault(resolved, []).append(full_name)
+
+        results = await asyncio.gather(*(
+            self.fetch_tickers(exchange_name, list(symbols))
+            for exchange_name, symbols in requested.items()
+        ))
+
+        for (exchange_name, symbols), snapshots in zip(requested.items(), results):
+            for symbol, snapshot in snapshots.items():
+                for full_name in symbols.get(symbol, []):
+                    prices[full_name] = snapshot
+        return prices
+
+    async def fetch_tickers(self, exchange_name: str, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch the tickers of several symbols of one exchange.
+
+        Args:
+            exchange_name: Name of the exchange
+            symbols: Unified symbols
+
+        Returns:
+            Dict: Snapshot per symbol, symbols without a ticker are left out
+        """
+        try:
+            exchange = await self.get_exchange_by_name(exchange_name)
+
+            try:
+                if not exchange.has.get("fetchTickers"):
+                    raise NotImplementedError(f"{exchange_name} has no fetchTickers")
+                tickers = await exchange.fetch_tickers(symbols)
+            except Exception as tickers_error:
+                # Some exchanges cannot mix market types or filter by symbol in one call
+                print(f"fetch_tickers failed for {exchange_name}, falling back to fetch_ticker: {tickers_error}")
+                results = await asyncio.gather(
+                    *(exchange.fetch_ticker(symbol) for symbol in symbols), return_exceptions=True
+                )
+                tickers = {
+                    symbol: ticker for symbol, ticker in zip(symbols, results)
+                    if not isinstance(ticker, BaseException)
+                }
+
+            return {
+                symbol: {
+                    "price": tickers[symbol].get("last"),
+                    "change": tickers[symbol].get("change"),
+                    "change_percent": tickers[symbol].get("percentage"),
+                    "volume": tickers[symbol].get("baseVolume"),
+                    "quote_volume": tickers[symbol].get("quoteVolume"),
+                    "timestamp": tickers[symbol].get("timestamp"),
+                }
+                for symbol in symbols if tickers.get(symbol)
+            }
+
+        except Exception as e:
+            print(f"Error fetching tickers from {exchange_name}: {e}")
+            return {}
+
     async def close(self):
         """
-        Close all exchange connections in the pool.
+        Stop market refreshes and close all exchange connections in the pool.
         """
+        await self.market_cache.close()
         await self.exchange_pool.close()
\ No newline at end of file
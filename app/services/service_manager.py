@@ -1,16 +1,24 @@
-from typing import Optional
+from functools import partial
+from typing import Any, Callable, Optional
 
+from app.config import settings
 from app.database.connection import DB
 from app.database.watch_list import WatchListDB
 from app.database.chart_storage import ChartStorageDB
+from app.services.price_cache import PriceCache
 from app.services.quote_service import QuoteService
+from app.services.ticker_scheduler import TickerScheduler
+from app.services.fake_exchange import SyntheticOHLCVExchange, SyntheticTradeExchange
+from app.services.trade_replay import ReplayExchange
 from app.services.websocket_service import WebSocketService
 
 class ServiceManager:
     _watch_list_db: Optional[WatchListDB] = None
     _chart_storage_db: Optional[ChartStorageDB] = None
 
+    _price_cache: Optional[PriceCache] = None
     _quote_service: Optional[QuoteService] = None
+    _ticker_scheduler: Optional[TickerScheduler] = None
     _websocket_service: Optional[WebSocketService] = None
 
     @classmethod
@@ -37,6 +45,18 @@ class ServiceManager:
             cls._chart_storage_db = ChartStorageDB()
         return cls._chart_storage_db
     
+    @classmethod
+    def get_price_cache(cls) -> PriceCache:
+        """
+        Get the PriceCache instance shared by the quote and WebSocket services.
+        
+        Returns:
+            PriceCache instance
+        """
+        if cls._price_cache is None:
+            cls._price_cache = PriceCache(max_age=settings.PRICE_CACHE_MAX_AGE_SECONDS)
+        return cls._price_cache
+    
     @classmethod
     def get_quote_service(cls) -> QuoteService:
         """
@@ -46,9 +66,30 @@ class ServiceManager:
             QuoteService instance
         """
         if cls._quote_service is None:
-            cls._quote_service = QuoteService()
+            cls._quote_service = QuoteService(
+                exchange_factory=cls._get_rest_exchange_factory(),
+                price_cache=cls.get_price_cache()
+            )
         return cls._quote_service
     
+    @classmethod
+    def get_ticker_scheduler(cls) -> TickerScheduler:
+        """
+        Get the TickerScheduler instance polling tickers for every client.
+        
+        Returns:
+            TickerScheduler instance
+        """
+        if cls._ticker_scheduler is None:
+            cls._ticker_scheduler = TickerScheduler(
+                cls.get_quote_service(),
+                cls.get_price_cache(),
+                interval=settings.TICKER_REFRESH_SECONDS,
+                batch_size=settings.TICKER_BATCH_SIZE,
+                lease=settings.TICKER_POLL_LEASE_SECONDS
+            )
+        return cls._ticker_scheduler
+    
     @classmethod
     def get_websocket_service(cls) -> WebSocketService:
         """
@@ -58,16 +99,56 @@ class ServiceManager:
             WebSocketService instance
         """
         if cls._websocket_service is None:
-            cls._websocket_service = WebSocketService()
+            cls._websocket_service = WebSocketService(
+                exchange_factory=cls._get_trade_exchange_factory(),
+                price_cache=cls.get_price_cache(),
+                ticker_scheduler=cls.get_ticker_scheduler()
+            )
         return cls._websocket_service
     
+    @classmethod
+    def _get_rest_exchange_factory(cls) -> Optional[Callable[[str], Any]]:
+        """
+        Get the exchange factory for the configured REST source.
+        
+        Returns:
+            Factory creating stand-in exchanges, or None to use ccxt
+        """
+        if settings.REST_SOURCE == "synthetic":
+            return partial(
+                SyntheticOHLCVExchange,
+                latency_ms=settings.SYNTHETIC_REST_LATENCY_MS,
+                page_limit=settings.SYNTHETIC_PAGE_LIMIT,
+                stats_path=settings.SYNTHETIC_STATS_PATH or None
+            )
+        return None
+    
+    @classmethod
+    def _get_trade_exchange_factory(cls) -> Optional[Callable[[str], Any]]:
+        """
+        Get the exchange factory for the configured trade source.
+        
+        Returns:
+            Factory creating stand-in exchanges, or None to stream from ccxt.pro
+        """
+        if settings.TRADE_SOURCE == "replay":
+            return partial(
+                ReplayExchange,
+                directory=settings.REPLAY_DIR,
+                speed=settings.REPLAY_SPEED,
+                loop=settings.REPLAY_LOOP
+            )
+        if settings.TRADE_SOURCE == "synthetic":
+            return partial(SyntheticTradeExchange, rate=settings.SYNTHETIC_TRADE_RATE)
+        return None
+    
     @classmethod
     async def initialize_services(cls):
         """
         Initialize all services and establish database connections.
         Should be called during application startup.
         """
-        # Ensure DB connection is established
+        # Ensure DB connection is established, pending schema migrations run first
         await DB.connect()
         print("Connected to database")
         
@@ -77,6 +158,7 @@ class ServiceManager:
         
         # Initialize services
         cls.get_quote_service()
+        cls.get_ticker_scheduler()
         cls.get_websocket_service()
         
     @classmethod
@@ -90,11 +172,22 @@ class ServiceManager:
             await cls._websocket_service.close()
             cls._websocket_service = None
         
+        # Stop ticker polling before the quote service closes its exchanges
+        if cls._ticker_scheduler is not None:
+            await cls._ticker_scheduler.close()
+            cls._ticker_scheduler = None
+        
         # Close quote service if necessary
         if cls._quote_service is not None:
             await cls._quote_service.close()
             cls._quote_service = None
         
+        # Let chart compactions finish before the connection goes away
+        if cls._chart_storage_db is not None:
+            await cls._chart_storage_db.close()
+        
+        cls._price_cache = None
+        
         # Reset chart storage
         cls._chart_storage_db = None
         cls._watch_list_db = None
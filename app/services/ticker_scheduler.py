@@ -0,0 +1,305 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.services.price_cache import PriceCache
+
+# Ticker fields returned for every symbol, see QuoteService.fetch_tickers
+SNAPSHOT_FIELDS = ("price", "change", "change_percent", "volume", "quote_volume", "timestamp")
+
+# (requested interval in seconds, full name as the subscriber wrote it, callback, lease expiry)
+Interest = Tuple[float, str, Optional[Callable[[str, Dict[str, Any]], Awaitable[Any]]], Optional[float]]
+
+class TickerScheduler:
+    """
+    Shared ticker polling for symbols without a live stream.
+
+    Subscribers register interest in symbols with a refresh interval. One loop
+    per exchange fetches every due symbol of that exchange with batched
+    fetch_tickers calls, spaced by the exchange's rate limit, and publishes
+    the tickers to the price cache and to the subscribers' callbacks. Upstream
+    requests therefore grow with the number of exchanges, not of clients.
+
+    REST pollers register through get_prices with a lease instead of a
+    callback, their interest lapses when they stop asking.
+    """
+    # Subscriber id of the leases taken by REST pollers
+    POLLERS = "rest"
+
+    def __init__(
+        self,
+        quote_service: Any,
+        price_cache: PriceCache,
+        interval: float = 5.0,
+        batch_size: int = 100,
+        lease: float = 60.0
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            quote_service: QuoteService resolving symbols and fetching tickers
+            price_cache: Cache the tickers are published to
+            interval: Default refresh interval in seconds
+            batch_size: Maximum symbols per fetch_tickers call
+            lease: Seconds a polled symbol stays registered after its last poll
+        """
+        self.quote_service = quote_service
+        self.price_cache = price_cache
+        self.interval = interval
+        self.batch_size = batch_size
+        self.lease = lease
+
+        # exchange -> unified symbol -> (subscriber id, full name) -> interest
+        self.interests: Dict[str, Dict[str, Dict[Tuple[str, str], Interest]]] = {}
+        # subscriber id -> (exchange, unified symbol, full name) it registered
+        self.subscriptions: Dict[str, Set[Tuple[str, str, str]]] = {}
+        # (exchange, unified symbol) -> monotonic time of the last fetch
+        self.fetched: Dict[Tuple[str, str], float] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    async def subscribe(
+        self,
+        subscriber_id: str,
+        full_name: str,
+        callback: Optional[Callable[[str, Dict[str, Any]], Awaitable[Any]]] = None,
+        interval: Optional[float] = None,
+        lease: Optional[float] = None
+    ) -> bool:
+        """
+        Register interest in the ticker of a symbol.
+
+        Args:
+            subscriber_id: Identifies the subscriber, e.g. a WebSocket id
+            full_name: Symbol as 'EXCHANGE:SYMBOL'
+            callback: Awaited with (full_name, snapshot) after every fetch
+            interval: Requested refresh interval in seconds, never below the default
+            lease: Drop the interest after this many seconds unless renewed
+
+        Returns:
+            bool: False when the symbol is not listed by the exchange
+        """
+        resolved = await self._resolve(full_name)
+        if resolved is None:
+            return False
+
+        self._register(subscriber_id, resolved[0], resolved[1], full_name, callback, interval, lease)
+        return True
+
+    def unsubscribe(self, subscriber_id: str, full_name: Optional[str] = None):
+        """
+        Drop interests of a subscriber.
+
+        Args:
+            subscriber_id: Identifies the subscriber
+            full_name: Symbol to drop, None to drop all of the subscriber's symbols
+        """
+        subscriptions = self.subscriptions.get(subscriber_id, set())
+        for exchange_name, symbol, name in list(subscriptions):
+            if full_name is not None and name != full_name:
+                continue
+            subscriptions.discard((exchange_name, symbol, name))
+            self._drop(exchange_name, symbol, (subscriber_id, name))
+
+        if not subscriptions:
+            self.subscriptions.pop(subscriber_id, None)
+
+    async def get_prices(self, full_names: List[str], interval: Optional[float] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get ticker snapshots for a poller, keeping the symbols scheduled while it polls.
+
+        Fresh tickers come from the price cache, missing ones are fetched once
+        in batches per exchange.
+
+        Args:
+            full_names: Symbols as 'EXCHANGE:SYMBOL'
+            interval: Requested refresh interval in seconds
+
+        Returns:
+            Dict: Snapshot per full name, None for unknown or unavailable symbols
+        """
+        prices: Dict[str, Optional[Dict[str, Any]]] = {}
+        # full name -> (exchange, unified symbol)
+        listed: Dict[str, Tuple[str, str]] = {}
+        missing: List[str] = []
+
+        for full_name in dict.fromkeys(full_names):
+            prices[full_name] = None
+            resolved = await self._resolve(full_name)
+            if resolved is None:
+                continue
+            listed[full_name] = resolved
+
+            cached = self.price_cache.get(*resolved)
+            # Streamed entries carry only the price until a ticker adds the 24h fields
+            if cached is not None and "change_percent" in cached:
+                prices[full_name] = {field: cached.get(field) for field in SNAPSHOT_FIELDS}
+            else:
+                missing.append(full_name)
+
+        if missing:
+            fetched = await self.quote_service.get_prices(missing)
+            fetched_at = time.monotonic()
+            for full_name, snapshot in fetched.items():
+                prices[full_name] = snapshot
+                if snapshot is not None:
+                    self.price_cache.set(*listed[full_name], **snapshot)
+                    # Just fetched, the loop picks the symbol up one interval from now
+                    self.fetched[listed[full_name]] = fetched_at
+
+        for full_name, (exchange_name, symbol) in listed.items():
+            self._register(self.POLLERS, exchange_name, symbol, full_name, None, interval, self.lease)
+
+        return prices
+
+    async def close(self):
+        """
+        Stop the polling loops.
+        """
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _resolve(self, full_name: str) -> Optional[Tuple[str, str]]:
+        """
+        Split a full name and resolve its symbol through the exchange's markets.
+
+        Returns:
+            Tuple of (exchange, unified symbol), None when the symbol is not listed
+        """
+        exchange_name, _, symbol = full_name.partition(":")
+        if not symbol:
+            return None
+        exchange_name = exchange_name.lower()
+
+        resolved = await self.quote_service.resolve_symbol(exchange_name, symbol)
+        if resolved is None:
+            return None
+        return exchange_name, resolved
+
+    def _register(
+        self,
+        subscriber_id: str,
+        exchange_name: str,
+        symbol: str,
+        full_name: str,
+        callback: Optional[Callable[[str, Dict[str, Any]], Awaitable[Any]]],
+        interval: Optional[float],
+        lease: Optional[float]
+    ):
+        """
+        Add or renew an interest and start the exchange's loop if it is not running.
+        """
+        expires = time.monotonic() + lease if lease is not None else None
+        interest = (max(interval or self.interval, self.interval), full_name, callback, expires)
+        self.interests.setdefault(exchange_name, {}).setdefault(symbol, {})[(subscriber_id, full_name)] = interest
+        self.subscriptions.setdefault(subscriber_id, set()).add((exchange_name, symbol, full_name))
+
+        if exchange_name not in self.tasks:
+            task = asyncio.create_task(self._run(exchange_name))
+            self.tasks[exchange_name] = task
+            task.add_done_callback(
+                lambda done: self.tasks.pop(exchange_name, None) if self.tasks.get(exchange_name) is done else None
+            )
+
+    def _drop(self, exchange_name: str, symbol: str, key: Tuple[str, str]):
+        """
+        Remove one interest, and the symbol once nobody is interested in it.
+        """
+        symbols = self.interests.get(exchange_name, {})
+        interests = symbols.get(symbol)
+        if interests is None:
+            return
+
+        interests.pop(key, None)
+        if not interests:
+            del symbols[symbol]
+            self.fetched.pop((exchange_name, symbol), None)
+        if not symbols:
+            self.interests.pop(exchange_name, None)
+
+    def _expire(self, exchange_name: str, now: float):
+        """
+        Drop the lapsed leases of an exchange.
+        """
+        for symbol, interests in list(self.interests.get(exchange_name, {}).items()):
+            for key, (_, full_name, _, expires) in list(interests.items()):
+                if expires is not None and expires <= now:
+                    self.subscriptions.get(key[0], set()).discard((exchange_name, symbol, full_name))
+                    if not self.subscriptions.get(key[0]):
+                        self.subscriptions.pop(key[0], None)
+                    self._drop(exchange_name, symbol, key)
+
+    async def _run(self, exchange_name: str):
+        """
+        Poll the tickers of an exchange until nobody is interested in it.
+
+        Args:
+            exchange_name: Name of the exchange
+        """
+        try:
+            exchange = await self.quote_service.get_exchange_by_name(exchange_name)
+            # ccxt rateLimit is the minimum delay between requests in milliseconds
+            spacing = (getattr(exchange, "rateLimit", 0) or 0) / 1000
+        except Exception as e:
+            print(f"Error getting exchange {exchange_name}: {e}")
+            spacing = 0
+
+        while True:
+            now = time.monotonic()
+            self._expire(exchange_name, now)
+            symbols = self.interests.get(exchange_name)
+            if not symbols:
+                return
+
+            intervals = {
+                symbol: min(interest[0] for interest in interests.values())
+                for symbol, interests in symbols.items()
+            }
+            due = [
+                symbol for symbol, interval in intervals.items()
+                if now - self.fetched.get((exchange_name, symbol), float("-inf")) >= interval
+            ]
+
+            for start in range(0, len(due), self.batch_size):
+                if start:
+                    await asyncio.sleep(spacing)
+
+                batch = due[start:start + self.batch_size]
+                snapshots = await self.quote_service.fetch_tickers(exchange_name, batch)
+                fetched_at = time.monotonic()
+                for symbol in batch:
+                    # Skip symbols dropped while their batch was in flight
+                    if symbol in self.interests.get(exchange_name, {}):
+                        self.fetched[(exchange_name, symbol)] = fetched_at
+                for symbol, snapshot in snapshots.items():
+                    await self._publish(exchange_name, symbol, snapshot)
+
+            now = time.monotonic()
+            wait = min(
+                self.fetched.get((exchange_name, symbol), now) + interval - now
+                for symbol, interval in intervals.items()
+            )
+            await asyncio.sleep(max(wait, spacing, 0.05))
+
+    async def _publish(self, exchange_name: str, symbol: str, snapshot: Dict[str, Any]):
+        """
+        Store a ticker in the price cache and send it to the symbol's subscribers.
+
+        Args:
+            exchange_name: Name of the exchange
+            symbol: Unified symbol
+            snapshot: Ticker snapshot
+        """
+        self.price_cache.set(exchange_name, symbol, **snapshot)
+
+        interests = self.interests.get(exchange_name, {}).get(symbol, {})
+        for _, full_name, callback, _ in list(interests.values()):
+            if callback is None:
+                continue
+            try:
+                await callback(full_name, snapshot)
+            except Exception as e:
+                print(f"Error publishing ticker of {full_name}: {e}")
\ No newline at end of file
@@ -0,0 +1,219 @@
+import os
+import gzip
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+RECORDING_FORMAT = "mytradingview-trades"
+RECORDING_VERSION = 1
+
+SIDE_TO_CODE = {"buy": 1, "sell": -1}
+CODE_TO_SIDE = {1: "buy", -1: "sell"}
+
+def recording_path(directory: str, exchange_id: str) -> str:
+    """
+    Get the recording file path for an exchange.
+
+    Args:
+        directory: Directory holding the recordings
+        exchange_id: Exchange ID (e.g. 'binance')
+
+    Returns:
+        Path of the gzip compressed recording
+    """
+    return os.path.join(directory, f"{exchange_id.lower()}.trades.gz")
+
+def load_recording(path: str) -> Tuple[Dict[str, Any], Dict[str, List[Tuple[int, list]]]]:
+    """
+    Load a trade recording into memory.
+
+    Args:
+        path: Recording file path
+
+    Returns:
+        (header, {symbol: [(recv_ms, [[timestamp, price, amount, side, id], ...]), ...]})
+
+    Raises:
+        ValueError: If the file is not a trade recording
+    """
+    batches: Dict[str, List[Tuple[int, list]]] = {}
+
+    with gzip.open(path, "rb") as f:
+        header = orjson.loads(f.readline())
+        if header.get("format") != RECORDING_FORMAT:
+            raise ValueError(f"Not a trade recording: {path}")
+
+        for line in f:
+            if not line.strip():
+                continue
+            recv_ms, symbol, trades = orjson.loads(line)
+            batches.setdefault(symbol, []).append((recv_ms, trades))
+
+    return header, batches
+
+class TradeRecorder:
+    """
+    Wraps a ccxt.pro exchange and records every watch_trades batch to disk.
+
+    The recording is a gzip compressed file of JSON lines. The first line is a
+    header, every following line is one batch:
+        [recv_ms, symbol, [[timestamp, price, amount, side, id], ...]]
+    where side is 1 for buy, -1 for sell and 0 when unknown.
+    """
+    def __init__(self, exchange: Any, directory: str):
+        """
+        Initialize the recorder.
+
+        Args:
+            exchange: ccxt.pro exchange instance to record from
+            directory: Directory to write the recording to
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        self.exchange = exchange
+        self.id = exchange.id
+        self.path = recording_path(directory, exchange.id)
+        self.batch_count = 0
+        self.trade_count = 0
+
+        self._file = gzip.open(self.path, "wb")
+        self._file.write(orjson.dumps({
+            "format": RECORDING_FORMAT,
+            "version": RECORDING_VERSION,
+            "exchange": exchange.id,
+            "created": int(time.time() * 1000),
+        }) + b"\n")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.exchange, name)
+
+    async def watch_trades(self, symbol: str, since: Optional[int] = None, limit: Optional[int] = None, params: Optional[dict] = None) -> list:
+        trades = await self.exchange.watch_trades(symbol, since, limit, params or {})
+
+        if trades and self._file is not None:
+            compact = [
+                [
+                    trade.get("timestamp"),
+                    trade.get("price"),
+                    trade.get("amount"),
+                    SIDE_TO_CODE.get(trade.get("side"), 0),
+                    trade.get("id"),
+                ]
+                for trade in trades
+            ]
+            self._file.write(orjson.dumps([int(time.time() * 1000), symbol, compact]) + b"\n")
+            self.batch_count += 1
+            self.trade_count += len(compact)
+
+        return trades
+
+    async def close(self):
+        """Flush the recording and close the wrapped exchange"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        await self.exchange.close()
+
+class ReplayExchange:
+    """
+    A ccxt.pro stand-in that serves watch_trades from a TradeRecorder file.
+
+    Batches are released with the same spacing they were recorded with,
+    divided by the speed multiplier. A speed of 0 replays as fast as possible.
+    """
+    def __init__(
+        self,
+        exchange_id: str,
+        directory: str,
+        speed: float = 1.0,
+        loop: bool = False,
+        rebase_timestamps: bool = True
+    ):
+        """
+        Initialize the replay exchange.
+
+        Args:
+            exchange_id: Exchange ID, used to locate the recording
+            directory: Directory holding the recordings
+            speed: Replay speed multiplier, 0 for as fast as possible
+            loop: Whether to start over when a symbol's recording is exhausted
+            rebase_timestamps: Whether to shift trade timestamps to the replay clock
+        """
+        self.id = exchange_id.lower()
+        self.speed = speed
+        self.loop = loop
+        self.rebase_timestamps = rebase_timestamps
+
+        self.header, self.batches = load_recording(recording_path(directory, self.id))
+
+        # Allow lookups with TradingView style symbols (BTCUSDT) as well
+        self.aliases: Dict[str, str] = {}
+        for symbol in self.batches:
+            self.aliases[symbol] = symbol
+            self.aliases.setdefault(symbol.replace("/", ""), symbol)
+
+        self.base_recv = min((batches[0][0] for batches in self.batches.values()), default=0)
+        self.positions: Dict[str, int] = {}
+        self.clocks: Dict[str, Tuple[float, int]] = {}  # {symbol: (wall_start, recv_start)}
+        self.exhausted: set = set()
+        self.finished = asyncio.Event()
+        self._start: Optional[float] = None
+
+    async def watch_trades(self, symbol: str, since: Optional[int] = None, limit: Optional[int] = None, params: Optional[dict] = None) -> list:
+        recorded_symbol = self.aliases.get(symbol)
+        if recorded_symbol is None:
+            raise ValueError(f"No recorded trades for {symbol} on {self.id}")
+
+        batches = self.batches[recorded_symbol]
+        position = self.positions.get(recorded_symbol, 0)
+
+        if self._start is None:
+            self._start = time.monotonic()
+        if recorded_symbol not in self.clocks:
+            self.clocks[recorded_symbol] = (self._start, self.base_recv)
+
+        if position >= len(batches):
+            self.exhausted.add(recorded_symbol)
+            if len(self.exhausted) == len(self.batches):
+                self.finished.set()
+
+            if not self.loop:
+                # Behave like a quiet stream until the caller cancels
+                await asyncio.Future()
+
+            position = 0
+            self.clocks[recorded_symbol] = (time.monotonic(), batches[0][0])
+
+        recv_ms, trades = batches[position]
+        self.positions[recorded_symbol] = position + 1
+
+        if self.speed > 0:
+            wall_start, recv_start = self.clocks[recorded_symbol]
+            due = wall_start + (recv_ms - recv_start) / 1000 / self.speed
+            delay = due - time.monotonic()
+            await asyncio.sleep(delay if delay > 0 else 0)
+        else:
+            await asyncio.sleep(0)
+
+        now_ms = int(time.time() * 1000)
+        result = []
+        for timestamp, price, amount, side, trade_id in trades:
+            if self.rebase_timestamps and timestamp is not None:
+                timestamp = now_ms - max(0, recv_ms - timestamp)
+            result.append({
+                "id": trade_id,
+                "symbol": recorded_symbol,
+                "timestamp": timestamp,
+                "price": price,
+                "amount": amount,
+                "side": CODE_TO_SIDE.get(side),
+            })
+
+        return result
+
+    async def close(self):
+        """Nothing to release, present for ccxt compatibility"""
+        return None
\ No newline at end of file
@@ -1,17 +1,28 @@
 import orjson
 import asyncio
-from typing import Optional
+from typing import Any, Callable, Optional
 
 import ccxt.pro as ccxtpro
 from robyn import WebSocket
 
+from app.services.price_cache import PriceCache
+from app.services.ticker_scheduler import TickerScheduler
+
 class WebSocketService:
-    def __init__(self):
+    def __init__(
+        self,
+        exchange_factory: Optional[Callable[[str], Any]] = None,
+        price_cache: Optional[PriceCache] = None,
+        ticker_scheduler: Optional[TickerScheduler] = None
+    ):
         self.active_connections: dict = {}
         self.subscriptions: dict = {}  # {ws_id: set(["BINANCE:BTCUSDT", ...])}
         self.symbol_subscribers: dict = {}  # {"BINANCE:BTCUSDT": set([ws_id, ...])}
         self.subscriptions_tasks: dict = {}  # {full_name: asyncio.Task}
         self.exchanges: dict = {}
+        self.exchange_factory = exchange_factory  # Replaces ccxt.pro, e.g. with a ReplayExchange
+        self.price_cache = price_cache if price_cache is not None else PriceCache()  # Last streamed price per symbol
+        self.ticker_scheduler = ticker_scheduler  # Polled tickers for the "subscribe_ticker" action
 
     async def test(ws: WebSocket):
         print("WebSocketService is running", ws.id)
@@ -22,6 +33,15 @@ class WebSocketService:
         if exchange_name in self.exchanges:
             return self.exchanges[exchange_name]
 
+        if self.exchange_factory is not None:
+            try:
+                exchange = self.exchange_factory(exchange_name)
+                self.exchanges[exchange_name] = exchange
+                return exchange
+            except Exception as e:
+                print(f"{exchange_name}: {str(e)}")
+                return None
+
         if hasattr(ccxtpro, exchange_name):
             try:
                 exchange = getattr(ccxtpro, exchange_name)()
@@ -51,6 +71,14 @@ class WebSocketService:
             full_name = msg.get("full_name")
             if full_name:
                 await self.unsubscribe(ws, full_name)
+        elif action == "subscribe_ticker":
+            full_name = msg.get("full_name")
+            if full_name:
+                await self.subscribe_ticker(ws, full_name, msg.get("interval"))
+        elif action == "unsubscribe_ticker":
+            full_name = msg.get("full_name")
+            if full_name and self.ticker_scheduler is not None:
+                self.ticker_scheduler.unsubscribe(ws.id, full_name)
         else:
             print(f"Unknown action: {action}")
 
@@ -75,6 +103,33 @@ class WebSocketService:
             if task:
                 task.cancel()
 
+    async def subscribe_ticker(self, ws: WebSocket, full_name: str, interval: Optional[float] = None):
+        """
+        Send the ticker of a symbol to a client whenever the shared scheduler polls it.
+
+        Args:
+            ws: Client WebSocket
+            full_name: Symbol as 'EXCHANGE:SYMBOL'
+            interval: Requested refresh interval in seconds
+        """
+        if self.ticker_scheduler is None:
+            print("Ticker scheduler not available")
+            return
+
+        self.active_connections[ws.id] = ws
+        ws_id = ws.id
+
+        async def send(name: str, snapshot: dict):
+            connection = self.active_connections.get(ws_id)
+            if connection is None:
+                self.ticker_scheduler.unsubscribe(ws_id)
+                return
+            message = {"type": "ticker", "full_name": name, **snapshot}
+            await connection.async_send_to(ws_id, orjson.dumps(message).decode("utf-8"))
+
+        if not await self.ticker_scheduler.subscribe(ws_id, full_name, send, interval):
+            print(f"Unknown symbol for ticker subscription: {full_name}")
+
     async def quotes_loop(self, full_name: str):
         exchange_name, symbol = self.__process_full_name(full_name)
         exchange = self.__get_exchange(exchange_name)
@@ -105,6 +160,8 @@ class WebSocketService:
                     await asyncio.sleep(0.1)
                     continue
 
+                self.price_cache.set(exchange_name, symbol, price, latest_trade.get('timestamp'))
+
                 message = {
                     "exchange": exchange_name,
                     "symbol": symbol,
@@ -149,5 +206,8 @@ class WebSocketService:
                 if task:
                     task.cancel()
 
+        if self.ticker_scheduler is not None:
+            self.ticker_scheduler.unsubscribe(ws_id)
+
         self.active_connections.pop(ws_id, None)
         print(f"Cleaned up for ws_id {ws_id}")
@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+import shutil
+import socket
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import orjson
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT_DIR, "data", "benchmarks")
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(port: int, env: Dict[str, str], verbose: bool = False, timeout: float = 30) -> subprocess.Popen:
+    """
+    Start run.py on the given port and wait until it accepts connections.
+    The server gets a throwaway database directory (removed by stop_server)
+    unless env sets MTV_DB_DIR, so benchmarks never touch data/app_data.db.
+
+    Args:
+        port: Port to listen on
+        env: Extra environment variables for the server
+        verbose: Whether to show the server output
+        timeout: Seconds to wait for the server to come up
+
+    Returns:
+        The server process
+    """
+    output = None if verbose else subprocess.DEVNULL
+    db_dir = None if "MTV_DB_DIR" in env else tempfile.mkdtemp(prefix="mtv-bench-db-")
+    server_env = {
+        **os.environ,
+        "MTV_REPLAY_DIR": os.path.join(ROOT_DIR, "data", "replay"),
+        **env,
+        "ROBYN_PORT": str(port),
+    }
+    if db_dir:
+        server_env["MTV_DB_DIR"] = db_dir
+
+    process = subprocess.Popen(
+        [sys.executable, "run.py"],
+        cwd=ROOT_DIR,
+        env=server_env,
+        stdout=output,
+        stderr=output,
+    )
+    process.db_dir = db_dir
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return process
+        time.sleep(0.1)
+
+    stop_server(process)
+    raise RuntimeError(f"Server did not start within {timeout}s")
+
+def stop_server(process: subprocess.Popen):
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    db_dir = getattr(process, "db_dir", None)
+    if db_dir:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+class ProcessStats:
+    """
+    CPU and memory of a process tree, read from /proc.
+    Values are None on platforms without procfs.
+    """
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def _tree(self) -> List[int]:
+        if not os.path.isdir("/proc"):
+            return []
+
+        children: Dict[int, List[int]] = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+
+        pids, stack = [], [self.pid]
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            stack.extend(children.get(pid, []))
+        return pids
+
+    def cpu_seconds(self) -> Optional[float]:
+        total, found = 0, False
+        for pid in self._tree():
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                total += int(fields[11]) + int(fields[12])
+                found = True
+            except (OSError, IndexError, ValueError):
+                continue
+        return total / self.clock_ticks if found else None
+
+    def memory_kb(self, field: str = "VmRSS") -> Optional[int]:
+        total, found = 0, False
+        for pid in self._tree():
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith(f"{field}:"):
+                            total += int(line.split()[1])
+                            found = True
+                            break
+            except (OSError, ValueError):
+                continue
+        return total if found else None
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def write_results(path: str, benchmark: str, runs: List[dict]):
+    """
+    Write benchmark runs as JSON, tagged with the app version and commit.
+
+    Args:
+        path: Output file path
+        benchmark: Benchmark name
+        runs: One result dict per run
+    """
+    sys.path.insert(0, ROOT_DIR)
+    from app.config import settings
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps({
+            "benchmark": benchmark,
+            "app_version": settings.APP_VERSION,
+            "commit": git_commit(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "runs": runs,
+        }, option=orjson.OPT_INDENT_2))
+
+    print(f"\n     ➜ {path}\n")
\ No newline at end of file
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database.connection import DB
+from app.database.watch_list import WatchListDB
+from bench_utils import RESULTS_DIR, percentile, write_results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure bursty SQLiteBase write throughput with and without group commit")
+    parser.add_argument("--bursts", type=int, default=20, help="Number of bursts")
+    parser.add_argument("--burst-size", type=int, default=100, help="Concurrent writes per burst")
+    parser.add_argument("--window", type=float, default=settings.DB_GROUP_COMMIT_WINDOW_MS, help="Group commit window in ms")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "db_writes.json"), help="JSON results file")
+    return parser.parse_args()
+
+async def run(group_commit: bool, args) -> dict:
+    settings.DB_DIR = tempfile.mkdtemp(prefix="mtv-bench-")
+    settings.DB_GROUP_COMMIT = group_commit
+    settings.DB_GROUP_COMMIT_WINDOW_MS = args.window
+
+    await DB.connect()
+    watch_list = WatchListDB()
+    await watch_list.create_watch_list("bench")
+    list_id = (await watch_list.get_watch_list_by_name("bench"))["id"]
+
+    latencies = []
+
+    async def add(i: int):
+        started = time.perf_counter()
+        await watch_list.items_db.insert_one({
+            "list_id": list_id,
+            "symbol": f"SYM{i}USDT",
+            "full_name": f"BENCH:SYM{i}USDT",
+            "description": "",
+            "exchange": "BENCH",
+            "create_time": "",
+            "update_time": "",
+        })
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    for burst in range(args.bursts):
+        base = burst * args.burst_size
+        await asyncio.gather(*(add(base + i) for i in range(args.burst_size)))
+    elapsed = time.perf_counter() - started
+
+    written = len(await watch_list.get_watch_list_items(list_id))
+    await DB.close()
+
+    return {
+        "group_commit": group_commit,
+        "window_ms": args.window if group_commit else None,
+        "writes": args.bursts * args.burst_size,
+        "persisted": written,
+        "elapsed_s": round(elapsed, 3),
+        "writes_per_sec": round(args.bursts * args.burst_size / elapsed, 1),
+        "latency_p50_ms": round(percentile(latencies, 50), 3),
+        "latency_p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+async def main(args):
+    runs = []
+    for group_commit in (False, True):
+        print(f"[*] Group commit {'on' if group_commit else 'off'}...")
+        result = await run(group_commit, args)
+        runs.append(result)
+        for key, value in result.items():
+            print(f"     {key:<16} {value}")
+
+    write_results(args.out, "db_writes", runs)
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
\ No newline at end of file
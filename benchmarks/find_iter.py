@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database.base import SQLiteBase
+from app.database.connection import DB
+from bench_utils import RESULTS_DIR, write_results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare find_many with streamed find_iter on a large scan")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows to seed")
+    parser.add_argument("--content-size", type=int, default=2000, help="Bytes of content per row")
+    parser.add_argument("--batch-size", type=int, default=500, help="find_iter batch size")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "find_iter.json"), help="JSON results file")
+    return parser.parse_args()
+
+async def seed(charts: SQLiteBase, rows: int, content_size: int):
+    content = "x" * content_size
+    for start in range(0, rows, 1000):
+        await charts.insert_many([
+            {
+                "name": f"chart{i}",
+                "content": content,
+                "symbol": "BINANCE:BTCUSDT",
+                "resolution": "1D",
+                "timestamp": i,
+                "update_time": "",
+            }
+            for i in range(start, min(start + 1000, rows))
+        ])
+
+async def scan(charts: SQLiteBase, mode: str, batch_size: int) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    first_row_ms = None
+    count = 0
+
+    if mode == "find_many":
+        for _ in await charts.find_many():
+            if first_row_ms is None:
+                first_row_ms = (time.perf_counter() - started) * 1000
+            count += 1
+    else:
+        async for _ in charts.find_iter(batch_size=batch_size, row_format=mode):
+            if first_row_ms is None:
+                first_row_ms = (time.perf_counter() - started) * 1000
+            count += 1
+
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "rows": count,
+        "first_row_ms": round(first_row_ms or 0, 2),
+        "total_ms": round(elapsed * 1000, 1),
+        "rows_per_sec": round(count / elapsed) if elapsed else None,
+        "peak_mb": round(peak / 1024 / 1024, 2),
+    }
+
+async def main(args):
+    settings.DB_DIR = tempfile.mkdtemp(prefix="mtv-bench-")
+    settings.DB_GROUP_COMMIT = False
+    await DB.connect()
+
+    charts = SQLiteBase("charts_storage")
+    print(f"[*] Seeding {args.rows} rows of {args.content_size} bytes")
+    await seed(charts, args.rows, args.content_size)
+
+    runs = []
+    for mode in ("find_many", "dict", "tuple", "record"):
+        result = await scan(charts, mode, args.batch_size)
+        runs.append(result)
+        print(f"[✔] {mode:<10} first row {result['first_row_ms']:>8} ms  total {result['total_ms']:>8} ms  peak {result['peak_mb']:>7} MB")
+
+    await DB.close()
+    write_results(args.out, "find_iter", runs)
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
\ No newline at end of file
@@ -0,0 +1,118 @@
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+import orjson
+import aiohttp
+
+from bench_utils import RESULTS_DIR, ProcessStats, free_port, percentile, start_server, stop_server, write_results
+
+DAY_MS = 86400000
+INTERVALS = {"1m": 60000, "1h": 3600000, "1d": DAY_MS}
+
+# name: (timeframe, span in ms, concurrent charts)
+WORKLOADS = {
+    "1m_year": ("1m", 365 * DAY_MS, 1),
+    "1d_decade": ("1d", 3650 * DAY_MS, 1),
+    "1h_year_x8": ("1h", 365 * DAY_MS, 8),
+    "1m_day_x16": ("1m", DAY_MS, 16),
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark /quotes/history against a synthetic REST exchange")
+    parser.add_argument("--workloads", nargs="+", default=list(WORKLOADS), choices=list(WORKLOADS), help="Workloads to run")
+    parser.add_argument("--latency", type=float, default=50, help="Simulated upstream latency per request in ms")
+    parser.add_argument("--page-limit", type=int, default=1000, help="Maximum candles per upstream request")
+    parser.add_argument("--repeat", type=int, default=2, help="Rounds per workload. There is no history cache, so repeats re-fetch everything upstream")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "history.json"), help="JSON results file")
+    parser.add_argument("--verbose", action="store_true", help="Show server output")
+    return parser.parse_args()
+
+def read_upstream_calls(stats_path: str) -> int:
+    try:
+        with open(stats_path, "rb") as f:
+            return orjson.loads(f.read())["calls"]
+    except (OSError, ValueError, KeyError):
+        return 0
+
+async def fetch_history(session: aiohttp.ClientSession, port: int, symbol: str, timeframe: str, since: int, end: int) -> tuple:
+    url = f"http://127.0.0.1:{port}/api/v1/quotes/history"
+    params = {"exchange": "binance", "symbol": symbol, "timeframe": timeframe, "since": since, "end": end}
+
+    started = time.perf_counter()
+    async with session.get(url, params=params) as response:
+        body = await response.read()
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    candles = len(orjson.loads(body).get("data") or []) if response.status == 200 else 0
+    return latency_ms, len(body), candles, response.status
+
+async def run_workload(name: str, args) -> list:
+    timeframe, span_ms, charts = WORKLOADS[name]
+    stats_path = os.path.join(tempfile.mkdtemp(prefix="mtv-bench-"), "upstream.json")
+
+    port = free_port()
+    server = start_server(port, {
+        "MTV_REST_SOURCE": "synthetic",
+        "MTV_SYNTHETIC_REST_LATENCY_MS": str(args.latency),
+        "MTV_SYNTHETIC_PAGE_LIMIT": str(args.page_limit),
+        "MTV_SYNTHETIC_STATS_PATH": stats_path,
+    }, verbose=args.verbose)
+    process_stats = ProcessStats(server.pid)
+
+    runs = []
+    try:
+        timeout = aiohttp.ClientTimeout(total=None)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            for attempt in range(args.repeat):
+                end = int(time.time() * 1000)
+                since = end - span_ms
+                calls_before = read_upstream_calls(stats_path)
+
+                started = time.perf_counter()
+                responses = await asyncio.gather(*(
+                    fetch_history(session, port, f"SYN{i}USDT", timeframe, since, end)
+                    for i in range(charts)
+                ))
+                wall_ms = (time.perf_counter() - started) * 1000
+
+                latencies = [latency for latency, _, _, _ in responses]
+                peak_rss_kb = process_stats.memory_kb("VmHWM")
+                result = {
+                    "workload": name,
+                    "round": "first" if attempt == 0 else "repeat",
+                    "timeframe": timeframe,
+                    "charts": charts,
+                    "wall_ms": round(wall_ms, 1),
+                    "latency_p50_ms": round(percentile(latencies, 50), 1),
+                    "latency_max_ms": round(max(latencies), 1),
+                    "upstream_calls": read_upstream_calls(stats_path) - calls_before,
+                    "candles": sum(candles for _, _, candles, _ in responses),
+                    "expected_candles": charts * (span_ms // INTERVALS[timeframe]),
+                    "payload_bytes": sum(size for _, size, _, _ in responses),
+                    "errors": sum(1 for _, _, _, status in responses if status != 200),
+                    "peak_rss_mb": round(peak_rss_kb / 1024, 1) if peak_rss_kb is not None else None,
+                }
+                runs.append(result)
+
+                for key, value in result.items():
+                    print(f"     {key:<16} {value}")
+                print()
+    finally:
+        stop_server(server)
+
+    return runs
+
+async def main(args):
+    runs = []
+
+    for name in args.workloads:
+        print(f"[*] {name} (latency {args.latency:g}ms, page limit {args.page_limit})...")
+        runs.extend(await run_workload(name, args))
+
+    write_results(args.out, "history", runs)
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import time
+import random
+import string
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+
+from app.database.symbol_index import SymbolIndex
+from bench_utils import RESULTS_DIR, percentile, write_results
+
+QUOTES = ["USDT", "USDC", "BTC", "ETH", "EUR", "TRY"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare the in-memory symbol index with scanning the cached symbol list")
+    parser.add_argument("--sizes", default="2000,10000,50000", help="Comma-separated symbol counts")
+    parser.add_argument("--queries", type=int, default=500, help="Searches per size")
+    parser.add_argument("--limit", type=int, default=50, help="Page size of the indexed search")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "market_search.json"), help="JSON results file")
+    return parser.parse_args()
+
+def make_symbols(rng: random.Random, size: int) -> list:
+    symbols = set()
+    while len(symbols) < size:
+        base = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 6)))
+        quote = rng.choice(QUOTES)
+        # Every tenth pair is a perpetual swap
+        symbols.add(f"{base}/{quote}:{quote}" if rng.random() < 0.1 else f"{base}/{quote}")
+    return sorted(symbols)
+
+def typed_queries(rng: random.Random, symbols: list, count: int) -> list:
+    # Every keystroke of typing a symbol, e.g. 'e', 'et', 'eth', 'eth/', 'eth/u'
+    queries = []
+    while len(queries) < count:
+        symbol = rng.choice(symbols).split(":")[0].lower()
+        queries.extend(symbol[:length] for length in range(1, len(symbol) + 1))
+    return queries[:count]
+
+def measure(search, queries: list, before=None) -> dict:
+    latencies = []
+    for query in queries:
+        if before:
+            before()
+        started = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - started) * 1e6)
+
+    return {
+        "p50_us": round(percentile(latencies, 50), 1),
+        "p95_us": round(percentile(latencies, 95), 1),
+    }
+
+def main(args):
+    rng = random.Random(42)
+    runs = []
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        symbols = make_symbols(rng, size)
+        blob = json.dumps(symbols)
+        queries = typed_queries(rng, symbols, args.queries)
+
+        def scan(text: str):
+            # What MarketCache.search_pairs did before: parse the blob, filter every symbol
+            text = text.upper()
+            return [symbol for symbol in json.loads(blob) if text in symbol.upper()]
+
+        started = time.perf_counter()
+        index = SymbolIndex(symbols)
+        build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        modes = (
+            # Every query answered from the index, no cached matches
+            ("cold", lambda text: index.search(text, args.limit), index.matches.clear),
+            # Typing order, so earlier keystrokes of other searches may be cached
+            ("index", lambda text: index.search(text, args.limit), None),
+            ("scan", scan, None),
+        )
+        for mode, search, before in modes:
+            result = {"mode": mode, "symbols": size, **measure(search, queries, before)}
+            if mode == "scan":
+                # The browser downloaded the full list before filtering it
+                result["response_bytes"] = len(orjson.dumps(symbols))
+            else:
+                result["build_ms"] = build_ms
+                result["response_bytes"] = len(orjson.dumps(index.search(queries[0], args.limit)[0]))
+            runs.append(result)
+            print(f"[✔] {mode:<5} {size:>7} symbols  p50 {result['p50_us']:>9} µs  p95 {result['p95_us']:>9} µs  {result['response_bytes']:>8} bytes")
+
+    write_results(args.out, "market_search", runs)
+
+if __name__ == "__main__":
+    main(parse_args())
\ No newline at end of file
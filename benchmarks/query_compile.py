@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database.base import SQLiteBase
+from app.database.connection import DB
+from bench_utils import RESULTS_DIR, write_results
+
+# name: (query, projection, sort, limit)
+SHAPES = {
+    "by_id": ({"id": 42}, None, None, 1),
+    "list_items": ({"list_id": 3}, None, [("create_time", 1)], None),
+    "range_sorted": ({"create_time": {"$gte": "00001000", "$lt": "00004000"}}, {"id": 1, "symbol": 1}, [("create_time", -1)], 50),
+    "in_list": ({"list_id": {"$in": list(range(1, 26))}, "exchange": "BINANCE"}, None, None, 100),
+}
+
+def parse_args():
+    # Both modes use the current compiler (bound LIMIT, $in via json_each), only
+    # the statement cache is toggled. This is not a comparison with the old builder.
+    parser = argparse.ArgumentParser(description="Per-query SQL compilation overhead with the statement cache on and off")
+    parser.add_argument("--iterations", type=int, default=100000, help="Compilations per shape")
+    parser.add_argument("--queries", type=int, default=2000, help="End-to-end queries per shape")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "query_compile.json"), help="JSON results file")
+    return parser.parse_args()
+
+def time_compile(base: SQLiteBase, shape: tuple, iterations: int) -> float:
+    query, projection, sort, limit = shape
+    started = time.perf_counter()
+    for _ in range(iterations):
+        base._compile_select(query, projection, sort, limit)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+async def time_queries(base: SQLiteBase, shape: tuple, queries: int) -> float:
+    query, projection, sort, limit = shape
+    started = time.perf_counter()
+    for _ in range(queries):
+        await base.find_many(query, projection, sort, limit)
+    return (time.perf_counter() - started) / queries * 1e6
+
+async def seed(base: SQLiteBase):
+    await base.insert_many([
+        {
+            "list_id": i % 50 + 1,
+            "symbol": f"SYM{i}USDT",
+            "full_name": f"BINANCE:SYM{i}USDT",
+            "description": "",
+            "exchange": "BINANCE",
+            "create_time": f"{i:08d}",
+            "update_time": "",
+        }
+        for i in range(5000)
+    ])
+
+async def main(args):
+    settings.DB_DIR = tempfile.mkdtemp(prefix="mtv-bench-")
+    settings.DB_GROUP_COMMIT = False
+    await DB.connect()
+
+    await SQLiteBase("watch_lists").insert_many([
+        {"name": f"list{i}", "description": "", "create_time": "", "update_time": ""}
+        for i in range(50)
+    ])
+    items = SQLiteBase("watch_list_items")
+    await seed(items)
+
+    runs = []
+    for name, shape in SHAPES.items():
+        result = {"shape": name}
+        for enabled in (False, True):
+            SQLiteBase.statement_cache_enabled = enabled
+            SQLiteBase.statement_cache.clear()
+            label = "cached" if enabled else "uncached"
+            result[f"compile_us_{label}"] = round(time_compile(items, shape, args.iterations), 3)
+            result[f"query_us_{label}"] = round(await time_queries(items, shape, args.queries), 1)
+        runs.append(result)
+
+        print(f"[*] {name}")
+        for key, value in result.items():
+            if key != "shape":
+                print(f"     {key:<20} {value}")
+
+    await DB.close()
+    write_results(args.out, "query_compile", runs)
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
\ No newline at end of file
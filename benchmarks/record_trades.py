@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ccxt.pro as ccxtpro
+
+from app.config import settings
+from app.services.trade_replay import TradeRecorder
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Record live watch_trades streams for offline replay")
+    parser.add_argument("--exchange", default="binance", help="ccxt.pro exchange id")
+    parser.add_argument("--symbols", nargs="+", default=["BTC/USDT"], help="Symbols to record")
+    parser.add_argument("--duration", type=float, default=60, help="Recording duration in seconds")
+    parser.add_argument("--out", default=settings.REPLAY_DIR, help="Directory to write the recording to")
+    return parser.parse_args()
+
+async def record_symbol(recorder: TradeRecorder, symbol: str, deadline: float):
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+
+        try:
+            await asyncio.wait_for(recorder.watch_trades(symbol), timeout=remaining)
+        except asyncio.TimeoutError:
+            return
+        except Exception as e:
+            print(f"[!] {symbol}: {e}")
+            await asyncio.sleep(1)
+
+async def record(args):
+    if not hasattr(ccxtpro, args.exchange):
+        print(f"[!] Unsupported exchange: {args.exchange}")
+        sys.exit(1)
+
+    recorder = TradeRecorder(getattr(ccxtpro, args.exchange)(), args.out)
+    deadline = time.monotonic() + args.duration
+
+    print(f"[*] Recording {', '.join(args.symbols)} on {args.exchange} for {args.duration:g}s...")
+
+    try:
+        await asyncio.gather(*(record_symbol(recorder, symbol, deadline) for symbol in args.symbols))
+    finally:
+        await recorder.close()
+
+    print(f"\n[✔] Recorded {recorder.trade_count} trades in {recorder.batch_count} batches.")
+    print(f"     ➜ {recorder.path}\n")
+
+if __name__ == "__main__":
+    asyncio.run(record(parse_args()))
\ No newline at end of file
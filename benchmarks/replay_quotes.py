@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+from functools import partial
+
+import orjson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.trade_replay import ReplayExchange
+from app.services.websocket_service import WebSocketService
+from bench_utils import percentile, write_results
+
+class FakeClient:
+    """Stands in for a Robyn WebSocket and keeps delivery statistics"""
+    def __init__(self, ws_id: str):
+        self.id = ws_id
+        self.received = 0
+        self.latencies = []
+
+    async def async_send_to(self, ws_id: str, message: str):
+        self.received += 1
+        timestamp = orjson.loads(message).get("timestamp")
+        if timestamp:
+            self.latencies.append(time.time() * 1000 - timestamp)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay recorded trades through WebSocketService in-process")
+    parser.add_argument("--exchange", default="binance", help="Exchange id of the recording")
+    parser.add_argument("--symbols", nargs="*", default=None, help="Symbols to replay (default: all recorded)")
+    parser.add_argument("--clients", type=int, default=10, help="Simulated clients per symbol")
+    parser.add_argument("--speed", type=float, default=0, help="Speed multiplier, 0 for as fast as possible")
+    parser.add_argument("--dir", default=settings.REPLAY_DIR, help="Directory holding the recordings")
+    parser.add_argument("--timeout", type=float, default=600, help="Give up after this many seconds")
+    parser.add_argument("--out", default=None, help="Write the results as JSON to this file")
+    return parser.parse_args()
+
+async def replay(args):
+    service = WebSocketService(
+        exchange_factory=partial(ReplayExchange, directory=args.dir, speed=args.speed)
+    )
+    exchange = service.exchange_factory(args.exchange)
+    service.exchanges[args.exchange] = exchange
+
+    symbols = args.symbols or list(exchange.batches)
+    targets = {exchange.aliases[symbol] for symbol in symbols}
+    trades_total = sum(len(trades) for symbol in targets for _, trades in exchange.batches[symbol])
+
+    clients = []
+    started = time.perf_counter()
+
+    for symbol in symbols:
+        full_name = f"{args.exchange}:{symbol.replace('/', '')}"
+        for i in range(args.clients):
+            client = FakeClient(f"{full_name}#{i}")
+            clients.append(client)
+            await service.subscribe(client, full_name)
+
+    print(f"[*] Replaying {len(symbols)} symbols to {len(clients)} clients at speed {args.speed:g}...")
+
+    deadline = time.monotonic() + args.timeout
+    while not targets <= exchange.exhausted and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+    elapsed = time.perf_counter() - started
+
+    for task in service.subscriptions_tasks.values():
+        task.cancel()
+
+    latencies = [latency for client in clients for latency in client.latencies]
+    delivered = sum(client.received for client in clients)
+    results = {
+        "exchange": args.exchange,
+        "symbols": len(symbols),
+        "clients": len(clients),
+        "speed": args.speed,
+        "trades": trades_total,
+        "delivered": delivered,
+        "elapsed_s": round(elapsed, 3),
+        "msgs_per_sec": round(delivered / elapsed, 1) if elapsed else 0,
+        "latency_p50_ms": round(percentile(latencies, 50), 3),
+        "latency_p99_ms": round(percentile(latencies, 99), 3),
+        "completed": targets <= exchange.exhausted,
+    }
+
+    for key, value in results.items():
+        print(f"     {key:<16} {value}")
+
+    if args.out:
+        write_results(args.out, "replay_quotes", [results])
+
+if __name__ == "__main__":
+    asyncio.run(replay(parse_args()))
\ No newline at end of file
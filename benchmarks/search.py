@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database.connection import DB
+from app.database.watch_list import WatchListDB
+from bench_utils import RESULTS_DIR, percentile, write_results
+
+QUOTES = ["USDT", "USDC", "BTC", "ETH", "EUR"]
+EXCHANGES = ["BINANCE", "OKX", "BYBIT", "KRAKEN"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare FTS5 search with filtering all watch list items in Python")
+    parser.add_argument("--sizes", default="1000,5000,20000", help="Comma-separated item counts to seed")
+    parser.add_argument("--queries", type=int, default=200, help="Searches per size")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "search.json"), help="JSON results file")
+    return parser.parse_args()
+
+async def seed(watch_list: WatchListDB, start: int, end: int):
+    now = "2024-01-01T00:00:00"
+    await watch_list.items_db.insert_many([
+        {
+            "list_id": 1,
+            "symbol": f"COIN{i}/{QUOTES[i % len(QUOTES)]}",
+            "full_name": f"{EXCHANGES[i % len(EXCHANGES)]}:COIN{i}/{QUOTES[i % len(QUOTES)]}",
+            "description": f"Coin number {i}",
+            "exchange": EXCHANGES[i % len(EXCHANGES)],
+            "create_time": now,
+            "update_time": now,
+        }
+        for i in range(start, end)
+    ])
+
+async def measure(search, queries: int) -> dict:
+    latencies = []
+    for i in range(queries):
+        started = time.perf_counter()
+        await search(f"coin{i * 7 % 1000} usd")
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+    }
+
+async def main(args):
+    settings.DB_DIR = tempfile.mkdtemp(prefix="mtv-bench-")
+    settings.DB_GROUP_COMMIT = False
+    await DB.connect()
+
+    watch_list = WatchListDB()
+    await watch_list.create_watch_list("bench")
+
+    async def scan_all(text: str):
+        # What the browser did before: download every item and filter it
+        words = text.lower().split()
+        items = await watch_list.items_db.find_many()
+        return [item for item in items if all(word in item["full_name"].lower() for word in words)][:20]
+
+    runs = []
+    seeded = 0
+    for size in sorted(int(size) for size in args.sizes.split(",")):
+        await seed(watch_list, seeded, size)
+        seeded = size
+
+        for mode, search in (("fts", watch_list.search_watch_list_items), ("scan", scan_all)):
+            result = {"mode": mode, "items": size, **await measure(search, args.queries)}
+            runs.append(result)
+            print(f"[✔] {mode:<5} {size:>7} items  p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms")
+
+    await DB.close()
+    write_results(args.out, "search", runs)
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
\ No newline at end of file
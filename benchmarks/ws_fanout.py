@@ -0,0 +1,118 @@
+import os
+import time
+import asyncio
+import argparse
+
+import orjson
+import aiohttp
+
+from bench_utils import RESULTS_DIR, ProcessStats, free_port, percentile, start_server, stop_server, write_results
+
+class DeliveryStats:
+    def __init__(self):
+        self.recording = False
+        self.delivered = 0
+        self.latencies = []
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test /quotes WebSocket fan-out against a synthetic trade source")
+    parser.add_argument("--clients", type=int, nargs="+", default=[100], help="Simulated clients (N), one run per value")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[10], help="Symbols (M), one run per value")
+    parser.add_argument("--rate", type=float, default=10, help="Trades per second per symbol")
+    parser.add_argument("--warmup", type=float, default=3, help="Seconds to wait before measuring")
+    parser.add_argument("--duration", type=float, default=15, help="Measurement window in seconds")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "ws_fanout.json"), help="JSON results file")
+    parser.add_argument("--verbose", action="store_true", help="Show server output")
+    return parser.parse_args()
+
+async def run_client(session: aiohttp.ClientSession, url: str, full_name: str, stats: DeliveryStats, connected: asyncio.Semaphore):
+    async with connected:
+        ws = await session.ws_connect(url)
+    async with ws:
+        await ws.send_str(orjson.dumps({"action": "subscribe", "full_name": full_name}).decode())
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                break
+            # Skip the plain-text greeting sent on connect
+            if not msg.data.startswith("{") or not stats.recording:
+                continue
+
+            stats.delivered += 1
+            timestamp = orjson.loads(msg.data).get("timestamp")
+            if timestamp:
+                stats.latencies.append(time.time() * 1000 - timestamp)
+
+async def measure(port: int, server_pid: int, clients: int, symbols: int, args) -> dict:
+    url = f"ws://127.0.0.1:{port}/quotes"
+    stats = DeliveryStats()
+    process_stats = ProcessStats(server_pid)
+    connected = asyncio.Semaphore(100)
+
+    async with aiohttp.ClientSession() as session:
+        tasks = [
+            asyncio.create_task(run_client(session, url, f"synthetic:SYN{i % symbols}USDT", stats, connected))
+            for i in range(clients)
+        ]
+
+        await asyncio.sleep(args.warmup)
+
+        cpu_start = process_stats.cpu_seconds()
+        started = time.perf_counter()
+        stats.recording = True
+
+        await asyncio.sleep(args.duration)
+
+        stats.recording = False
+        elapsed = time.perf_counter() - started
+        cpu_end = process_stats.cpu_seconds()
+        rss_kb = process_stats.memory_kb("VmRSS")
+        peak_rss_kb = process_stats.memory_kb("VmHWM")
+        failed = sum(1 for task in tasks if task.done() and task.exception())
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    expected = clients * args.rate * elapsed
+    return {
+        "clients": clients,
+        "symbols": symbols,
+        "rate_per_symbol": args.rate,
+        "duration_s": round(elapsed, 3),
+        "failed_clients": failed,
+        "delivered": stats.delivered,
+        "delivery_ratio": round(stats.delivered / expected, 4) if expected else None,
+        "msgs_per_sec": round(stats.delivered / elapsed, 1),
+        "latency_p50_ms": round(percentile(stats.latencies, 50), 3),
+        "latency_p99_ms": round(percentile(stats.latencies, 99), 3),
+        "cpu_percent": round((cpu_end - cpu_start) / elapsed * 100, 1) if cpu_start is not None else None,
+        "rss_mb": round(rss_kb / 1024, 1) if rss_kb is not None else None,
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1) if peak_rss_kb is not None else None,
+    }
+
+async def main(args):
+    runs = []
+
+    for clients in args.clients:
+        for symbols in args.symbols:
+            print(f"[*] {clients} clients across {symbols} symbols at {args.rate:g} trades/s per symbol...")
+
+            port = free_port()
+            server = start_server(port, {
+                "MTV_TRADE_SOURCE": "synthetic",
+                "MTV_SYNTHETIC_TRADE_RATE": str(args.rate),
+            }, verbose=args.verbose)
+
+            try:
+                result = await measure(port, server.pid, clients, symbols, args)
+            finally:
+                stop_server(server)
+
+            runs.append(result)
+            for key, value in result.items():
+                print(f"     {key:<16} {value}")
+
+    write_results(args.out, "ws_fanout", runs)
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
\ No newline at end of file
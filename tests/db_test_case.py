@@ -0,0 +1,37 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+# Keep app.config from creating ./data when the tests import it
+os.environ.setdefault("MTV_DB_DIR", tempfile.mkdtemp(prefix="mtv-test-"))
+
+from app.config import settings
+from app.database.base import SQLiteBase
+from app.database.connection import DB
+
+class DBTestCase(unittest.IsolatedAsyncioTestCase):
+    """
+    Runs every test against a fresh database in a temporary directory.
+    Group commit is off unless a test turns it on.
+    """
+    async def asyncSetUp(self):
+        self.db_dir = tempfile.mkdtemp(prefix="mtv-test-")
+        self.saved_settings = (settings.DB_DIR, settings.DB_GROUP_COMMIT, settings.DB_GROUP_COMMIT_WINDOW_MS)
+        settings.DB_DIR = self.db_dir
+        settings.DB_GROUP_COMMIT = False
+        SQLiteBase.statement_cache.clear()
+        await DB.connect()
+
+    async def asyncTearDown(self):
+        await DB.close()
+        settings.DB_DIR, settings.DB_GROUP_COMMIT, settings.DB_GROUP_COMMIT_WINDOW_MS = self.saved_settings
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    async def create_watch_lists(self, count: int) -> SQLiteBase:
+        lists = SQLiteBase("watch_lists")
+        await lists.insert_many([
+            {"name": f"list{i}", "description": "", "create_time": "", "update_time": ""}
+            for i in range(1, count + 1)
+        ])
+        return lists
\ No newline at end of file
@@ -0,0 +1,163 @@
+import unittest
+
+from tests.db_test_case import DBTestCase
+from app.database.base import SQLiteBase
+
+# (list_id, symbol, exchange)
+ITEMS = [
+    (1, "BTCUSDT", "BINANCE"),
+    (1, "ETHUSDT", "BINANCE"),
+    (1, "BTCUSDT", "OKX"),
+    (2, "SOLUSDT", "BYBIT"),
+    (2, "ETHUSDT", "OKX"),
+    (3, "DOGEUSDT", "BINANCE"),
+]
+
+class AggregateTest(DBTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        await self.create_watch_lists(3)
+        self.items = SQLiteBase("watch_list_items")
+        await self.items.insert_many([
+            {
+                "list_id": list_id,
+                "symbol": symbol,
+                "full_name": f"{exchange}:{symbol}",
+                "description": "",
+                "exchange": exchange,
+                "create_time": f"{i:04d}",
+                "update_time": "",
+            }
+            for i, (list_id, symbol, exchange) in enumerate(ITEMS)
+        ])
+
+    async def compile(self, pipeline):
+        return self.items._compile_pipeline(pipeline, await self.items._get_columns())
+
+    async def test_match_and_project_share_one_select(self):
+        pipeline = [
+            {"$match": {"exchange": "BINANCE"}},
+            {"$project": {"symbol": 1, "venue": "$exchange"}},
+        ]
+        sql, params = await self.compile(pipeline)
+
+        self.assertNotIn("(SELECT", sql)
+        self.assertEqual(params, ["BINANCE"])
+        self.assertEqual(await self.items.aggregate(pipeline + [{"$sort": {"symbol": 1}}]), [
+            {"symbol": "BTCUSDT", "venue": "BINANCE"},
+            {"symbol": "DOGEUSDT", "venue": "BINANCE"},
+            {"symbol": "ETHUSDT", "venue": "BINANCE"},
+        ])
+
+    async def test_match_after_group_wraps_the_group(self):
+        pipeline = [
+            {"$group": {"_id": "$list_id", "n": {"$sum": 1}}},
+            {"$match": {"n": {"$gte": 2}}},
+            {"$sort": {"_id": 1}},
+        ]
+        sql, params = await self.compile(pipeline)
+
+        self.assertIn("FROM (SELECT", sql)
+        self.assertIn("GROUP BY", sql.split(") AS stage_1")[0])
+        self.assertTrue(sql.endswith('WHERE "n" >= ? ORDER BY "_id" ASC'))
+        self.assertEqual(params, [2])
+        self.assertEqual(await self.items.aggregate(pipeline), [
+            {"_id": 1, "n": 3},
+            {"_id": 2, "n": 2},
+        ])
+
+    async def test_skip_then_limit_merge(self):
+        pipeline = [{"$sort": {"id": 1}}, {"$skip": 1}, {"$limit": 2}, {"$project": {"id": 1}}]
+        sql, params = await self.compile(pipeline)
+
+        self.assertNotIn("(SELECT", sql)
+        self.assertTrue(sql.endswith("LIMIT ? OFFSET ?"))
+        self.assertEqual(params, [2, 1])
+        self.assertEqual(await self.items.aggregate(pipeline), [{"id": 2}, {"id": 3}])
+
+    async def test_limit_then_skip_wraps(self):
+        pipeline = [{"$sort": {"id": 1}}, {"$limit": 3}, {"$skip": 1}, {"$project": {"id": 1}}]
+        sql, params = await self.compile(pipeline)
+
+        self.assertIn("FROM (SELECT", sql)
+        # Inner LIMIT 3, outer skips 1 of those with no limit of its own
+        self.assertEqual(params, [3, -1, 1])
+        self.assertEqual(await self.items.aggregate(pipeline), [{"id": 2}, {"id": 3}])
+
+    async def test_consecutive_limits_keep_the_smallest(self):
+        sql, params = await self.compile([{"$limit": 5}, {"$limit": 2}])
+
+        self.assertNotIn("(SELECT", sql)
+        self.assertEqual(params, [2])
+
+    async def test_sort_after_limit_wraps(self):
+        pipeline = [{"$sort": {"id": 1}}, {"$limit": 2}, {"$sort": {"id": -1}}, {"$project": {"id": 1}}]
+        sql, _ = await self.compile(pipeline)
+
+        self.assertIn("FROM (SELECT", sql)
+        self.assertEqual(await self.items.aggregate(pipeline), [{"id": 2}, {"id": 1}])
+
+    async def test_group_with_dict_id_is_nested(self):
+        pipeline = [
+            {"$group": {
+                "_id": {"list": "$list_id", "exchange": "$exchange"},
+                "count": {"$count": {}},
+                "first": {"$min": "$symbol"},
+            }},
+            {"$match": {"_id.list": 1}},
+            {"$sort": [("_id.exchange", 1)]},
+        ]
+
+        self.assertEqual(await self.items.aggregate(pipeline), [
+            {"_id": {"list": 1, "exchange": "BINANCE"}, "count": 2, "first": "BTCUSDT"},
+            {"_id": {"list": 1, "exchange": "OKX"}, "count": 1, "first": "BTCUSDT"},
+        ])
+
+    async def test_group_without_id_and_accumulators(self):
+        pipeline = [
+            {"$match": {"exchange": {"$in": ["OKX", "BYBIT"]}}},
+            {"$group": {
+                "_id": None,
+                "rows": {"$sum": 1},
+                "total": {"$sum": "$list_id"},
+                "average": {"$avg": "$list_id"},
+                "highest": {"$max": "$symbol"},
+            }},
+        ]
+
+        self.assertEqual(await self.items.aggregate(pipeline), [
+            {"_id": None, "rows": 3, "total": 5, "average": 5 / 3, "highest": "SOLUSDT"},
+        ])
+
+    async def test_exclusion_projection_uses_table_columns(self):
+        results = await self.items.aggregate([
+            {"$match": {"id": 1}},
+            {"$project": {"id": 0, "create_time": 0, "update_time": 0, "description": 0}},
+        ])
+
+        self.assertEqual(results, [
+            {"list_id": 1, "symbol": "BTCUSDT", "full_name": "BINANCE:BTCUSDT", "exchange": "BINANCE", "position": 1},
+        ])
+
+    async def test_count_stage(self):
+        pipeline = [{"$match": {"exchange": "OKX"}}, {"$count": "total"}]
+
+        self.assertEqual(await self.items.aggregate(pipeline), [{"total": 2}])
+        self.assertEqual(await self.items.aggregate([{"$limit": 4}, {"$count": "total"}]), [{"total": 4}])
+
+    async def test_invalid_pipelines_are_rejected(self):
+        for pipeline in (
+            [{"$project": {"symbol; DROP TABLE watch_lists": 1}}],
+            [{"$project": {"symbol": 1, "exchange": 0}}],
+            [{"$group": {"_id": "list_id"}}],
+            [{"$group": {"_id": None, "n": {"$median": "$list_id"}}}],
+            [{"$limit": -1}],
+            [{"$unwind": "$symbol"}],
+            [{"$match": {}, "$limit": 1}],
+        ):
+            with self.assertRaises(ValueError, msg=pipeline):
+                await self.compile(pipeline)
+            self.assertEqual(await self.items.aggregate(pipeline), [])
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
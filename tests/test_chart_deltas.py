@@ -0,0 +1,98 @@
+import unittest
+
+import orjson
+
+from tests.db_test_case import DBTestCase
+from app.config import settings
+from app.database.base import SQLiteBase
+from app.database.chart_storage import ChartRevisionConflict, ChartStorageDB
+from app.database.json_patch import JsonPatchError, apply_patch
+
+def chart_content(**layout) -> str:
+    return orjson.dumps({"name": "a", "content": orjson.dumps(layout).decode("utf-8")}).decode("utf-8")
+
+class JsonPatchTest(unittest.TestCase):
+    def test_operations(self):
+        document = {"a": [1, 2], "b": {"c": 1}, "x/y": 0}
+        document = apply_patch(document, [
+            {"op": "add", "path": "/a/-", "value": 3},
+            {"op": "remove", "path": "/a/0"},
+            {"op": "replace", "path": "/b/c", "value": 2},
+            {"op": "move", "from": "/x~1y", "path": "/d"},
+            {"op": "copy", "from": "/b", "path": "/e"},
+            {"op": "test", "path": "/e/c", "value": 2},
+        ])
+        self.assertEqual(document, {"a": [2, 3], "b": {"c": 2}, "d": 0, "e": {"c": 2}})
+
+    def test_invalid_patches(self):
+        for patch in (
+            [{"op": "remove", "path": "/missing"}],
+            [{"op": "add", "path": "/a/5", "value": 1}],
+            [{"op": "test", "path": "/a/0", "value": 9}],
+            [{"op": "frobnicate", "path": "/a"}],
+            [{"op": "move", "from": "/b", "path": "/b/c"}],
+        ):
+            with self.assertRaises(JsonPatchError):
+                apply_patch({"a": [1], "b": {}}, patch)
+
+class ChartDeltaTest(DBTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.saved_threshold = settings.CHART_DELTA_COMPACT_THRESHOLD
+        self.storage = ChartStorageDB()
+
+    async def asyncTearDown(self):
+        await self.storage.close()
+        settings.CHART_DELTA_COMPACT_THRESHOLD = self.saved_threshold
+        await super().asyncTearDown()
+
+    async def save_patch(self, patch, base_revision):
+        return await self.storage.save_chart_patch("a", patch, base_revision, "BINANCE:BTCUSDT", "1D")
+
+    async def test_patches_are_applied_on_read(self):
+        saved = await self.storage.save_chart("a", chart_content(panes=[1]), "BINANCE:BTCUSDT", "1D")
+        self.assertEqual(saved["revision"], 0)
+
+        result = await self.save_patch([{"op": "add", "path": "/content/panes/-", "value": 2}], 0)
+        self.assertEqual(result, {"id": saved["id"], "revision": 1})
+
+        # Rebuilt from the stored base and delta, not the in-memory document
+        self.storage.documents.clear()
+        self.assertEqual(await self.storage.get_chart_content(saved["id"]), chart_content(panes=[1, 2]))
+        self.assertEqual((await self.storage.get_latest_chart())["content"], chart_content(panes=[1, 2]))
+
+    async def test_stale_revision_and_bad_patch_are_rejected(self):
+        saved = await self.storage.save_chart("a", chart_content(panes=[]), "BINANCE:BTCUSDT", "1D")
+        await self.save_patch([{"op": "add", "path": "/content/x", "value": 1}], 0)
+
+        with self.assertRaises(ChartRevisionConflict) as conflict:
+            await self.save_patch([{"op": "add", "path": "/content/y", "value": 1}], 0)
+        self.assertEqual(conflict.exception.revision, 1)
+
+        with self.assertRaises(JsonPatchError):
+            await self.save_patch([{"op": "remove", "path": "/content/missing"}], 1)
+
+        self.assertIsNone(await self.storage.save_chart_patch("b", [], 0, "BINANCE:BTCUSDT", "1D"))
+        self.assertEqual(await SQLiteBase("chart_deltas").count_documents({"chart_id": saved["id"]}), 1)
+
+    async def test_full_save_supersedes_patches(self):
+        saved = await self.storage.save_chart("a", chart_content(v=0), "BINANCE:BTCUSDT", "1D")
+        await self.save_patch([{"op": "replace", "path": "/content/v", "value": 1}], 0)
+
+        saved = await self.storage.save_chart("a", chart_content(v=2), "BINANCE:BTCUSDT", "1D")
+        self.assertEqual(saved["revision"], 2)
+        self.assertEqual(await SQLiteBase("chart_deltas").count_documents({}), 0)
+        self.assertEqual(await self.storage.get_chart_content(saved["id"]), chart_content(v=2))
+
+    async def test_compaction_folds_patches_into_base(self):
+        settings.CHART_DELTA_COMPACT_THRESHOLD = 3
+        saved = await self.storage.save_chart("a", chart_content(v=0), "BINANCE:BTCUSDT", "1D")
+        for revision in range(3):
+            await self.save_patch([{"op": "replace", "path": "/content/v", "value": revision + 1}], revision)
+        await self.storage.close()
+
+        chart = await self.storage.sqlite_base.find_one({"id": saved["id"]}, projection={"revision": 1, "base_revision": 1})
+        self.assertEqual((chart["revision"], chart["base_revision"]), (3, 3))
+        self.assertEqual(await SQLiteBase("chart_deltas").count_documents({}), 0)
+        self.storage.documents.clear()
+        self.assertEqual(await self.storage.get_chart_content(saved["id"]), chart_content(v=3))
\ No newline at end of file
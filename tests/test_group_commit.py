@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+
+from tests.db_test_case import DBTestCase
+from app.config import settings
+from app.database.base import SQLiteBase
+from app.database.connection import DB
+
+class GroupCommitTest(DBTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        settings.DB_GROUP_COMMIT = True
+        settings.DB_GROUP_COMMIT_WINDOW_MS = 5
+        self.lists = SQLiteBase("watch_lists")
+
+    def watch_list(self, name: str) -> dict:
+        return {"name": name, "description": "", "create_time": "", "update_time": ""}
+
+    async def test_concurrent_writes_share_a_batch(self):
+        ids = await asyncio.gather(*(self.lists.insert_one(self.watch_list(f"l{i}")) for i in range(50)))
+
+        self.assertEqual(sorted(ids), list(range(1, 51)))
+        self.assertEqual(await self.lists.count_documents({}), 50)
+
+    async def test_failed_write_only_fails_itself(self):
+        await self.lists.insert_one(self.watch_list("taken"))
+
+        results = await asyncio.gather(
+            self.lists.insert_one(self.watch_list("a")),
+            self.lists.insert_one(self.watch_list("taken")),
+            self.lists.insert_one(self.watch_list("b")),
+        )
+
+        self.assertIsNotNone(results[0])
+        self.assertIsNone(results[1])
+        self.assertIsNotNone(results[2])
+        self.assertEqual(sorted(row["name"] for row in await self.lists.find_many()), ["a", "b", "taken"])
+
+    async def test_cancelled_flush_fails_pending_writes(self):
+        settings.DB_GROUP_COMMIT_WINDOW_MS = 1000
+        write = asyncio.create_task(DB.execute_write(
+            "INSERT INTO watch_lists (name, description, create_time, update_time) VALUES (?, '', '', '')",
+            ("late",)
+        ))
+        await asyncio.sleep(0.01)
+        DB.flush_task.cancel()
+
+        with self.assertRaises(RuntimeError):
+            await write
+        self.assertIsNone(DB.flush_task)
+        self.assertEqual(await self.lists.count_documents({}), 0)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
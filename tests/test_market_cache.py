@@ -0,0 +1,135 @@
+import asyncio
+
+from tests.db_test_case import DBTestCase
+from app.config import settings
+from app.database.market_cache import MarketCache
+
+def market(symbol: str, price_precision: float = 0.01, active: bool = True) -> dict:
+    base, quote = symbol.split(":")[0].split("/")
+    return {
+        "symbol": symbol,
+        "base": base,
+        "quote": quote,
+        "type": "swap" if ":" in symbol else "spot",
+        "price_precision": price_precision,
+        "amount_precision": 0.0001,
+        "active": active,
+    }
+
+MARKETS = [market("BTC/USDT"), market("BTC/USDT:USDT", 0.1), market("ETH/BTC", 0.00001), market("LUNA/USDT", active=False)]
+
+class MarketCacheTest(DBTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.calls = []
+
+    async def fetch(self, exchange_name: str) -> list:
+        self.calls.append(exchange_name)
+        return MARKETS
+
+    async def test_markets_are_fetched_once_and_mirrored(self):
+        cache = MarketCache()
+        self.assertEqual(
+            await cache.get_symbols("binance", self.fetch),
+            {"symbols": ["BTC/USDT", "BTC/USDT:USDT", "ETH/BTC"], "source": "exchange"}
+        )
+
+        mirror = cache.mirrors["binance"]
+        self.assertTrue(await cache.check_pair_exists("binance", "ETH/BTC", self.fetch))
+        self.assertFalse(await cache.check_pair_exists("binance", "ETHBTC", self.fetch))
+        self.assertIs(cache.mirrors["binance"], mirror)
+        self.assertEqual(self.calls, ["binance"])
+
+        # A new MarketCache loads the rows saved by the first one
+        other = MarketCache()
+        info = await other.get_market("binance", "ETH/BTC", self.fetch)
+        self.assertEqual(info["price_precision"], 0.00001)
+        self.assertEqual(other.mirrors["binance"].source, "cache")
+        self.assertEqual(self.calls, ["binance"])
+
+    async def test_market_lookup_without_separators_prefers_spot(self):
+        cache = MarketCache()
+        self.assertEqual((await cache.get_market("binance", "BTCUSDT", self.fetch))["symbol"], "BTC/USDT")
+        self.assertEqual((await cache.get_market("binance", "BTC/USDT:USDT", self.fetch))["price_precision"], 0.1)
+        self.assertFalse((await cache.get_market("binance", "LUNA/USDT", self.fetch))["active"])
+        self.assertIsNone(await cache.get_market("binance", "DOGE/USDT", self.fetch))
+
+    async def test_stale_markets_are_served_while_one_refresh_runs(self):
+        cache = MarketCache()
+        await cache.get_symbols("binance", self.fetch)
+        cache.mirrors["binance"].last_updated = 0
+
+        release = asyncio.Event()
+
+        async def slow_fetch(exchange_name):
+            self.calls.append(exchange_name)
+            await release.wait()
+            return MARKETS + [market("SOL/USDT")]
+
+        # Every reader gets the stale list at once, only one refresh starts
+        results = await asyncio.gather(*(cache.get_symbols("binance", slow_fetch) for _ in range(5)))
+        self.assertTrue(all("SOL/USDT" not in result["symbols"] for result in results))
+        await asyncio.sleep(0)
+        self.assertEqual(self.calls, ["binance", "binance"])
+
+        release.set()
+        await cache.refreshes["binance"]
+        self.assertIn("SOL/USDT", (await cache.get_symbols("binance", slow_fetch))["symbols"])
+        self.assertEqual(len(self.calls), 2)
+
+    async def test_cold_readers_share_one_fetch(self):
+        cache = MarketCache()
+        results = await asyncio.gather(*(cache.get_symbols("binance", self.fetch) for _ in range(5)))
+        self.assertEqual({len(result["symbols"]) for result in results}, {3})
+        self.assertEqual(self.calls, ["binance"])
+
+    async def test_failed_refresh_is_retried_after_a_while(self):
+        cache = MarketCache()
+
+        async def failing_fetch(exchange_name):
+            self.calls.append(exchange_name)
+            return []
+
+        self.assertEqual(await cache.get_symbols("binance", failing_fetch), {})
+        self.assertEqual(await cache.get_symbols("binance", failing_fetch), {})
+        self.assertEqual(self.calls, ["binance"])
+
+        cache.failures["binance"] -= settings.MARKETS_REFRESH_RETRY_SECONDS
+        self.assertEqual(len((await cache.get_symbols("binance", self.fetch))["symbols"]), 3)
+
+    async def test_cleared_markets_are_refetched(self):
+        cache = MarketCache()
+        await cache.get_symbols("binance", self.fetch)
+
+        self.assertTrue(await cache.clear_cache("binance"))
+        self.assertEqual(await cache.markets_db.count_documents({}), 0)
+        await cache.get_symbols("binance", self.fetch)
+        self.assertEqual(self.calls, ["binance", "binance"])
+
+    async def test_search_index_is_rebuilt_after_a_save(self):
+        cache = MarketCache()
+        result = await cache.search_pairs("binance", "eth", self.fetch)
+        self.assertEqual(result, {"pairs": ["ETH/BTC"], "total": 1, "source": "exchange"})
+
+        await cache._save_to_cache("binance", MARKETS + [market("ETH/USDT")])
+        result = await cache.search_pairs("binance", "eth", self.fetch)
+        self.assertEqual(result["pairs"], ["ETH/BTC", "ETH/USDT"])
+        self.assertEqual(result["source"], "cache")
+
+    async def test_venues_cover_every_cached_exchange(self):
+        await MarketCache().get_symbols("binance", self.fetch)
+
+        async def fetch_okx(exchange_name):
+            self.calls.append(exchange_name)
+            return [market("BTC/USDT"), market("SOL/USDT")]
+
+        # A fresh cache, as after a restart, indexes exchanges it has not been asked about
+        cache = MarketCache()
+        await cache.get_symbols("okx", fetch_okx)
+        venues = await cache.find_venues("BTC/USDT", None, self.fetch)
+        self.assertEqual(venues, {"binance": ["BTC/USDT", "BTC/USDT:USDT"], "okx": ["BTC/USDT"]})
+        self.assertEqual(await cache.find_venues("SOL", None, self.fetch), {"okx": ["SOL/USDT"]})
+        self.assertEqual(self.calls, ["binance", "okx"])
+
+        await cache.clear_cache("okx")
+        self.assertEqual(await cache.find_venues("SOL", None, self.fetch), {})
\ No newline at end of file
@@ -0,0 +1,80 @@
+import os
+
+import aiosqlite
+
+from tests.db_test_case import DBTestCase
+from app.config import settings
+from app.database.chart_codec import decode_content, is_encoded
+from app.database.connection import DB
+from app.database.migrations import MIGRATIONS, create_baseline_schema, get_schema_version, migrate
+
+class MigrationTest(DBTestCase):
+    async def test_fresh_database_is_at_latest_version(self):
+        db = await DB.get_db()
+        self.assertEqual(await get_schema_version(db), len(MIGRATIONS))
+
+        # Already applied steps are skipped
+        self.assertEqual(await migrate(db), len(MIGRATIONS))
+
+    async def test_legacy_database_is_upgraded(self):
+        await DB.close()
+        path = os.path.join(settings.DB_DIR, "app_data.db")
+        os.remove(path)
+
+        # A database written before migrations: baseline tables, plain text charts
+        async with aiosqlite.connect(path) as db:
+            await create_baseline_schema(db)
+            await db.executemany(
+                "INSERT INTO charts_storage (name, content, symbol, resolution, timestamp, update_time) "
+                "VALUES (?, ?, 'S', '1D', ?, '')",
+                [(f"chart{i}", f'{{"i": {i}}}', i) for i in range(250)]
+            )
+            await db.execute(
+                "INSERT INTO markets_cache (exchange, symbols, last_updated) VALUES ('binance', ?, 1700000000)",
+                ('["BTC/USDT", "BTC/USDT:USDT"]',)
+            )
+            await db.commit()
+
+        await DB.connect()
+        db = await DB.get_db()
+        self.assertEqual(await get_schema_version(db), len(MIGRATIONS))
+
+        async with db.execute("SELECT content, revision, base_revision FROM charts_storage ORDER BY id") as cursor:
+            rows = await cursor.fetchall()
+        self.assertEqual(len(rows), 250)
+        self.assertTrue(all(is_encoded(row[0]) for row in rows))
+        self.assertEqual(decode_content(rows[7][0]), '{"i": 7}')
+        self.assertEqual({(row[1], row[2]) for row in rows}, {(0, 0)})
+
+        async with db.execute("SELECT name FROM sqlite_master WHERE type = 'index'") as cursor:
+            indexes = {row[0] for row in await cursor.fetchall()}
+        self.assertIn("idx_chart_timestamp", indexes)
+        self.assertIn("idx_watch_list_items_full_name", indexes)
+        self.assertNotIn("idx_watch_list_items_list_id", indexes)
+
+        # Symbol lists become market rows, markets_cache keeps the refresh time
+        async with db.execute("SELECT symbol, base, quote, active FROM markets ORDER BY symbol") as cursor:
+            self.assertEqual(
+                [tuple(row) for row in await cursor.fetchall()],
+                [("BTC/USDT", "BTC", "USDT", 1), ("BTC/USDT:USDT", "BTC", "USDT", 1)]
+            )
+        async with db.execute("SELECT * FROM markets_cache") as cursor:
+            self.assertEqual([tuple(row) for row in await cursor.fetchall()], [("binance", 1700000000)])
+
+    async def test_failed_step_is_rolled_back(self):
+        db = await DB.get_db()
+
+        async def broken_step(db):
+            await db.execute("CREATE TABLE half_done (id INTEGER)")
+            raise RuntimeError("boom")
+
+        MIGRATIONS.append(broken_step)
+        try:
+            with self.assertRaises(RuntimeError):
+                await migrate(db)
+        finally:
+            MIGRATIONS.pop()
+
+        self.assertEqual(await get_schema_version(db), len(MIGRATIONS))
+        async with db.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'") as cursor:
+            self.assertIsNone(await cursor.fetchone())
\ No newline at end of file
@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from app.services.fake_exchange import SyntheticTradeExchange
+from app.services.price_cache import PriceCache
+from app.services.websocket_service import WebSocketService
+
+class RecordingSocket:
+    """WebSocket double keeping the messages sent to it"""
+    def __init__(self, ws_id: str):
+        self.id = ws_id
+        self.sent = []
+
+    async def async_send_to(self, ws_id: str, message: str):
+        self.sent.append(message)
+
+class PriceCacheTest(unittest.TestCase):
+    def test_symbol_spellings_share_an_entry(self):
+        cache = PriceCache()
+        cache.set("BINANCE", "BTCUSDT", 100.0, 1)
+        self.assertEqual(cache.get("binance", "BTC/USDT"), {"price": 100.0, "timestamp": 1})
+        self.assertIsNone(cache.get("binance", "BTC/USDT:USDT"))
+        self.assertIsNone(cache.get("kraken", "BTC/USDT"))
+
+    def test_stale_prices_are_missing(self):
+        cache = PriceCache(max_age=10)
+        with mock.patch("app.services.price_cache.time.monotonic", return_value=1000.0):
+            cache.set("binance", "BTC/USDT", 100.0)
+        with mock.patch("app.services.price_cache.time.monotonic", return_value=1005.0):
+            self.assertEqual(cache.get("binance", "BTC/USDT")["price"], 100.0)
+        with mock.patch("app.services.price_cache.time.monotonic", return_value=1011.0):
+            self.assertIsNone(cache.get("binance", "BTC/USDT"))
+
+    def test_least_recently_written_entries_are_dropped(self):
+        cache = PriceCache()
+        cache.MAX_ENTRIES = 2
+        for symbol in ("BTC/USDT", "ETH/USDT", "BTC/USDT", "SOL/USDT"):
+            cache.set("binance", symbol, 1.0)
+        self.assertIsNotNone(cache.get("binance", "BTC/USDT"))
+        self.assertIsNone(cache.get("binance", "ETH/USDT"))
+
+class StreamedPricesTest(unittest.IsolatedAsyncioTestCase):
+    async def test_quotes_loop_writes_the_cache(self):
+        cache = PriceCache()
+        service = WebSocketService(
+            exchange_factory=lambda name: SyntheticTradeExchange(name, rate=1000),
+            price_cache=cache
+        )
+        ws = RecordingSocket("ws-1")
+        await service.subscribe(ws, "BINANCE:BTCUSDT")
+
+        while not ws.sent:
+            await asyncio.sleep(0.01)
+        await service.close(ws.id)
+
+        self.assertIsNotNone(cache.get("binance", "BTC/USDT"))
\ No newline at end of file
@@ -0,0 +1,114 @@
+from tests.db_test_case import DBTestCase
+from app.services.quote_service import QuoteService
+
+MARKETS = {
+    "BTC/USDT": {"id": "XBTUSDT", "base": "BTC", "quote": "USDT", "type": "spot", "precision": {"price": 0.1, "amount": 0.0001}, "active": True},
+    "BTC/USDT:USDT": {"id": "PF_XBTUSDT", "base": "BTC", "quote": "USDT", "type": "swap", "precision": {"price": 0.5, "amount": 0.001}, "active": True},
+    "ETH/EUR": {"id": "ETHEUR", "base": "ETH", "quote": "EUR", "type": "spot", "precision": {"price": 0.01, "amount": 0.001}, "active": True},
+}
+
+class MarketsExchange:
+    """REST exchange double recording the symbols it is asked for"""
+    precisionMode = 4  # ccxt TICK_SIZE
+
+    def __init__(self, exchange_id: str):
+        self.id = exchange_id
+        self.requested = []
+
+    async def load_markets(self):
+        return MARKETS
+
+    async def fetch_ticker(self, symbol: str):
+        self.requested.append(symbol)
+        return {"symbol": symbol, "last": 100.0}
+
+    async def close(self):
+        return None
+
+class TickersExchange(MarketsExchange):
+    """Exchange double answering many symbols in one fetch_tickers call"""
+    def __init__(self, exchange_id: str, batch: bool = True):
+        super().__init__(exchange_id)
+        self.has = {"fetchTickers": batch}
+        self.batches = []
+
+    async def fetch_tickers(self, symbols=None):
+        self.batches.append(list(symbols))
+        return {
+            symbol: {"symbol": symbol, "last": 100.0, "change": 2.0, "percentage": 2.04, "baseVolume": 10.0, "quoteVolume": 1000.0, "timestamp": 1}
+            for symbol in symbols
+        }
+
+class QuoteServiceTest(DBTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.exchange = MarketsExchange("kraken")
+        self.quote_service = QuoteService(exchange_factory=lambda name: self.exchange)
+
+    async def asyncTearDown(self):
+        await self.quote_service.close()
+        await super().asyncTearDown()
+
+    async def test_symbols_resolve_through_the_market_map(self):
+        resolve = self.quote_service.resolve_symbol
+        self.assertEqual(await resolve("kraken", "BTCUSDT"), "BTC/USDT")
+        self.assertEqual(await resolve("kraken", "XBTUSDT"), "BTC/USDT")
+        self.assertEqual(await resolve("kraken", "BTC/USDT:USDT"), "BTC/USDT:USDT")
+        # Quotes other than USDT/USDC resolve too
+        self.assertEqual(await resolve("kraken", "ETHEUR"), "ETH/EUR")
+        self.assertIsNone(await resolve("kraken", "DOGEUSDT"))
+
+    async def test_unknown_symbols_never_reach_the_exchange(self):
+        self.assertEqual(await self.quote_service.get_current_price("kraken", "ETHEUR"), {"price": 100.0})
+        self.assertEqual(await self.quote_service.get_current_price("kraken", "DOGEUSDT"), {})
+        self.assertEqual(self.exchange.requested, ["ETH/EUR"])
+
+        history = await self.quote_service.get_price_history("kraken", "DOGEUSDT", "1h", 0, 3600000)
+        self.assertIn("error", history)
+
+    async def test_market_info_has_precisions_and_native_id(self):
+        info = await self.quote_service.get_market_info("kraken", "BTCUSDT")
+        self.assertEqual(info["market_id"], "XBTUSDT")
+        self.assertEqual(info["price_precision"], 0.1)
+
+    async def test_bulk_prices_use_one_fetch_tickers_per_exchange(self):
+        exchanges = {"kraken": TickersExchange("kraken"), "binance": TickersExchange("binance")}
+        quote_service = QuoteService(exchange_factory=lambda name: exchanges[name])
+        try:
+            prices = await quote_service.get_prices(
+                ["KRAKEN:BTCUSDT", "KRAKEN:ETHEUR", "KRAKEN:DOGEUSDT", "BINANCE:BTC/USDT:USDT", "BTCUSDT"]
+            )
+        finally:
+            await quote_service.close()
+
+        self.assertEqual(exchanges["kraken"].batches, [["BTC/USDT", "ETH/EUR"]])
+        self.assertEqual(exchanges["binance"].batches, [["BTC/USDT:USDT"]])
+        self.assertEqual(prices["KRAKEN:BTCUSDT"]["price"], 100.0)
+        self.assertEqual(prices["KRAKEN:ETHEUR"]["change_percent"], 2.04)
+        self.assertEqual(prices["BINANCE:BTC/USDT:USDT"]["volume"], 10.0)
+        self.assertIsNone(prices["KRAKEN:DOGEUSDT"])
+        self.assertIsNone(prices["BTCUSDT"])
+
+    async def test_bulk_prices_fall_back_to_fetch_ticker(self):
+        exchange = TickersExchange("kraken", batch=False)
+        quote_service = QuoteService(exchange_factory=lambda name: exchange)
+        try:
+            prices = await quote_service.get_prices(["KRAKEN:BTCUSDT", "KRAKEN:ETHEUR"])
+        finally:
+            await quote_service.close()
+
+        self.assertEqual(exchange.batches, [])
+        self.assertEqual(sorted(exchange.requested), ["BTC/USDT", "ETH/EUR"])
+        self.assertEqual(prices["KRAKEN:ETHEUR"]["price"], 100.0)
+
+    async def test_streamed_prices_are_served_from_memory(self):
+        self.quote_service.price_cache.set("KRAKEN", "BTCUSDT", 101.5)
+        self.assertEqual(await self.quote_service.get_current_price("kraken", "BTC/USDT"), {"price": 101.5})
+        # Native ids find the entry of their unified symbol
+        self.assertEqual(await self.quote_service.get_current_price("kraken", "XBTUSDT"), {"price": 101.5})
+        self.assertEqual(self.exchange.requested, [])
+
+        # Fetched prices are cached too
+        await self.quote_service.get_current_price("kraken", "ETHEUR")
+        await self.quote_service.get_current_price("kraken", "ETH/EUR")
+        self.assertEqual(self.exchange.requested, ["ETH/EUR"])
\ No newline at end of file
@@ -0,0 +1,45 @@
+import asyncio
+
+from tests.db_test_case import DBTestCase
+from app.database.read_cache import ReadCache
+from app.database.watch_list import WatchListDB
+
+class ReadCacheTest(DBTestCase):
+    async def test_results_are_cached_until_a_write(self):
+        watch_list = WatchListDB()
+        await watch_list.create_watch_list("a")
+        etag = watch_list.cache.etag
+
+        first = await watch_list.get_all_watch_lists_with_items()
+        self.assertIs(await watch_list.get_all_watch_lists_with_items(), first)
+        self.assertEqual(watch_list.cache.etag, etag)
+
+        await watch_list.add_item_to_watch_list(first[0]["id"], "BTC/USDT", "BINANCE:BTC/USDT", "", "BINANCE")
+        self.assertNotEqual(watch_list.cache.etag, etag)
+
+        lists = await watch_list.get_all_watch_lists_with_items()
+        self.assertEqual(lists[0]["item_count"], 1)
+
+    async def test_failed_writes_invalidate_too(self):
+        watch_list = WatchListDB()
+        etag = watch_list.cache.etag
+        self.assertFalse(await watch_list.add_item_to_watch_list(99, "BTC/USDT", "BINANCE:BTC/USDT", "", "BINANCE"))
+        self.assertNotEqual(watch_list.cache.etag, etag)
+
+    async def test_result_loaded_across_a_write_is_not_cached(self):
+        cache = ReadCache()
+        loading = asyncio.Event()
+        release = asyncio.Event()
+
+        async def load():
+            loading.set()
+            await release.wait()
+            return "stale"
+
+        read = asyncio.create_task(cache.get("key", load))
+        await loading.wait()
+        cache.invalidate()
+        release.set()
+
+        self.assertEqual(await read, "stale")
+        self.assertNotIn("key", cache.entries)
\ No newline at end of file
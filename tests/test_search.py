@@ -0,0 +1,36 @@
+from tests.db_test_case import DBTestCase
+from app.database.chart_storage import ChartStorageDB
+from app.database.watch_list import WatchListDB
+
+class SearchTest(DBTestCase):
+    async def test_index_follows_inserts_updates_and_deletes(self):
+        storage = ChartStorageDB()
+        saved = await storage.save_chart("btc layout", "{}", "KRAKEN:BTC/USDT", "1D")
+        await storage.save_chart("eth layout", "{}", "OKX:ETH/USDT", "1D")
+
+        self.assertEqual([chart["name"] for chart in await storage.search_charts("btc")], ["btc layout"])
+        self.assertEqual(len(await storage.search_charts("layout usd")), 2)
+
+        # A full save updates the symbol in place
+        await storage.save_chart("btc layout", "{}", "BINANCE:SOL/USDT", "1D")
+        self.assertEqual(await storage.search_charts("kraken"), [])
+        self.assertEqual(len(await storage.search_charts("sol")), 1)
+
+        await storage.delete_chart(saved["id"])
+        self.assertEqual(await storage.search_charts("sol"), [])
+
+    async def test_items_are_ranked_and_paged(self):
+        watch_list = WatchListDB()
+        await watch_list.create_watch_list("a")
+        list_id = (await watch_list.get_watch_list_by_name("a"))["id"]
+        for symbol, description in (("BTC/USDT", "bitcoin"), ("ETH/BTC", "ether priced in btc btc"), ("SOL/USDT", "")):
+            await watch_list.add_item_to_watch_list(list_id, symbol, f"BINANCE:{symbol}", description, "BINANCE")
+
+        results = await watch_list.search_watch_list_items("btc")
+        self.assertEqual([item["symbol"] for item in results], ["ETH/BTC", "BTC/USDT"])
+        self.assertEqual([item["symbol"] for item in await watch_list.search_watch_list_items("btc", 1, 1)], ["BTC/USDT"])
+
+    async def test_query_syntax_is_not_interpreted(self):
+        watch_list = WatchListDB()
+        for text in ('"', "NOT", "a OR", "*", "(", ""):
+            self.assertEqual(await watch_list.search_watch_list_items(text), [])
\ No newline at end of file
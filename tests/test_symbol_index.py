@@ -0,0 +1,65 @@
+import unittest
+
+from app.database.symbol_index import SymbolIndex, VenueIndex
+
+SYMBOLS = ["ETH/BTC", "BTC/USDT:USDT", "BTC/USDT", "WBTC/USDT", "BTC/EUR", "USDT/TRY", "BTCDOM/USDT", "SOL/USDC"]
+
+class SymbolIndexTest(unittest.TestCase):
+    def test_ranking(self):
+        index = SymbolIndex(SYMBOLS)
+
+        self.assertEqual(index.search("btc/usdt")[0][:2], ["BTC/USDT", "BTC/USDT:USDT"])
+        self.assertEqual(
+            index.search("btc")[0],
+            ["BTC/EUR", "BTC/USDT", "BTC/USDT:USDT", "BTCDOM/USDT", "ETH/BTC"]
+        )
+        # Base prefix first, then quote prefix
+        self.assertEqual(index.search("usd")[0][0], "USDT/TRY")
+        self.assertEqual(index.search("sol-usdc")[0], ["SOL/USDC"])
+        self.assertEqual(index.search("xyz"), ([], 0))
+
+    def test_paging(self):
+        index = SymbolIndex(SYMBOLS)
+        everything, total = index.search("", limit=100)
+        self.assertEqual(total, len(SYMBOLS))
+        self.assertEqual(sorted(everything), sorted(SYMBOLS))
+
+        pages = [index.search("usdt", limit=2, offset=offset)[0] for offset in range(0, 6, 2)]
+        self.assertEqual(sum(pages, []), index.search("usdt", limit=6)[0])
+        self.assertEqual(index.search("usdt")[1], 5)
+
+    def test_contains(self):
+        index = SymbolIndex(SYMBOLS)
+        self.assertIn("BTC/USDT", index)
+        self.assertNotIn("BTCUSDT", index)
+
+def markets(*symbols: str, active: bool = True) -> list:
+    return [
+        {"symbol": symbol, "base": symbol.split("/")[0], "quote": symbol.split("/")[1].split(":")[0], "active": active}
+        for symbol in symbols
+    ]
+
+class VenueIndexTest(unittest.TestCase):
+    def test_pairs_and_bases(self):
+        venues = VenueIndex()
+        venues.update("binance", markets("BTC/USDT", "BTC/USDT:USDT", "ETH/BTC"))
+        venues.update("okx", markets("BTC/USDT", "ETH/USDT"))
+        venues.update("kraken", markets("BTC/USDT", active=False))
+
+        self.assertEqual(venues.find("BTC/USDT"), {"binance": ["BTC/USDT", "BTC/USDT:USDT"], "okx": ["BTC/USDT"]})
+        self.assertEqual(venues.find("btc", "usdt"), venues.find("BTC/USDT"))
+        self.assertEqual(venues.find("BTCUSDT"), venues.find("BTC/USDT"))
+        self.assertEqual(venues.find("eth"), {"binance": ["ETH/BTC"], "okx": ["ETH/USDT"]})
+        self.assertEqual(venues.find("DOGE"), {})
+
+    def test_update_replaces_an_exchange(self):
+        venues = VenueIndex()
+        venues.update("binance", markets("BTC/USDT", "LUNA/USDT"))
+        venues.update("binance", markets("BTC/USDT"))
+
+        self.assertEqual(venues.find("LUNA/USDT"), {})
+        self.assertNotIn("LUNAUSDT", venues.compact)
+        self.assertEqual(venues.find("BTC/USDT"), {"binance": ["BTC/USDT"]})
+
+        venues.remove("binance")
+        self.assertEqual((venues.pairs, venues.bases, venues.compact), ({}, {}, {}))
\ No newline at end of file
@@ -0,0 +1,76 @@
+import asyncio
+
+from tests.db_test_case import DBTestCase
+from tests.test_quote_service import TickersExchange
+from app.services.price_cache import PriceCache
+from app.services.quote_service import QuoteService
+from app.services.ticker_scheduler import TickerScheduler
+
+class TickerSchedulerTest(DBTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.exchange = TickersExchange("kraken")
+        self.price_cache = PriceCache()
+        self.quote_service = QuoteService(exchange_factory=lambda name: self.exchange, price_cache=self.price_cache)
+        self.scheduler = TickerScheduler(self.quote_service, self.price_cache, interval=0.05, batch_size=2, lease=60)
+
+    async def asyncTearDown(self):
+        await self.scheduler.close()
+        await self.quote_service.close()
+        await super().asyncTearDown()
+
+    async def wait_for(self, condition):
+        for _ in range(200):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("condition not met")
+
+    async def test_subscribers_share_batched_fetches(self):
+        received = []
+
+        async def callback(full_name, snapshot):
+            received.append((full_name, snapshot["price"]))
+
+        for subscriber in ("ws-1", "ws-2"):
+            for full_name in ("KRAKEN:BTCUSDT", "KRAKEN:XBTUSDT", "KRAKEN:ETHEUR", "KRAKEN:BTC/USDT:USDT"):
+                self.assertTrue(await self.scheduler.subscribe(subscriber, full_name, callback))
+        self.assertFalse(await self.scheduler.subscribe("ws-1", "KRAKEN:DOGEUSDT", callback))
+
+        await self.wait_for(lambda: len(self.exchange.batches) >= 2)
+
+        # Three unified symbols for both clients, in batches of two
+        self.assertEqual(sorted(sum(self.exchange.batches[:2], [])), ["BTC/USDT", "BTC/USDT:USDT", "ETH/EUR"])
+        self.assertEqual([len(batch) for batch in self.exchange.batches[:2]], [2, 1])
+        self.assertIn(("KRAKEN:XBTUSDT", 100.0), received)
+        self.assertEqual(self.price_cache.get("kraken", "ETH/EUR")["change_percent"], 2.04)
+
+        self.scheduler.unsubscribe("ws-1")
+        self.scheduler.unsubscribe("ws-2")
+        await self.wait_for(lambda: not self.scheduler.tasks)
+        self.assertEqual(self.scheduler.interests, {})
+
+    async def test_pollers_are_served_from_the_cache(self):
+        first = await self.scheduler.get_prices(["KRAKEN:BTCUSDT", "KRAKEN:DOGEUSDT"])
+        self.assertEqual(first["KRAKEN:BTCUSDT"]["price"], 100.0)
+        self.assertIsNone(first["KRAKEN:DOGEUSDT"])
+        self.assertEqual(self.exchange.batches, [["BTC/USDT"]])
+
+        # Other clients polling the same symbol are a memory read
+        for _ in range(5):
+            again = await self.scheduler.get_prices(["KRAKEN:BTC/USDT"])
+            self.assertEqual(again["KRAKEN:BTC/USDT"]["volume"], 10.0)
+        self.assertEqual(self.exchange.batches, [["BTC/USDT"]])
+
+        # The scheduler keeps refreshing the polled symbol
+        await self.wait_for(lambda: len(self.exchange.batches) >= 2)
+
+    async def test_leases_lapse(self):
+        self.scheduler.lease = 0.2
+        await self.scheduler.get_prices(["KRAKEN:ETHEUR"])
+        self.assertIn("kraken", self.scheduler.tasks)
+
+        await self.wait_for(lambda: not self.scheduler.tasks)
+        self.assertGreaterEqual(len(self.exchange.batches), 2)
+        self.assertEqual(self.scheduler.interests, {})
+        self.assertEqual(self.scheduler.subscriptions, {})
\ No newline at end of file
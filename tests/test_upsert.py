@@ -0,0 +1,91 @@
+import unittest
+
+from tests.db_test_case import DBTestCase
+from app.database.base import SQLiteBase
+from app.database.watch_list import WatchListDB
+
+class UpsertTest(DBTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.charts = SQLiteBase("charts_storage")
+
+    def chart(self, name: str, **fields) -> dict:
+        return {
+            "name": name,
+            "content": "{}",
+            "symbol": "BINANCE:BTCUSDT",
+            "resolution": "1D",
+            "timestamp": 1,
+            "update_time": "",
+            **fields,
+        }
+
+    async def test_upsert_inserts_then_updates(self):
+        self.assertTrue(await self.charts.upsert_one(self.chart("a"), conflict_fields=["name"]))
+        self.assertTrue(await self.charts.upsert_one(self.chart("a", resolution="60"), conflict_fields=["name"]))
+
+        rows = await self.charts.find_many({"name": "a"})
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["resolution"], "60")
+
+    async def test_upsert_only_updates_listed_fields(self):
+        await self.charts.upsert_one(self.chart("a"), conflict_fields=["name"])
+        await self.charts.upsert_one(
+            self.chart("a", resolution="60", symbol="OKX:ETHUSDT"),
+            conflict_fields=["name"],
+            update_fields=["resolution"]
+        )
+
+        row = await self.charts.find_one({"name": "a"})
+        self.assertEqual((row["resolution"], row["symbol"]), ("60", "BINANCE:BTCUSDT"))
+
+    async def test_insert_if_absent_keeps_row_and_ids(self):
+        watch_list = WatchListDB()
+
+        self.assertTrue(await watch_list.create_watch_list("a", "first"))
+        self.assertFalse(await watch_list.create_watch_list("a", "second"))
+        self.assertTrue(await watch_list.create_watch_list("b"))
+
+        lists = await watch_list.get_all_watch_lists()
+        self.assertEqual([(row["id"], row["name"], row["description"]) for row in lists], [
+            (1, "a", "first"),
+            (2, "b", ""),
+        ])
+
+    async def test_add_item_to_missing_list_returns_false(self):
+        watch_list = WatchListDB()
+        await watch_list.create_watch_list("a")
+
+        self.assertFalse(await watch_list.add_item_to_watch_list(99, "BTCUSDT", "BINANCE:BTCUSDT", "", "BINANCE"))
+        self.assertTrue(await watch_list.add_item_to_watch_list(1, "BTCUSDT", "BINANCE:BTCUSDT", "", "BINANCE"))
+        self.assertFalse(await watch_list.add_item_to_watch_list(1, "BTCUSDT", "BINANCE:BTCUSDT", "", "BINANCE"))
+        self.assertEqual(await watch_list.items_db.count_documents({}), 1)
+
+    async def test_update_one_upsert_falls_back_without_required_columns(self):
+        await self.charts.upsert_one(self.chart("a"), conflict_fields=["name"])
+
+        # Partial document: cannot be a native upsert, must update in place
+        self.assertTrue(await self.charts.update_one({"name": "a"}, {"$set": {"resolution": "5"}}, upsert=True))
+        self.assertEqual((await self.charts.find_one({"name": "a"}))["resolution"], "5")
+
+    async def test_failed_statement_rolls_back_transaction(self):
+        await self.charts.insert_one(self.chart("a"))
+
+        with self.assertRaises(Exception):
+            async with self.charts.transaction():
+                await self.charts.insert_one(self.chart("b"))
+                await self.charts.insert_one(self.chart("a"))  # duplicate name
+
+        self.assertEqual([row["name"] for row in await self.charts.find_many()], ["a"])
+
+    async def test_transaction_commits_on_success(self):
+        async with self.charts.transaction():
+            await self.charts.insert_one(self.chart("a"))
+            await self.charts.update_one({"name": "a"}, {"$set": {"resolution": "W"}})
+            # Reads inside the block see its own writes
+            self.assertEqual((await self.charts.find_one({"name": "a"}))["resolution"], "W")
+
+        self.assertEqual((await self.charts.find_one({"name": "a"}))["resolution"], "W")
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
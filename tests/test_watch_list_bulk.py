@@ -0,0 +1,56 @@
+from tests.db_test_case import DBTestCase
+from app.database.watch_list import WatchListDB
+
+def items(*symbols: str) -> list:
+    return [{"symbol": symbol, "full_name": f"BINANCE:{symbol}", "exchange": "BINANCE"} for symbol in symbols]
+
+class WatchListBulkTest(DBTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.watch_list = WatchListDB()
+        await self.watch_list.create_watch_list("a")
+        self.list_id = (await self.watch_list.get_watch_list_by_name("a"))["id"]
+
+    async def symbols(self) -> list:
+        return [item["symbol"] for item in await self.watch_list.get_watch_list_items_by_id(self.list_id)]
+
+    async def test_bulk_add_skips_existing_items(self):
+        self.assertEqual(await self.watch_list.add_items_to_watch_list(self.list_id, items("A", "B")), 2)
+        self.assertEqual(await self.watch_list.add_items_to_watch_list(self.list_id, items("B", "C", "C")), 1)
+        self.assertEqual(await self.symbols(), ["A", "B", "C"])
+
+        self.assertIsNone(await self.watch_list.add_items_to_watch_list(999, items("A")))
+        with self.assertRaises(ValueError):
+            await self.watch_list.add_items_to_watch_list(self.list_id, [{"symbol": "D"}])
+
+    async def test_bulk_remove_and_reorder(self):
+        await self.watch_list.add_items_to_watch_list(self.list_id, items("A", "B", "C", "D"))
+
+        self.assertEqual(await self.watch_list.remove_items_from_watch_list(self.list_id, ["BINANCE:B", "BINANCE:X"]), 1)
+        self.assertTrue(await self.watch_list.reorder_watch_list_items(self.list_id, ["BINANCE:D", "BINANCE:A"]))
+        self.assertEqual(await self.symbols(), ["D", "A", "C"])
+
+        # Items added after a reorder go to the end
+        await self.watch_list.add_item_to_watch_list(self.list_id, "E", "BINANCE:E", "", "BINANCE")
+        self.assertEqual(await self.symbols(), ["D", "A", "C", "E"])
+
+        self.assertFalse(await self.watch_list.reorder_watch_list_items(999, []))
+
+    async def test_export_import_round_trip(self):
+        await self.watch_list.add_items_to_watch_list(self.list_id, items("A", "B"))
+        await self.watch_list.reorder_watch_list_items(self.list_id, ["BINANCE:B"])
+
+        exported = await self.watch_list.export_watch_list(self.list_id)
+        self.assertEqual([item["symbol"] for item in exported["items"]], ["B", "A"])
+
+        imported = await self.watch_list.import_watch_list({**exported, "name": "copy"})
+        self.assertEqual(imported["added"], 2)
+        copy = await self.watch_list.export_watch_list(imported["id"])
+        self.assertEqual(copy["items"], exported["items"])
+
+        # Importing into an existing list merges
+        merged = await self.watch_list.import_watch_list({**exported, "items": items("A", "C")})
+        self.assertEqual(merged, {"id": self.list_id, "added": 1})
+
+        with self.assertRaises(ValueError):
+            await self.watch_list.import_watch_list({"name": "x", "items": []})
\ No newline at end of file